@@ -0,0 +1,11 @@
+"""Outils de mesure des performances sur données synthétiques.
+
+    python -m bench.run --echelles petite,moyenne --sortie bench-$(git rev-parse --short HEAD).json
+    python -m bench.comparer bench-avant.json bench-apres.json
+    python -m bench.changement_equipe --terminaux 20 --employes 600
+    python -m bench.demarrage --reference HEAD~1
+    python -m bench.replique
+
+Sans --dsn, chaque exécution démarre un cluster PostgreSQL jetable (initdb,
+pg_ctl) dans un répertoire temporaire, supprimé à la fin.
+"""
@@ -0,0 +1,32 @@
+"""Accès aux fonctions de pointage.db hors de `streamlit run`.
+
+Streamlit fonctionne alors en mode nu: st.error et les caches restent
+utilisables, sans page à afficher. Le pool de connexions est créé ici sur la
+base de mesure au lieu de st.secrets.
+"""
+import psycopg2.pool
+from streamlit.logger import set_log_level
+
+from pointage import db
+from pointage.delais import ConnexionPointage
+from pointage.metrics import CurseurMesure
+
+
+def charger_app(parametres, connexions_max=20, replique=None):
+    """Module pointage.db branché sur la base `parametres` (et sa réplique `replique` pour les rapports)"""
+    set_log_level("error")
+    fermer_app(db)
+    db.parametres_connexion = lambda: dict(parametres)
+    db.connection_pool = psycopg2.pool.ThreadedConnectionPool(
+        1, connexions_max, connection_factory=ConnexionPointage, cursor_factory=CurseurMesure, **parametres
+    )
+    db.brancher_replique(replique)
+    return db
+
+
+def fermer_app(module):
+    module.fermer_pilote_async()
+    module.brancher_replique(None)
+    if module.connection_pool is not None:
+        module.connection_pool.closeall()
+        module.connection_pool = None
@@ -0,0 +1,406 @@
+"""Test de charge du changement d'équipe: N terminaux pointent en même temps.
+
+    python -m bench.changement_equipe --terminaux 20 --employes 600
+    python -m bench.changement_equipe --terminaux 50 --duree 30 --dsn "host=localhost dbname=bench_jetable"
+
+Reproduit la demi-heure 07:30–08:00: l'équipe de jour arrive (entre 20 minutes
+d'avance et 35 minutes de retard) pendant que l'équipe de nuit de la veille
+part. Une part des pointages est doublée (double appui sur le badge), et les
+deux appels partent alors sur deux terminaux en même temps. Les appels passent
+par enregistrer_pointage_arrivee / enregistrer_pointage_depart de pointage.db.
+
+Le rapport donne le débit, les percentiles de latence, les attentes de verrou
+relevées dans pg_locks pendant l'exécution et les interblocages comptés par
+pg_stat_database, puis vérifie que pointages et retards ne contiennent ni
+doublon ni ligne perdue. Le code de sortie vaut 1 en cas d'anomalie. Tant
+que pointage.migration_retards n'a pas été appliquée, retards n'a pas de clé
+unique: les doubles appuis en retard y apparaissent en doublon.
+"""
+import argparse
+import json
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, time as heure, timedelta
+
+import psycopg2
+import streamlit as st
+
+from bench.application import charger_app, fermer_app
+from bench.donnees import generer
+from bench.postgres import parametres_dsn, postgres_jetable, reinitialiser_schema
+from pointage.metrics import mesures
+from pointage.rules import calculer_statut_arrivee
+
+# La relève: l'équipe de nuit quitte le service pendant que celle de jour arrive
+RELEVE = (heure(7, 20), heure(8, 10))
+
+
+def _minutes(valeur):
+    return valeur.hour * 60 + valeur.minute
+
+
+def _preparer_nuit(conn, veille):
+    """Rouvre les pointages de la veille de l'équipe de nuit: ils partent pendant le test"""
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute("ALTER TABLE pointages DISABLE TRIGGER USER")
+            cur.execute(
+                """
+                UPDATE pointages pt
+                SET heure_depart = NULL, statut_depart = DEFAULT, depart_avance_minutes = 0, motif_depart_avance = NULL
+                FROM personnels p
+                WHERE p.id = pt.personnel_id AND p.poste = 'Nuit' AND pt.date_pointage = %s
+                RETURNING pt.personnel_id, p.heure_sortie_prevue
+                """,
+                (veille,),
+            )
+            partants = cur.fetchall()
+            cur.execute("ALTER TABLE pointages ENABLE TRIGGER USER")
+    return partants
+
+
+def _arrivants(conn, jour):
+    """Employés de jour attendus aujourd'hui (ni repos simulé ni congé approuvé)"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT p.id, p.heure_entree_prevue FROM personnels p
+            WHERE p.actif AND p.poste = 'Jour'
+            AND NOT EXISTS (SELECT 1 FROM conges c WHERE c.personnel_id = p.id AND c.statut = 'Approuvé'
+                            AND %s BETWEEN c.date_debut AND c.date_fin)
+            ORDER BY p.id
+            """,
+            (jour,),
+        )
+        lignes = cur.fetchall()
+    conn.rollback()
+    return lignes
+
+
+def construire_evenements(arrivants, partants, jour, veille, part_doubles, alea):
+    """Liste (minute simulée, fonction, arguments, attendu) triée par minute.
+
+    `attendu` décrit l'état final que la base doit refléter pour cet employé.
+    """
+    evenements = []
+    for pid, entree in arrivants:
+        arrivee = (datetime.combine(jour, entree) + timedelta(minutes=alea.randint(-20, 35))).time()
+        _, retard, absent = calculer_statut_arrivee(arrivee, entree)
+        attendu = {"sens": "arrivee", "personnel_id": pid, "jour": jour, "heure": arrivee,
+                   "absent": absent, "retard": retard if 0 < retard < 30 else 0}
+        evenements.append((_minutes(arrivee), "enregistrer_pointage_arrivee", (pid, jour, arrivee), attendu))
+    debut_releve, fin_releve = (_minutes(h) for h in RELEVE)
+    for pid, _ in partants:
+        minute = alea.randint(debut_releve, fin_releve)
+        depart = heure(minute // 60, minute % 60)
+        # Un départ de nuit s'inscrit sur le pointage de la veille, comme à l'écran de pointage
+        attendu = {"sens": "depart", "personnel_id": pid, "jour": veille, "heure": depart}
+        evenements.append((_minutes(depart), "enregistrer_pointage_depart", (pid, veille, depart), attendu))
+
+    doubles = [e for e in evenements if alea.random() < part_doubles]
+    evenements.extend(doubles)
+    evenements.sort(key=lambda e: e[0])
+    return evenements, len(doubles)
+
+
+class Surveillance(threading.Thread):
+    """Relève périodiquement les verrous non accordés (pg_locks) sur sa propre connexion"""
+
+    def __init__(self, parametres, intervalle=0.02):
+        super().__init__(daemon=True)
+        self.parametres = parametres
+        self.intervalle = intervalle
+        self.arret = threading.Event()
+        self.releves = 0
+        self.releves_avec_attente = 0
+        self.attente_max = 0
+        self.par_objet = Counter()  # (type de verrou, relation) -> nombre de relevés
+
+    def run(self):
+        conn = psycopg2.connect(**self.parametres)
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                while not self.arret.is_set():
+                    cur.execute(
+                        """
+                        SELECT l.locktype, COALESCE(l.relation::regclass::text, ''), count(*)
+                        FROM pg_locks l
+                        WHERE NOT l.granted AND l.pid <> pg_backend_pid()
+                        GROUP BY 1, 2
+                        """
+                    )
+                    lignes = cur.fetchall()
+                    self.releves += 1
+                    en_attente = sum(n for _, _, n in lignes)
+                    if en_attente:
+                        self.releves_avec_attente += 1
+                        self.attente_max = max(self.attente_max, en_attente)
+                    for type_verrou, relation, n in lignes:
+                        self.par_objet[(type_verrou, relation)] += n
+                    self.arret.wait(self.intervalle)
+        finally:
+            conn.close()
+
+    def rapport(self):
+        return {
+            "releves": self.releves,
+            "part_releves_avec_attente": self.releves_avec_attente / self.releves if self.releves else 0,
+            "sessions_en_attente_max": self.attente_max,
+            "par_objet": [
+                {"type": t, "relation": r, "releves": n} for (t, r), n in self.par_objet.most_common()
+            ],
+        }
+
+
+def _interblocages(parametres):
+    conn = psycopg2.connect(**parametres)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def executer_terminaux(app, evenements, terminaux, duree):
+    """Rejoue les événements sur `terminaux` threads; renvoie les résultats par événement.
+
+    Avec `duree` (secondes), la fenêtre simulée est comprimée dans cette durée et
+    chaque appel attend son heure; sinon les terminaux enchaînent sans pause.
+    """
+    file = queue.Queue()
+    for indice, evenement in enumerate(evenements):
+        file.put((indice, evenement))
+    resultats = [None] * len(evenements)
+    premiere = evenements[0][0] if evenements else 0
+    etendue = max(1, (evenements[-1][0] - premiere) if evenements else 1)
+    debut = time.perf_counter()
+
+    def terminal():
+        while True:
+            try:
+                indice, (minute, nom, args, _) = file.get_nowait()
+            except queue.Empty:
+                return
+            prevu = debut + (minute - premiere) / etendue * duree if duree else debut
+            attente = prevu - time.perf_counter()
+            if attente > 0:
+                time.sleep(attente)
+            depart = time.perf_counter()
+            try:
+                ok, _ = getattr(app, nom)(*args)
+                erreur = None if ok else "refusé"
+            except Exception as e:
+                ok, erreur = False, f"{type(e).__name__}: {e}"
+            fin = time.perf_counter()
+            # Retard de démarrage sur l'heure prévue: signe que les terminaux saturent
+            resultats[indice] = {"ok": ok, "erreur": erreur, "latence": fin - depart,
+                                 "retard_depart": max(0.0, depart - prevu)}
+
+    fils = [threading.Thread(target=terminal, name=f"terminal-{n}") for n in range(terminaux)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    return resultats, time.perf_counter() - debut
+
+
+def verifier_integrite(conn, evenements, resultats):
+    """Doublons et pertes dans pointages, retards et absences; liste de messages (vide si tout va bien)"""
+    anomalies = []
+    with conn.cursor() as cur:
+        for table, colonne in (("pointages", "date_pointage"), ("retards", "date_retard"),
+                               ("absences", "date_absence")):
+            cur.execute(
+                f"""
+                SELECT personnel_id, {colonne}, count(*) FROM {table}
+                GROUP BY personnel_id, {colonne} HAVING count(*) > 1
+                """
+            )
+            for pid, jour, n in cur.fetchall():
+                anomalies.append(f"doublon {table}: personnel {pid} le {jour} ({n} lignes)")
+
+        # État attendu par employé: les doubles appuis portent la même heure
+        attendus = {}
+        for (_, _, _, attendu), resultat in zip(evenements, resultats):
+            if resultat and resultat["ok"]:
+                attendus[(attendu["sens"], attendu["personnel_id"])] = attendu
+
+        for (sens, pid), attendu in sorted(attendus.items()):
+            if sens == "depart":
+                cur.execute("SELECT heure_depart FROM pointages WHERE personnel_id = %s AND date_pointage = %s",
+                            (pid, attendu["jour"]))
+                ligne = cur.fetchone()
+                if ligne is None or ligne[0] != attendu["heure"]:
+                    anomalies.append(f"départ perdu: personnel {pid} ({attendu['heure']}, trouvé {ligne})")
+                continue
+            if attendu["absent"]:
+                cur.execute("SELECT 1 FROM absences WHERE personnel_id = %s AND date_absence = %s",
+                            (pid, attendu["jour"]))
+                if cur.fetchone() is None:
+                    anomalies.append(f"absence perdue: personnel {pid}")
+                continue
+            cur.execute("SELECT heure_arrivee FROM pointages WHERE personnel_id = %s AND date_pointage = %s",
+                        (pid, attendu["jour"]))
+            ligne = cur.fetchone()
+            if ligne is None or ligne[0] != attendu["heure"]:
+                anomalies.append(f"arrivée perdue: personnel {pid} ({attendu['heure']}, trouvé {ligne})")
+            cur.execute("SELECT retard_minutes FROM retards WHERE personnel_id = %s AND date_retard = %s",
+                        (pid, attendu["jour"]))
+            ligne = cur.fetchone()
+            if attendu["retard"] and (ligne is None or ligne[0] != attendu["retard"]):
+                anomalies.append(f"retard perdu: personnel {pid} ({attendu['retard']} min, trouvé {ligne})")
+            elif not attendu["retard"] and ligne is not None:
+                anomalies.append(f"retard en trop: personnel {pid} ({ligne[0]} min)")
+    conn.rollback()
+    return anomalies
+
+
+def _latences(valeurs):
+    if not valeurs:
+        return {}
+    valeurs_ms = [v * 1000 for v in valeurs]
+    if len(valeurs_ms) > 1:
+        centiles = statistics.quantiles(valeurs_ms, n=100, method="inclusive")
+    else:
+        centiles = valeurs_ms * 99
+    return {
+        "moyenne_ms": statistics.fmean(valeurs_ms),
+        "p50_ms": centiles[49],
+        "p95_ms": centiles[94],
+        "p99_ms": centiles[98],
+        "max_ms": max(valeurs_ms),
+    }
+
+
+def executer(parametres, options):
+    reinitialiser_schema(parametres)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    app = charger_app(parametres, connexions_max=options.terminaux + 2)
+    try:
+        if not app.create_tables():
+            raise RuntimeError("create_tables() a échoué")
+        jour = date.today()
+        veille = jour - timedelta(days=1)
+        conn = psycopg2.connect(**parametres)
+        try:
+            # Personne n'a encore pointé aujourd'hui: tout le monde arrive pendant le test
+            volumes = generer(conn, employes=options.employes, jours=options.jours, part_jour_en_cours=0.0,
+                              graine=options.graine)
+            partants = _preparer_nuit(conn, veille)
+            arrivants = _arrivants(conn, jour)
+            alea = random.Random(options.graine)
+            evenements, doubles = construire_evenements(arrivants, partants, jour, veille, options.doubles, alea)
+            print(f"{len(arrivants)} arrivées, {len(partants)} départs, {doubles} doubles appuis, "
+                  f"{options.terminaux} terminaux")
+
+            # Le roster du jour et les caches se construisent avant l'heure de pointe
+            app.assurer_roster_jour()
+            mesures.reinitialiser()
+            interblocages_avant = _interblocages(parametres)
+            surveillance = Surveillance(parametres)
+            surveillance.start()
+            try:
+                resultats, ecoule = executer_terminaux(app, evenements, options.terminaux, options.duree)
+            finally:
+                surveillance.arret.set()
+                surveillance.join()
+            # Les compteurs de pg_stat_database sont publiés avec un délai d'au plus une seconde
+            time.sleep(1.1)
+            interblocages = _interblocages(parametres) - interblocages_avant
+
+            anomalies = verifier_integrite(conn, evenements, resultats)
+        finally:
+            conn.close()
+
+        erreurs = Counter(r["erreur"] for r in resultats if not r["ok"])
+        attente_pool = [ligne.get("attente_connexion_p95", 0) for ligne in mesures.rapport("fonction")
+                        if ligne["nom"].startswith("enregistrer_pointage")]
+        rapport = {
+            "parametres": {
+                "terminaux": options.terminaux, "employes": options.employes, "jours": options.jours,
+                "duree": options.duree, "doubles": options.doubles, "graine": options.graine,
+            },
+            "volumes": volumes,
+            "appels": len(resultats),
+            "reussis": sum(r["ok"] for r in resultats),
+            "erreurs": dict(erreurs),
+            "duree_s": ecoule,
+            "debit_par_s": len(resultats) / ecoule if ecoule else None,
+            "latence": _latences([r["latence"] for r in resultats]),
+            "latence_arrivee": _latences([r["latence"] for (_, nom, _, _), r in zip(evenements, resultats)
+                                          if nom == "enregistrer_pointage_arrivee"]),
+            "latence_depart": _latences([r["latence"] for (_, nom, _, _), r in zip(evenements, resultats)
+                                         if nom == "enregistrer_pointage_depart"]),
+            "retard_depart_p95_ms": _latences([r["retard_depart"] for r in resultats]).get("p95_ms"),
+            "attente_pool_p95_ms": max(attente_pool) * 1000 if attente_pool else None,
+            "verrous": surveillance.rapport(),
+            "interblocages": interblocages,
+            "anomalies": anomalies,
+        }
+        return rapport
+    finally:
+        fermer_app(app)
+
+
+def afficher(rapport):
+    latence = rapport["latence"]
+    print(f"{rapport['appels']} appels en {rapport['duree_s']:.2f} s: {rapport['debit_par_s']:.0f} pointages/s, "
+          f"{rapport['reussis']} réussis")
+    print(f"latence p50 {latence['p50_ms']:.1f} ms, p95 {latence['p95_ms']:.1f} ms, "
+          f"p99 {latence['p99_ms']:.1f} ms, max {latence['max_ms']:.1f} ms")
+    if rapport["attente_pool_p95_ms"] is not None:
+        print(f"attente de connexion p95 {rapport['attente_pool_p95_ms']:.1f} ms")
+    verrous = rapport["verrous"]
+    print(f"attentes de verrou dans {verrous['part_releves_avec_attente']:.0%} des relevés "
+          f"(au plus {verrous['sessions_en_attente_max']} sessions)")
+    for objet in verrous["par_objet"][:5]:
+        print(f"  {objet['type']:14s} {objet['relation'] or '-':24s} {objet['releves']}")
+    print(f"interblocages: {rapport['interblocages']}")
+    for erreur, n in rapport["erreurs"].items():
+        print(f"  ⚠ {n} × {erreur}")
+    if rapport["anomalies"]:
+        print(f"⚠ {len(rapport['anomalies'])} anomalie(s) d'intégrité:")
+        for message in rapport["anomalies"][:20]:
+            print(f"  {message}")
+    else:
+        print("intégrité: aucun doublon ni pointage perdu")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charge du changement d'équipe sur les fonctions de pointage")
+    parser.add_argument("--terminaux", type=int, default=20, help="nombre de terminaux simultanés")
+    parser.add_argument("--employes", type=int, default=600)
+    parser.add_argument("--jours", type=int, default=30, help="profondeur de l'historique généré")
+    parser.add_argument("--duree", type=float, default=0,
+                        help="secondes réelles pour la fenêtre simulée (0: sans pause, débit maximal)")
+    parser.add_argument("--doubles", type=float, default=0.05, help="part des pointages doublés")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--dsn", help="base existante À SACRIFIER (schéma public recréé); sinon cluster jetable")
+    parser.add_argument("--sortie", help="fichier JSON du rapport")
+    options = parser.parse_args(argv)
+
+    if options.dsn:
+        rapport = executer(parametres_dsn(options.dsn), options)
+    else:
+        with postgres_jetable() as parametres:
+            rapport = executer(parametres, options)
+
+    afficher(rapport)
+    if options.sortie:
+        with open(options.sortie, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False, default=str)
+        print(f"Rapport écrit dans {options.sortie}")
+    return 1 if rapport["anomalies"] or rapport["interblocages"] or rapport["erreurs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Comparaison de deux exécutions de bench.run (médianes par fonction et par échelle).
+
+    python -m bench.comparer avant.json apres.json --seuil 1.2
+
+Le code de sortie vaut 1 si une fonction ralentit au-delà du seuil, pour
+pouvoir bloquer une intégration continue.
+"""
+import argparse
+import json
+import sys
+
+
+def comparer(avant, apres, seuil=1.2, plancher_ms=1.0):
+    """Lignes (echelle, fonction, avant_ms, apres_ms, rapport, regression)"""
+    lignes = []
+    for echelle, resultats in apres["echelles"].items():
+        reference = avant["echelles"].get(echelle)
+        if reference is None:
+            continue
+        for fonction, mesure in resultats["fonctions"].items():
+            ancienne = reference["fonctions"].get(fonction, {})
+            if "mediane_ms" not in mesure or "mediane_ms" not in ancienne:
+                continue
+            rapport = mesure["mediane_ms"] / ancienne["mediane_ms"] if ancienne["mediane_ms"] else None
+            # En dessous du plancher, les écarts relèvent du bruit de mesure
+            regression = (rapport is not None and rapport > seuil
+                          and mesure["mediane_ms"] - ancienne["mediane_ms"] > plancher_ms)
+            lignes.append((echelle, fonction, ancienne["mediane_ms"], mesure["mediane_ms"], rapport, regression))
+    return lignes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare deux fichiers de résultats de bench.run")
+    parser.add_argument("avant")
+    parser.add_argument("apres")
+    parser.add_argument("--seuil", type=float, default=1.2, help="rapport apres/avant signalé comme régression")
+    parser.add_argument("--plancher-ms", type=float, default=1.0, help="écart absolu minimal pour signaler")
+    options = parser.parse_args(argv)
+
+    with open(options.avant, encoding="utf-8") as f:
+        avant = json.load(f)
+    with open(options.apres, encoding="utf-8") as f:
+        apres = json.load(f)
+
+    print(f"{avant['meta'].get('commit')} → {apres['meta'].get('commit')}")
+    lignes = comparer(avant, apres, options.seuil, options.plancher_ms)
+    for echelle, fonction, avant_ms, apres_ms, rapport, regression in lignes:
+        marque = "  ⚠ régression" if regression else ""
+        texte_rapport = "   n/a" if rapport is None else f"{rapport:5.2f}x"
+        print(f"{echelle:10s} {fonction:32s} {avant_ms:9.1f} → {apres_ms:9.1f} ms  {texte_rapport}{marque}")
+    return 1 if any(l[5] for l in lignes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Temps de démarrage: import de app.py et premier rendu de la page de connexion.
+
+    python -m bench.demarrage --reference HEAD~1
+    python -m bench.demarrage --repetitions 10 --dsn "host=localhost dbname=bench_jetable"
+
+Chaque mesure se fait dans un processus neuf (démarrage à froid), pour l'arbre
+courant et, avec --reference, pour une révision git extraite dans un
+worktree temporaire. Trois mesures:
+
+- streamlit: import de streamlit seul, la base commune incompressible;
+- import: `import app` (script chargé sans exécuter main());
+- connexion: premier rendu de app.py par streamlit.testing (pool, schéma,
+  page de connexion), puis une réexécution, comme au clic suivant.
+
+Les modules lourds présents après chaque mesure sont relevés, pour vérifier
+qu'une page sans graphique ne charge pas plotly.express.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from bench.postgres import parametres_dsn, postgres_jetable
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans un processus neuf, dont le répertoire courant porte .streamlit/secrets.toml
+MESURE = r"""
+import json, sys, time
+debut = time.perf_counter()
+racine, mode = sys.argv[1], sys.argv[2]
+sys.path.insert(0, racine)
+resultat = {}
+if mode == "streamlit":
+    import streamlit
+elif mode == "import":
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    import app
+else:
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(racine + "/app.py", default_timeout=120)
+    at.run()
+    resultat["erreurs"] = [e.value for e in at.error] + [str(e.value) for e in at.exception]
+    resultat["premier_rendu"] = time.perf_counter() - debut
+    reprise = time.perf_counter()
+    at.run()
+    resultat["reexecution"] = time.perf_counter() - reprise
+resultat["duree"] = time.perf_counter() - debut
+resultat["modules"] = sorted(m for m in ("plotly.express", "PIL.Image", "pyarrow", "pandas") if m in sys.modules)
+print(json.dumps(resultat))
+"""
+
+MODES = ["streamlit", "import", "connexion"]
+
+
+def _secrets(dossier, parametres):
+    os.makedirs(os.path.join(dossier, ".streamlit"), exist_ok=True)
+    with open(os.path.join(dossier, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write("[postgres]\n")
+        f.write(f'host = "{parametres["host"]}"\n')
+        f.write(f'port = {int(parametres.get("port", 5432))}\n')
+        f.write(f'dbname = "{parametres["database"]}"\n')
+        f.write(f'user = "{parametres["user"]}"\n')
+        f.write(f'password = "{parametres.get("password", "")}"\n')
+
+
+def mesurer(racine, mode, dossier):
+    sortie = subprocess.run([sys.executable, "-c", MESURE, racine, mode], cwd=dossier,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def _resume(valeurs):
+    valeurs_ms = sorted(v * 1000 for v in valeurs)
+    return {"mediane_ms": statistics.median(valeurs_ms), "min_ms": valeurs_ms[0], "max_ms": valeurs_ms[-1]}
+
+
+def mesurer_arbre(racine, parametres, repetitions):
+    resultats = {}
+    with tempfile.TemporaryDirectory(prefix="pointage-demarrage-") as dossier:
+        _secrets(dossier, parametres)
+        for mode in MODES:
+            essais = [mesurer(racine, mode, dossier) for _ in range(repetitions)]
+            resultats[mode] = {"duree": _resume([e["duree"] for e in essais]), "modules": essais[-1]["modules"]}
+            if mode == "connexion":
+                resultats[mode]["premier_rendu"] = _resume([e["premier_rendu"] for e in essais])
+                resultats[mode]["reexecution"] = _resume([e["reexecution"] for e in essais])
+                resultats[mode]["erreurs"] = essais[-1]["erreurs"]
+    return resultats
+
+
+@contextmanager
+def worktree(revision):
+    """Extraction temporaire de `revision` (git worktree), supprimée à la sortie"""
+    dossier = tempfile.mkdtemp(prefix="pointage-reference-")
+    subprocess.run(["git", "worktree", "add", "--detach", dossier, revision], cwd=RACINE,
+                   check=True, capture_output=True)
+    try:
+        yield dossier
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", dossier], cwd=RACINE, capture_output=True)
+
+
+def afficher(nom, resultats):
+    print(nom)
+    for mode in MODES:
+        resultat = resultats[mode]
+        ligne = f"  {mode:10s} {resultat['duree']['mediane_ms']:8.0f} ms"
+        if mode == "connexion":
+            ligne += (f"  (premier rendu {resultat['premier_rendu']['mediane_ms']:.0f} ms,"
+                      f" réexécution {resultat['reexecution']['mediane_ms']:.0f} ms)")
+        print(ligne + f"  [{', '.join(resultat['modules'])}]")
+        for erreur in resultat.get("erreurs", []):
+            print(f"    ⚠ {erreur}")
+
+
+def executer(parametres, options):
+    resultats = {"courant": mesurer_arbre(RACINE, parametres, options.repetitions)}
+    if options.reference:
+        with worktree(options.reference) as dossier:
+            resultats[options.reference] = mesurer_arbre(dossier, parametres, options.repetitions)
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import et de premier rendu de la page de connexion")
+    parser.add_argument("--reference", help="révision git à mesurer aussi, pour comparaison (ex. HEAD~1)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--dsn", help="base existante À SACRIFIER (schéma créé par l'application); sinon cluster jetable")
+    parser.add_argument("--sortie", help="fichier JSON des résultats")
+    options = parser.parse_args(argv)
+
+    if options.dsn:
+        resultats = executer(parametres_dsn(options.dsn), options)
+    else:
+        with postgres_jetable() as parametres:
+            resultats = executer(parametres, options)
+
+    for nom, resultat in resultats.items():
+        afficher(nom, resultat)
+    if options.sortie:
+        with open(options.sortie, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"Résultats écrits dans {options.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
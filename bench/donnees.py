@@ -0,0 +1,155 @@
+"""Génération de données synthétiques de clinique, reproductible par graine.
+
+Les volumes suivent le fonctionnement d'un établissement: services de jour et
+de nuit, deux jours de repos par semaine, quelques pour-cent de retards et
+d'absences, des congés de une à deux semaines. Les lignes sont chargées par
+COPY, triggers applicatifs désactivés (roster, notifications, versions), puis
+les statistiques du planificateur sont recalculées.
+"""
+import io
+import random
+from datetime import date, datetime, time, timedelta
+
+SERVICES = [
+    "Urgence", "Radiologie", "Maternité", "Reception", "Administration",
+    "Bloc opératoire", "Pédiatrie", "Cardiologie", "Laboratoire", "Réanimation",
+]
+
+HORAIRES = {
+    "Jour": [(time(7, 30), time(15, 30)), (time(8, 0), time(16, 0)), (time(9, 0), time(17, 0))],
+    "Nuit": [(time(20, 0), time(4, 0)), (time(21, 0), time(5, 0))],
+}
+
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+        "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier"]
+PRENOMS = ["Jean", "Marie", "Pierre", "Sophie", "Luc", "Nadia", "Karim", "Julie", "Yasmine", "Paul",
+           "Claire", "Omar", "Inès", "Hugo", "Sarah", "Mehdi", "Emma", "Louis", "Amina", "Lucas"]
+
+TYPES_CONGE = ["Congé annuel", "Congé maladie", "Congé maternité", "Congé sans solde"]
+MOTIFS_RETARD = [None, "Transport", "Embouteillage", "Raison familiale", "Rendez-vous médical"]
+
+# Échelles prédéfinies: nombre d'employés et profondeur d'historique (jours)
+ECHELLES = {
+    "petite": {"employes": 50, "jours": 90},
+    "moyenne": {"employes": 300, "jours": 365},
+    "grande": {"employes": 1000, "jours": 3 * 365},
+}
+
+TABLES = ["personnels", "conges", "pointages", "retards", "absences"]
+
+
+def _decaler(heure, minutes):
+    return (datetime.combine(date.today(), heure) + timedelta(minutes=minutes)).time()
+
+
+def _copier(cur, table, colonnes, lignes):
+    tampon = io.StringIO()
+    for ligne in lignes:
+        tampon.write("\t".join("\\N" if v is None else str(v) for v in ligne))
+        tampon.write("\n")
+    tampon.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(colonnes)}) FROM STDIN", tampon)
+
+
+def generer(conn, employes=50, jours=90, services=len(SERVICES), part_nuit=0.3,
+            taux_absence=0.03, taux_retard=0.08, conges_par_an=3, part_jour_en_cours=0.6,
+            graine=42, fin=None):
+    """Remplace le contenu des tables de `conn` et renvoie le nombre de lignes par table.
+
+    L'historique couvre les `jours` jours précédant `fin` (aujourd'hui par
+    défaut); le jour `fin` lui-même est en cours: `part_jour_en_cours` des
+    employés de jour ont déjà pointé leur arrivée.
+    """
+    alea = random.Random(graine)
+    fin = fin or date.today()
+    debut = fin - timedelta(days=jours)
+    services = SERVICES[:services]
+
+    personnels = []
+    for i in range(1, employes + 1):
+        poste = "Nuit" if alea.random() < part_nuit else "Jour"
+        entree, sortie = alea.choice(HORAIRES[poste])
+        repos = set(alea.sample(range(7), 2))
+        personnels.append((i, alea.choice(NOMS), alea.choice(PRENOMS), alea.choice(services), poste,
+                           entree, sortie, repos))
+
+    conges, jours_conge = [], set()
+    conge_id = 0
+    for pid, *_ in personnels:
+        for _ in range(max(1, round(conges_par_an * jours / 365))):
+            conge_id += 1
+            premier = debut + timedelta(days=alea.randrange(jours + 30))
+            dernier = premier + timedelta(days=alea.randint(1, 14))
+            statut = alea.choices(["Approuvé", "En attente", "Rejeté"], [0.7, 0.15, 0.15])[0]
+            conges.append((conge_id, pid, premier, dernier, alea.choice(TYPES_CONGE), None, statut))
+            if statut == "Approuvé":
+                jours_conge.update((pid, premier + timedelta(days=n)) for n in range((dernier - premier).days + 1))
+
+    pointages, retards, absences = [], [], []
+    for n in range(jours + 1):
+        jour = debut + timedelta(days=n)
+        for pid, _, _, _, poste, entree, sortie, repos in personnels:
+            if jour.weekday() in repos or (pid, jour) in jours_conge:
+                continue
+            if jour == fin and (poste == "Nuit" or alea.random() >= part_jour_en_cours):
+                continue
+            if alea.random() < taux_absence:
+                absences.append((pid, jour, "Absence non justifiée" if alea.random() < 0.6 else "Maladie",
+                                 alea.random() < 0.4))
+                continue
+            tirage = alea.random()
+            if tirage < taux_retard:
+                retard = alea.randint(1, 29)
+                arrivee, statut = _decaler(entree, retard - 5), "En retard"
+                retards.append((pid, jour, retard, alea.choice(MOTIFS_RETARD)))
+            elif tirage < taux_retard + 0.05:
+                retard, arrivee, statut = 0, _decaler(entree, -alea.randint(16, 40)), "En avance"
+            else:
+                retard, arrivee, statut = 0, _decaler(entree, -alea.randint(5, 15)), "Présent à l'heure"
+            if jour == fin:
+                depart, statut_depart, avance = None, "Present", 0
+            elif alea.random() < 0.05:
+                avance = alea.randint(10, 90)
+                depart, statut_depart = _decaler(sortie, -avance), "Départ anticipé"
+            else:
+                avance = 0
+                depart, statut_depart = _decaler(sortie, alea.randint(0, 20)), "Present"
+            pointages.append((pid, jour, arrivee, depart, statut, statut_depart, retard, avance,
+                              retards[-1][3] if retard else None))
+
+    with conn:
+        with conn.cursor() as cur:
+            for table in TABLES:
+                cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+            # create_tables() insère un personnel d'exemple: repartir de tables vides
+            cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            _copier(cur, "personnels",
+                    ["id", "nom", "prenom", "service", "poste", "heure_entree_prevue", "heure_sortie_prevue"],
+                    [p[:7] for p in personnels])
+            _copier(cur, "conges", ["id", "personnel_id", "date_debut", "date_fin", "type_conge", "motif", "statut"],
+                    conges)
+            _copier(cur, "pointages",
+                    ["personnel_id", "date_pointage", "heure_arrivee", "heure_depart", "statut_arrivee",
+                     "statut_depart", "retard_minutes", "depart_avance_minutes", "motif_retard"],
+                    pointages)
+            _copier(cur, "retards", ["personnel_id", "date_retard", "retard_minutes", "motif"], retards)
+            _copier(cur, "absences", ["personnel_id", "date_absence", "motif", "justifie"], absences)
+            for table in TABLES:
+                cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+            # Les identifiants explicites ne font pas avancer les séquences
+            for table in ("personnels", "conges"):
+                cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+    finally:
+        conn.autocommit = False
+
+    return {
+        "personnels": len(personnels),
+        "conges": len(conges),
+        "pointages": len(pointages),
+        "retards": len(retards),
+        "absences": len(absences),
+    }
@@ -0,0 +1,122 @@
+"""PostgreSQL jetable pour les mesures: initdb dans un répertoire temporaire,
+et au besoin une réplique en flux (pg_basebackup).
+
+initdb refuse de s'exécuter en root: lancer les mesures avec un compte
+ordinaire, ou fournir une base existante avec --dsn.
+"""
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+import psycopg2.extensions
+
+
+def repertoire_binaires():
+    """Répertoire contenant initdb et pg_ctl (PATH, pg_config, puis /usr/lib/postgresql)"""
+    initdb = shutil.which("initdb")
+    if initdb:
+        return os.path.dirname(initdb)
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        bindir = subprocess.run([pg_config, "--bindir"], capture_output=True, text=True).stdout.strip()
+        if os.path.exists(os.path.join(bindir, "initdb")):
+            return bindir
+    candidats = sorted(glob.glob("/usr/lib/postgresql/*/bin/initdb"), key=lambda c: int(c.split("/")[4]))
+    if candidats:
+        return os.path.dirname(candidats[-1])
+    raise RuntimeError("initdb introuvable: installer PostgreSQL ou utiliser --dsn")
+
+
+def _port_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def postgres_jetable(options=None):
+    """Démarre un cluster temporaire et renvoie les paramètres de connexion; tout est supprimé à la sortie.
+
+    `options`: paramètres serveur supplémentaires, par ex. {"shared_buffers": "256MB"}.
+    """
+    bindir = repertoire_binaires()
+    dossier = tempfile.mkdtemp(prefix="pointage-bench-")
+    donnees = os.path.join(dossier, "donnees")
+    port = _port_libre()
+    subprocess.run(
+        [os.path.join(bindir, "initdb"), "-D", donnees, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    arguments = f"-p {port} -k {dossier} -c listen_addresses=''"
+    for nom, valeur in (options or {}).items():
+        arguments += f" -c {nom}={valeur}"
+    pg_ctl = os.path.join(bindir, "pg_ctl")
+    subprocess.run(
+        [pg_ctl, "-D", donnees, "-l", os.path.join(dossier, "postgres.log"), "-w", "-o", arguments, "start"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    try:
+        yield {"host": dossier, "port": port, "database": "postgres", "user": "postgres", "password": ""}
+    finally:
+        subprocess.run([pg_ctl, "-D", donnees, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+@contextmanager
+def replique_jetable(primaire):
+    """Réplique physique en flux du cluster `primaire` (paramètres de postgres_jetable), démarrée à côté.
+
+    Renvoie ses paramètres de connexion et une fonction qui l'arrête, pour
+    simuler une panne; tout est supprimé à la sortie.
+    """
+    bindir = repertoire_binaires()
+    dossier = tempfile.mkdtemp(prefix="pointage-replique-")
+    donnees = os.path.join(dossier, "donnees")
+    port = _port_libre()
+    # -R: standby.signal et primary_conninfo écrits dans la copie
+    subprocess.run(
+        [os.path.join(bindir, "pg_basebackup"), "-h", str(primaire["host"]), "-p", str(primaire["port"]),
+         "-U", primaire["user"], "-D", donnees, "-R", "-X", "stream", "--no-sync"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    pg_ctl = os.path.join(bindir, "pg_ctl")
+    subprocess.run(
+        [pg_ctl, "-D", donnees, "-l", os.path.join(dossier, "postgres.log"), "-w",
+         "-o", f"-p {port} -k {dossier} -c listen_addresses=''", "start"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    def arreter():
+        subprocess.run([pg_ctl, "-D", donnees, "-m", "fast", "-w", "stop"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        yield {"host": dossier, "port": port, "database": primaire["database"], "user": primaire["user"],
+               "password": primaire.get("password", "")}, arreter
+    finally:
+        arreter()
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def parametres_dsn(dsn):
+    """Paramètres de connexion d'une chaîne DSN libpq ("host=... dbname=...")"""
+    parametres = psycopg2.extensions.parse_dsn(dsn)
+    if "dbname" in parametres:
+        parametres["database"] = parametres.pop("dbname")
+    return parametres
+
+
+def reinitialiser_schema(parametres):
+    """Vide la base: le schéma public est supprimé puis recréé"""
+    conn = psycopg2.connect(**parametres)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("DROP SCHEMA IF EXISTS public CASCADE")
+            cur.execute("CREATE SCHEMA public")
+    finally:
+        conn.close()
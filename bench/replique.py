@@ -0,0 +1,181 @@
+"""Routage des rapports vers une réplique: vérification sur deux instances locales.
+
+    python -m bench.replique
+    python -m bench.replique --dsn "host=/tmp/pg1 port=5432 dbname=essai" --dsn-replique "host=/tmp/pg2 port=5433 dbname=essai"
+
+Sans DSN, démarre un primaire jetable et sa réplique en flux (pg_basebackup
+-R). Avec --dsn, la base du primaire est À SACRIFIER (schéma recréé) et
+--dsn-replique doit désigner une réplique physique de ce primaire. Les
+rapports passent par pointage.db et le routage de pointage.replique:
+
+1. un rapport est servi par la réplique et y voit les écritures du primaire;
+2. une session qui vient d'écrire relit sur le primaire;
+3. rejeu suspendu (pg_wal_replay_pause) au-delà du retard toléré: les rapports
+   reviennent au primaire, puis à la réplique après la reprise;
+4. réplique arrêtée (instances jetables seulement): les rapports restent
+   justes, lus sur le primaire.
+
+Le code de sortie vaut 1 si une vérification échoue.
+"""
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, time as heure
+
+import psycopg2
+import streamlit as st
+
+import config
+from bench.application import charger_app, fermer_app
+from bench.postgres import parametres_dsn, postgres_jetable, reinitialiser_schema, replique_jetable
+from pointage.replique import routage
+
+# Réglages resserrés pour que le scénario tienne en quelques secondes
+RETARD_MAX_S = 2.0
+VERIFICATION_S = 0.5
+
+
+def attendre_rejeu(primaire, replique, delai=30):
+    """Attend que la réplique ait rejoué tout le WAL écrit jusqu'ici par le primaire"""
+    conn = psycopg2.connect(**primaire)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_current_wal_lsn()")
+            lsn = cur.fetchone()[0]
+    finally:
+        conn.close()
+    limite = time.monotonic() + delai
+    conn = psycopg2.connect(**replique)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            while True:
+                cur.execute("SELECT pg_wal_lsn_diff(pg_last_wal_replay_lsn(), %s) >= 0", (lsn,))
+                if cur.fetchone()[0]:
+                    return
+                if time.monotonic() > limite:
+                    raise RuntimeError(f"la réplique n'a pas rejoué {lsn} en {delai} s")
+                time.sleep(0.05)
+    finally:
+        conn.close()
+
+
+def executer_sql(parametres, requete, params=None):
+    conn = psycopg2.connect(**parametres)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(requete, params)
+    finally:
+        conn.close()
+
+
+def lire_rapports(app, jour):
+    """Deux rapports (lecture psycopg2 et lecture async), caches vidés, et les emprunts de connexion par destination"""
+    st.cache_data.clear()
+    app.cache_lectures.vider()
+    avant = dict(routage.compteurs)
+    stats = app.get_stats_mensuelles()
+    presents = int(stats["jours_presents"].sum()) if not stats.empty else None
+    total = app.compter_periode("pointages", jour, jour)
+    destinations = {cle: n - avant.get(cle, 0) for cle, n in routage.compteurs.items() if n != avant.get(cle, 0)}
+    return presents, total, destinations
+
+
+class Verifications:
+    def __init__(self):
+        self.echecs = 0
+
+    def __call__(self, nom, condition, detail):
+        print(f"  {'✓' if condition else '✗'} {nom}: {detail}")
+        self.echecs += not condition
+
+
+def scenario(primaire, replique, arreter_replique=None):
+    verifier = Verifications()
+    app = charger_app(primaire, replique=replique)
+    try:
+        if not app.create_tables():
+            raise RuntimeError("create_tables() a échoué")
+        jour = date.today()
+        conn = psycopg2.connect(**primaire)
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM personnels ORDER BY id LIMIT 3")
+            employes = [ligne[0] for ligne in cur.fetchall()]
+        conn.close()
+        routage.reprendre_session(None)
+
+        print("1. Rapport servi par la réplique")
+        executer_sql(primaire, "INSERT INTO pointages (personnel_id, date_pointage, heure_arrivee) VALUES (%s, %s, %s)",
+                     (employes[0], jour, heure(7, 50)))
+        attendre_rejeu(primaire, replique)
+        presents, total, destinations = lire_rapports(app, jour)
+        verifier("destination", set(destinations) == {"réplique"}, destinations)
+        verifier("écriture du primaire visible", (presents, total) == (1, 1), f"présents {presents}, total {total}")
+
+        print("2. Lecture après écriture de la session")
+        routage.marquer_ecriture()
+        presents, total, destinations = lire_rapports(app, jour)
+        verifier("destination", set(destinations) == {"primaire: écriture récente"}, destinations)
+        routage.reprendre_session(None)
+
+        print(f"3. Rejeu suspendu au-delà de {RETARD_MAX_S:.0f} s")
+        executer_sql(replique, "SELECT pg_wal_replay_pause()")
+        executer_sql(primaire, "INSERT INTO pointages (personnel_id, date_pointage, heure_arrivee) VALUES (%s, %s, %s)",
+                     (employes[1], jour, heure(7, 52)))
+        time.sleep(RETARD_MAX_S + VERIFICATION_S + 0.5)
+        presents, total, destinations = lire_rapports(app, jour)
+        verifier("destination", set(destinations) == {"primaire: réplique en retard"}, destinations)
+        verifier("données à jour", total == 2, f"total {total}")
+        executer_sql(replique, "SELECT pg_wal_replay_resume()")
+        attendre_rejeu(primaire, replique)
+        time.sleep(VERIFICATION_S + 0.1)
+        presents, total, destinations = lire_rapports(app, jour)
+        verifier("retour sur la réplique", set(destinations) == {"réplique"}, destinations)
+        verifier("données rejouées", total == 2, f"total {total}")
+
+        if arreter_replique is not None:
+            print("4. Réplique arrêtée")
+            arreter_replique()
+            time.sleep(VERIFICATION_S + 0.1)
+            presents, total, destinations = lire_rapports(app, jour)
+            verifier("destination", set(destinations) == {"primaire: réplique injoignable"}, destinations)
+            verifier("rapports justes", (presents, total) == (2, 2), f"présents {presents}, total {total}")
+        print(f"État du routage: {routage.etat()}")
+    finally:
+        fermer_app(app)
+    return verifier.echecs
+
+
+@contextmanager
+def instances_jetables():
+    with postgres_jetable() as primaire:
+        with replique_jetable(primaire) as (replique, arreter):
+            yield primaire, replique, arreter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Routage des rapports vers une réplique, sur deux instances locales")
+    parser.add_argument("--dsn", help="primaire existant, base À SACRIFIER (avec --dsn-replique)")
+    parser.add_argument("--dsn-replique", help="réplique physique du primaire --dsn")
+    options = parser.parse_args(argv)
+    if bool(options.dsn) != bool(options.dsn_replique):
+        parser.error("--dsn et --dsn-replique vont ensemble")
+
+    config.REPLIQUE_RETARD_MAX_S = RETARD_MAX_S
+    config.REPLIQUE_VERIFICATION_S = VERIFICATION_S
+    st.cache_resource.clear()
+    if options.dsn:
+        primaire = parametres_dsn(options.dsn)
+        reinitialiser_schema(primaire)
+        echecs = scenario(primaire, parametres_dsn(options.dsn_replique))
+    else:
+        with instances_jetables() as (primaire, replique, arreter):
+            echecs = scenario(primaire, replique, arreter)
+    print("OK" if not echecs else f"{echecs} vérification(s) en échec")
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
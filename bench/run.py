@@ -0,0 +1,277 @@
+"""Mesure de chaque fonction d'accès aux données de pointage.db, à plusieurs échelles.
+
+    python -m bench.run --echelles petite,moyenne,grande --repetitions 5 --sortie resultats.json
+    python -m bench.run --echelles 200x180 --dsn "host=localhost dbname=bench_jetable"
+
+Pour chaque échelle, la base est vidée, le schéma créé par create_tables(),
+puis remplie par bench.donnees.generer(). Les lectures sont mesurées d'abord,
+caches vidés avant chaque répétition (sauf --avec-cache), puis les écritures,
+chacune sur un employé différent. Le JSON produit se compare avec
+`python -m bench.comparer`.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as heure, timedelta
+from pathlib import Path
+
+import psycopg2
+import streamlit as st
+
+from bench.application import charger_app, fermer_app
+from bench.donnees import ECHELLES, generer
+from bench.postgres import parametres_dsn, postgres_jetable, reinitialiser_schema
+from pointage.metrics import mesures
+
+RACINE = Path(__file__).resolve().parent.parent
+
+# (fonction, arguments(contexte)) — les lectures d'abord, les écritures ensuite
+LECTURES = [
+    ("get_personnel", lambda c: ()),
+    ("get_services_disponibles", lambda c: ()),
+    ("get_personnel_par_service", lambda c: ()),
+    ("get_all_users", lambda c: ()),
+    ("authenticate_user", lambda c: ("admin", "admin123")),
+    ("get_pointage_employe_jour", lambda c: (c["employe"], c["jour"])),
+    ("est_en_conge", lambda c: (c["employe"], c["jour"])),
+    ("verifier_disponibilite_conge", lambda c: (c["employe"], c["jour"] + timedelta(days=60), c["jour"] + timedelta(days=65))),
+    ("get_pointages_du_jour", lambda c: ()),
+    ("get_absences_du_jour", lambda c: ()),
+    ("get_conges_en_cours", lambda c: ()),
+    ("get_presence", lambda c: ()),
+    ("get_stats_mensuelles", lambda c: ()),
+    ("get_analyse_retards", lambda c: (c["il_y_a_90"], c["jour"])),
+    ("get_stats_absences", lambda c: (c["il_y_a_90"], c["jour"])),
+    ("get_pointages_page", lambda c: (c["il_y_a_30"], c["jour"])),
+    ("get_retards_page", lambda c: (c["il_y_a_30"], c["jour"])),
+    ("get_absences_page", lambda c: (c["il_y_a_30"], c["jour"])),
+    ("get_conges_page", lambda c: ()),
+    ("compter_periode", lambda c: ("pointages", c["il_y_a_30"], c["jour"])),
+    ("compter_conges", lambda c: ("En attente",)),
+    ("get_conges_employe", lambda c: (c["employe"],)),
+    ("get_tous_les_conges", lambda c: ()),
+    ("exporter_pointages_periode", lambda c: (c["il_y_a_30"], c["jour"], "csv", c["fichier_export"])),
+]
+
+ECRITURES = [
+    ("enregistrer_pointage_arrivee", lambda c: (c["libres"].pop(), c["jour"], heure(7, 50))),
+    ("enregistrer_pointage_depart", lambda c: (c["presents"].pop(), c["jour"], heure(16, 5))),
+    ("enregistrer_absence", lambda c: (c["libres"].pop(), c["jour"], "Absence non justifiée")),
+    ("demander_conge", lambda c: (c["libres"].pop(), c["jour"] + timedelta(days=90), c["jour"] + timedelta(days=95),
+                                  "Congé annuel", "bench")),
+    ("modifier_statut_conge", lambda c: (c["conges_en_attente"].pop(), "Approuvé")),
+    ("marquer_absence_automatique", lambda c: ()),
+    ("ajouter_personnel", lambda c: ("Bench", "Employé", "Urgence", "Jour", heure(8, 0), heure(16, 0))),
+    ("create_user", lambda c: (f"bench_{time.perf_counter_ns()}", "motdepasse", "user", None)),
+]
+
+
+def _percentile(valeurs, rang):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, max(0, round(rang / 100 * len(valeurs)) - 1))]
+
+
+def _contexte(conn, jour, fichier_export):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT personnel_id FROM pointages WHERE date_pointage = %s AND heure_depart IS NULL ORDER BY personnel_id",
+            (jour,),
+        )
+        presents = [r[0] for r in cur.fetchall()]
+        cur.execute(
+            """
+            SELECT p.id FROM personnels p
+            WHERE p.actif AND p.poste = 'Jour'
+            AND NOT EXISTS (SELECT 1 FROM pointages pt WHERE pt.personnel_id = p.id AND pt.date_pointage = %s)
+            AND NOT EXISTS (SELECT 1 FROM absences a WHERE a.personnel_id = p.id AND a.date_absence = %s)
+            AND NOT EXISTS (SELECT 1 FROM conges c WHERE c.personnel_id = p.id AND c.statut = 'Approuvé'
+                            AND %s BETWEEN c.date_debut AND c.date_fin)
+            ORDER BY p.id
+            """,
+            (jour, jour, jour),
+        )
+        libres = [r[0] for r in cur.fetchall()]
+        cur.execute("SELECT id FROM conges WHERE statut = 'En attente' ORDER BY id")
+        conges_en_attente = [r[0] for r in cur.fetchall()]
+    conn.rollback()
+    return {
+        "jour": jour,
+        "il_y_a_30": jour - timedelta(days=30),
+        "il_y_a_90": jour - timedelta(days=90),
+        "employe": presents[0] if presents else 1,
+        "presents": presents[1:],
+        "libres": libres,
+        "conges_en_attente": conges_en_attente,
+        "fichier_export": fichier_export,
+    }
+
+
+def _vider_caches(app):
+    st.cache_data.clear()
+    app.cache_lectures.vider()
+    app.presence.invalider()
+    # Le roster du jour est construit une fois par jour: hors mesure
+    app.assurer_roster_jour()
+
+
+def mesurer_fonction(app, nom, arguments, contexte, repetitions, avec_cache):
+    fonction = getattr(app, nom, None)
+    if fonction is None:
+        return {"absente": True}
+    durees, durees_bd, lignes, erreurs = [], [], 0, 0
+    for _ in range(repetitions):
+        try:
+            args = arguments(contexte)
+        except IndexError:
+            break  # plus d'employé disponible pour cette écriture
+        if not avec_cache:
+            _vider_caches(app)
+        with mesures.mesurer("bench", nom) as appel:
+            debut = time.perf_counter()
+            try:
+                fonction(*args)
+            except Exception:
+                appel.erreurs += 1
+            durees.append(time.perf_counter() - debut)
+        durees_bd.append(appel.duree_bd)
+        lignes = appel.lignes
+        erreurs += appel.erreurs
+    if not durees:
+        return {"repetitions": 0}
+    return {
+        "repetitions": len(durees),
+        "min_ms": min(durees) * 1000,
+        "mediane_ms": _percentile(durees, 50) * 1000,
+        "p95_ms": _percentile(durees, 95) * 1000,
+        "max_ms": max(durees) * 1000,
+        "bd_mediane_ms": _percentile(durees_bd, 50) * 1000,
+        "lignes": lignes,
+        "erreurs": erreurs,
+    }
+
+
+def _echelle(nom):
+    if nom in ECHELLES:
+        return dict(ECHELLES[nom])
+    employes, _, jours = nom.partition("x")
+    return {"employes": int(employes), "jours": int(jours)}
+
+
+def mesurer_echelle(parametres, nom, options):
+    echelle = _echelle(nom)
+    reinitialiser_schema(parametres)
+    # Les installations mises en cache par processus (triggers, roster) visaient l'ancien schéma
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    app = charger_app(parametres)
+    try:
+        if not app.create_tables():
+            raise RuntimeError("create_tables() a échoué")
+        if options.avec_cache:
+            app.versions_tables.configurer(app._lire_versions_tables, lambda: False)
+
+        conn = psycopg2.connect(**parametres)
+        try:
+            debut = time.perf_counter()
+            volumes = generer(conn, graine=options.graine, **echelle)
+            generation = time.perf_counter() - debut
+            fichier_export = tempfile.NamedTemporaryFile(suffix=".csv", delete=False).name
+            contexte = _contexte(conn, date.today(), fichier_export)
+        finally:
+            conn.close()
+
+        fonctions = {}
+        try:
+            for nom_fonction, arguments in LECTURES + ECRITURES:
+                if options.fonctions and not any(f in nom_fonction for f in options.fonctions):
+                    continue
+                fonctions[nom_fonction] = resultat = mesurer_fonction(
+                    app, nom_fonction, arguments, contexte, options.repetitions, options.avec_cache
+                )
+                if "mediane_ms" in resultat:
+                    print(f"  {nom_fonction:32s} {resultat['mediane_ms']:9.1f} ms (p95 {resultat['p95_ms']:.1f})"
+                          + (f"  ⚠ {resultat['erreurs']} erreur(s)" if resultat["erreurs"] else ""))
+        finally:
+            os.remove(fichier_export)
+        return {"parametres": echelle, "volumes": volumes, "generation_s": generation, "fonctions": fonctions}
+    finally:
+        fermer_app(app)
+
+
+def _commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE,
+                                capture_output=True, text=True).stdout.strip()
+        modifie = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=RACINE,
+                                 capture_output=True, text=True).stdout.strip()
+        return commit + ("-modifie" if modifie else "")
+    except OSError:
+        return None
+
+
+def executer(parametres, options):
+    conn = psycopg2.connect(**parametres)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            version_serveur = cur.fetchone()[0]
+    finally:
+        conn.close()
+
+    resultats = {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "postgres": version_serveur,
+            "graine": options.graine,
+            "repetitions": options.repetitions,
+            "avec_cache": options.avec_cache,
+        },
+        "echelles": {},
+    }
+    for nom in options.echelles:
+        print(f"Échelle {nom}")
+        resultats["echelles"][nom] = mesurer_echelle(parametres, nom, options)
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure des fonctions d'accès aux données sur données synthétiques")
+    parser.add_argument("--echelles", default="petite",
+                        help=f"liste séparée par des virgules: {', '.join(ECHELLES)} ou EMPLOYESxJOURS (ex. 200x180)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--fonctions", default="", help="ne mesurer que les fonctions contenant ces fragments")
+    parser.add_argument("--avec-cache", action="store_true",
+                        help="garder le cache de lecture entre répétitions (mesure du chemin chaud)")
+    parser.add_argument("--dsn", help="base existante À SACRIFIER (schéma public recréé); sinon cluster jetable")
+    parser.add_argument("--sortie", help="fichier JSON des résultats (sinon sortie standard)")
+    options = parser.parse_args(argv)
+    options.echelles = [e for e in options.echelles.split(",") if e]
+    options.fonctions = [f for f in options.fonctions.split(",") if f]
+
+    if options.dsn:
+        resultats = executer(parametres_dsn(options.dsn), options)
+    else:
+        with postgres_jetable() as parametres:
+            resultats = executer(parametres, options)
+
+    texte = json.dumps(resultats, indent=2, ensure_ascii=False)
+    if options.sortie:
+        with open(options.sortie, "w", encoding="utf-8") as f:
+            f.write(texte)
+        print(f"Résultats écrits dans {options.sortie}")
+    else:
+        print(texte)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Paramètres de l'application lus depuis l'environnement ou secrets.toml.
+
+L'application et les scripts hors Streamlit (exports, outils d'administration),
+qui n'ont pas accès à st.secrets, lisent ici les mêmes valeurs, surchargeables
+par les variables d'environnement PostgreSQL standard (PGHOST, PGPORT, ...).
+"""
+import os
+from pathlib import Path
+
+import toml
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def _charger_secrets():
+    for chemin in (BASE_DIR / ".streamlit" / "secrets.toml", BASE_DIR / "secrets.toml"):
+        if chemin.exists():
+            return toml.load(chemin)
+    return {}
+
+
+_PG = _charger_secrets().get("postgres", {})
+
+PG_HOST = os.environ.get("PGHOST", _PG.get("host", "localhost"))
+PG_PORT = int(os.environ.get("PGPORT", _PG.get("port", 5432)))
+PG_DB = os.environ.get("PGDATABASE", _PG.get("dbname", "postgres"))
+PG_USER = os.environ.get("PGUSER", _PG.get("user", "postgres"))
+PG_PASS = os.environ.get("PGPASSWORD", _PG.get("password", ""))
+
+# Base de données: "postgres" (serveur, toutes les pages) ou "sqlite" (poste de
+# pointage local d'une petite antenne: fichier BD_SQLITE_CHEMIN, connexion,
+# pointage et liste du jour seulement)
+BD = os.environ.get("POINTAGE_BD", "postgres")
+BD_SQLITE_CHEMIN = Path(os.environ.get("POINTAGE_BD_SQLITE_CHEMIN", BASE_DIR / "data" / "pointage.sqlite3"))
+
+# Répertoire du stockage des certificats d'absence (adressé par SHA-256)
+CERTIFICATS_DIR = Path(os.environ.get("POINTAGE_CERTIFICATS_DIR", BASE_DIR / "data" / "certificats"))
+
+# Taille maximale d'un certificat envoyé (octets)
+CERTIFICAT_TAILLE_MAX = int(os.environ.get("POINTAGE_CERTIFICAT_TAILLE_MAX", 10 * 1024 * 1024))
+
+# Normalisation des certificats image: dimension maximale (px), qualité, format
+# de recompression (WEBP ou JPEG) et taille des vignettes des listes
+IMAGE_DIMENSION_MAX = int(os.environ.get("POINTAGE_IMAGE_DIMENSION_MAX", 2000))
+IMAGE_QUALITE = int(os.environ.get("POINTAGE_IMAGE_QUALITE", 80))
+IMAGE_FORMAT = os.environ.get("POINTAGE_IMAGE_FORMAT", "WEBP")
+VIGNETTE_TAILLE = int(os.environ.get("POINTAGE_VIGNETTE_TAILLE", 256))
+
+# Délai avant la suppression d'un original d'image remplacé par sa version
+# recompressée (s): un envoi simultané du même fichier a le temps d'être relu
+CERTIFICATS_DELAI_SUPPRESSION_S = float(os.environ.get("POINTAGE_CERTIFICATS_DELAI_SUPPRESSION_S", 3600))
+
+# Nombre de lignes lues par aller-retour lors des exports en flux
+EXPORT_TAILLE_LOT = int(os.environ.get("POINTAGE_EXPORT_TAILLE_LOT", 5000))
+
+# Cache des lectures: "memoire" (par processus, plafonné à CACHE_TAILLE_MAX
+# octets) ou "redis" (serveur local partagé, CACHE_URL)
+CACHE_STOCKAGE = os.environ.get("POINTAGE_CACHE_STOCKAGE", "memoire")
+CACHE_TAILLE_MAX = int(os.environ.get("POINTAGE_CACHE_TAILLE_MAX", 64 * 1024 * 1024))
+CACHE_URL = os.environ.get("POINTAGE_CACHE_URL", "redis://localhost:6379/0")
+
+# Journal des requêtes lentes (désactivé par défaut): seuil d'exécution (ms),
+# part des SELECT retenus rejoués sous EXPLAIN ANALYZE, requêtes gardées
+REQUETES_LENTES_ACTIF = os.environ.get("POINTAGE_REQUETES_LENTES_ACTIF", "0") == "1"
+REQUETES_LENTES_SEUIL_MS = float(os.environ.get("POINTAGE_REQUETES_LENTES_SEUIL_MS", 200))
+REQUETES_LENTES_ECHANTILLON = float(os.environ.get("POINTAGE_REQUETES_LENTES_ECHANTILLON", 0.1))
+REQUETES_LENTES_TAILLE = int(os.environ.get("POINTAGE_REQUETES_LENTES_TAILLE", 100))
+
+# Lectures concurrentes des pages (pointage.asynchrone): "psycopg" (pilote
+# asynchrone psycopg 3, pool dédié d'au plus BD_ASYNC_CONNEXIONS_MAX connexions)
+# ou "threads" (pool psycopg2, un thread par requête en cours)
+BD_ASYNC = os.environ.get("POINTAGE_BD_ASYNC", "psycopg")
+BD_ASYNC_CONNEXIONS_MAX = int(os.environ.get("POINTAGE_BD_ASYNC_CONNEXIONS_MAX", 10))
+
+# Réplique en lecture seule pour les rapports (pointage.replique): DSN libpq, ou
+# section [postgres_replique] de secrets.toml (mêmes clés que [postgres]).
+# Retard de rejeu toléré (s), durée pendant laquelle une session qui vient
+# d'écrire lit sur le primaire (s), intervalle entre deux mesures du retard
+# (s), connexions au plus
+REPLIQUE_DSN = os.environ.get("POINTAGE_REPLIQUE_DSN")
+REPLIQUE_RETARD_MAX_S = float(os.environ.get("POINTAGE_REPLIQUE_RETARD_MAX_S", 10))
+REPLIQUE_APRES_ECRITURE_S = float(os.environ.get("POINTAGE_REPLIQUE_APRES_ECRITURE_S", 30))
+REPLIQUE_VERIFICATION_S = float(os.environ.get("POINTAGE_REPLIQUE_VERIFICATION_S", 5))
+REPLIQUE_CONNEXIONS_MAX = int(os.environ.get("POINTAGE_REPLIQUE_CONNEXIONS_MAX", 10))
+
+# Délais des requêtes (pointage.delais): statement_timeout par défaut, des
+# rapports et des exports en flux (ms, 0 = aucun); budget de requêtes d'un
+# rendu de page, et de la page de pointage de la relève (s, 0 = aucun)
+REQUETE_DELAI_MS = int(os.environ.get("POINTAGE_REQUETE_DELAI_MS", 5000))
+REQUETE_DELAI_RAPPORT_MS = int(os.environ.get("POINTAGE_REQUETE_DELAI_RAPPORT_MS", 30000))
+REQUETE_DELAI_EXPORT_MS = int(os.environ.get("POINTAGE_REQUETE_DELAI_EXPORT_MS", 300000))
+BUDGET_PAGE_S = float(os.environ.get("POINTAGE_BUDGET_PAGE_S", 30))
+BUDGET_POINTAGE_S = float(os.environ.get("POINTAGE_BUDGET_POINTAGE_S", 5))
+
+# Résilience des lectures (pointage.resilience): tentatives d'une lecture sur
+# erreur transitoire, attente initiale et maximale entre deux (s, gigue pleine),
+# lectures en échec d'affilée qui ouvrent le disjoncteur, durée d'ouverture (s),
+# attente maximale d'une nouvelle connexion (s)
+RESILIENCE_TENTATIVES = int(os.environ.get("POINTAGE_RESILIENCE_TENTATIVES", 3))
+RESILIENCE_ATTENTE_BASE_S = float(os.environ.get("POINTAGE_RESILIENCE_ATTENTE_BASE_S", 0.1))
+RESILIENCE_ATTENTE_MAX_S = float(os.environ.get("POINTAGE_RESILIENCE_ATTENTE_MAX_S", 1))
+DISJONCTEUR_SEUIL = int(os.environ.get("POINTAGE_DISJONCTEUR_SEUIL", 5))
+DISJONCTEUR_OUVERTURE_S = float(os.environ.get("POINTAGE_DISJONCTEUR_OUVERTURE_S", 30))
+BD_DELAI_CONNEXION_S = int(os.environ.get("POINTAGE_BD_DELAI_CONNEXION_S", 5))
+
+
+def parametres_connexion():
+    """Arguments de psycopg2.connect() pour la base principale"""
+    return {
+        "host": PG_HOST,
+        "port": PG_PORT,
+        "database": PG_DB,
+        "user": PG_USER,
+        "password": PG_PASS,
+    }
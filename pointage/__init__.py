@@ -0,0 +1 @@
+"""Modules partagés du système de pointage, importés une seule fois par processus."""
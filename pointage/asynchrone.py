@@ -0,0 +1,250 @@
+"""Lectures asynchrones: les requêtes indépendantes d'une page attendues ensemble.
+
+Un script Streamlit est synchrone. Une boucle asyncio tourne donc dans un
+thread dédié du processus et porte son propre pool de connexions (psycopg 3,
+AsyncConnectionPool), distinct du pool psycopg2 des écritures. Un rendu soumet
+ses coroutines à cette boucle et attend leur ensemble: la page attend la
+requête la plus lente au lieu de leur somme, sans un thread par requête.
+
+Deux pilotes de même interface, choisis par config.BD_ASYNC:
+
+- "psycopg": pilote asynchrone natif (paquet psycopg[pool]);
+- "threads": le pool psycopg2, une requête par thread (asyncio.to_thread),
+  pour un déploiement sans psycopg 3.
+
+Les coroutines héritent des variables de contexte de l'appelant (mesures de la
+page en cours). Elles ne doivent pas appeler st.*: la boucle n'a pas de
+contexte de script; une lecture en échec lève, l'appelant affiche l'erreur.
+Le journal des requêtes lentes ne voit que les requêtes du pool psycopg2.
+
+Avec une réplique (pointage.replique), le pilote "psycopg" ouvre sur la même
+boucle un second pool vers elle, à la première lecture de rapport routée; le
+pilote "threads" suit le routage de get_connection().
+
+Les délais de pointage.delais s'appliquent aussi: statement_timeout de la
+fonction en cours, attente d'une connexion et délai bornés par le budget de
+la page, comme le disjoncteur de pointage.resilience pour les lectures
+@reessayer. Le pilote "threads" les reçoit de get_connection().
+"""
+import asyncio
+import importlib.util
+import threading
+import time
+
+import pandas as pd
+
+from pointage.delais import est_delai
+from pointage.metrics import _taille_ligne, noter
+
+# Attente maximale de la première connexion à la réplique avant de lire sur le primaire
+DELAI_OUVERTURE_REPLIQUE = 5
+
+
+class _Boucle:
+    """Boucle asyncio du processus, démarrée au premier appel dans un thread démon"""
+
+    def __init__(self):
+        self._boucle = None
+        self._verrou = threading.Lock()
+
+    def _demarrer(self):
+        with self._verrou:
+            if self._boucle is None:
+                boucle = asyncio.new_event_loop()
+                threading.Thread(target=boucle.run_forever, name="pointage-async", daemon=True).start()
+                try:
+                    asyncio.run_coroutine_threadsafe(self._ouvrir(), boucle).result()
+                except BaseException:
+                    boucle.call_soon_threadsafe(boucle.stop)
+                    raise
+                self._boucle = boucle
+        return self._boucle
+
+    async def _ouvrir(self):
+        pass
+
+    async def _fermer(self):
+        pass
+
+    def executer(self, coroutine):
+        """Exécute `coroutine` sur la boucle et attend son résultat (depuis un thread synchrone)"""
+        boucle = self._boucle or self._demarrer()
+        return asyncio.run_coroutine_threadsafe(coroutine, boucle).result()
+
+    def rassembler(self, coroutines):
+        """Attend ensemble `{nom: coroutine}`; `{nom: résultat ou exception levée}`"""
+        noms = list(coroutines)
+
+        async def ensemble():
+            return await asyncio.gather(*coroutines.values(), return_exceptions=True)
+
+        return dict(zip(noms, self.executer(ensemble())))
+
+    def fermer(self):
+        with self._verrou:
+            boucle, self._boucle = self._boucle, None
+        if boucle is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._fermer(), boucle).result()
+            finally:
+                boucle.call_soon_threadsafe(boucle.stop)
+
+
+def _libpq(parametres):
+    # Mêmes paramètres que psycopg2.connect(), au nom libpq près
+    return {("dbname" if cle == "database" else cle): valeur for cle, valeur in parametres.items()}
+
+
+class PiloteAsync(_Boucle):
+    """Lectures sur un pool psycopg 3 asynchrone, propre à la boucle.
+
+    `routeur` (pointage.replique.routage) décide, pour chaque requête, si elle
+    va au pool de `parametres_replique`; `delais` (pointage.delais.delais)
+    donne le statement_timeout de chaque requête; `resilience`
+    (pointage.resilience) refuse les lectures tant que la base est injoignable.
+    """
+
+    def __init__(self, parametres, taille_min=1, taille_max=10, parametres_replique=None, routeur=None, delais=None,
+                 resilience=None):
+        super().__init__()
+        self.parametres = _libpq(parametres)
+        self.parametres_replique = _libpq(parametres_replique) if parametres_replique else None
+        self.routeur = routeur
+        self.delais = delais
+        self.resilience = resilience
+        self.taille_min = taille_min
+        self.taille_max = taille_max
+        self._pool = None
+        self._pool_replique = None
+        self._verrou_replique = None
+
+    def _nouveau_pool(self, parametres, nom):
+        from psycopg_pool import AsyncConnectionPool
+
+        if self.delais is not None:
+            # Délai par défaut réglé à l'ouverture: seules les autres valeurs coûtent un SET
+            parametres = {**parametres, "options": f"-c statement_timeout={self.delais.defaut_ms}"}
+        return AsyncConnectionPool(
+            kwargs=parametres, min_size=self.taille_min, max_size=self.taille_max, open=False, name=nom,
+        )
+
+    async def _ouvrir(self):
+        self._pool = self._nouveau_pool(self.parametres, "pointage-lectures")
+        await self._pool.open(wait=True)
+        self._verrou_replique = asyncio.Lock()
+
+    async def _fermer(self):
+        for pool in (self._pool, self._pool_replique):
+            if pool is not None:
+                await pool.close()
+        self._pool = self._pool_replique = None
+
+    async def _choisir_pool(self):
+        if self.parametres_replique is None or not self.routeur.demandee():
+            return self._pool
+        # La décision peut mesurer le retard de la réplique (requête psycopg2): hors de la boucle
+        if not await asyncio.to_thread(self.routeur.utiliser_replique):
+            return self._pool
+        async with self._verrou_replique:
+            if self._pool_replique is None:
+                pool = self._nouveau_pool(self.parametres_replique, "pointage-replique")
+                try:
+                    await pool.open(wait=True, timeout=DELAI_OUVERTURE_REPLIQUE)
+                except Exception as e:
+                    await pool.close()
+                    self.routeur.signaler_panne(e)
+                    return self._pool
+                self._pool_replique = pool
+        return self._pool_replique
+
+    async def _executer(self, requete, params):
+        delai, attente_max = None, None
+        if self.delais is not None:
+            delai = self.delais.delai_ms()
+            attente_max = self.delais.reste()
+        if self.resilience is not None:
+            self.resilience.autoriser()
+        pool = await self._choisir_pool()
+        debut = time.perf_counter()
+        try:
+            async with pool.connection(timeout=attente_max) as conn:
+                attente = time.perf_counter() - debut
+                debut = time.perf_counter()
+                async with conn.cursor() as cur:
+                    if delai is not None and delai != self.delais.defaut_ms:
+                        # Local à la transaction du bloc, validée ou annulée à sa sortie
+                        await cur.execute("SELECT set_config('statement_timeout', %s, true)", (str(delai),))
+                    await cur.execute(requete, params)
+                    lignes = await cur.fetchall()
+                    colonnes = [colonne.name for colonne in cur.description]
+        except Exception as e:
+            if est_delai(e):
+                noter(delais=1)
+            raise
+        noter(
+            attente_connexion=attente,
+            duree_bd=time.perf_counter() - debut,
+            lignes=len(lignes),
+            octets=_taille_ligne(lignes[0]) * len(lignes) if lignes else 0,
+        )
+        return colonnes, lignes
+
+    async def lire(self, requete, params=None):
+        """Résultat de `requete` en DataFrame"""
+        colonnes, lignes = await self._executer(requete, params)
+        return pd.DataFrame.from_records(lignes, columns=colonnes)
+
+    async def valeur(self, requete, params=None):
+        """Première colonne de la première ligne (None sans ligne)"""
+        _, lignes = await self._executer(requete, params)
+        return lignes[0][0] if lignes else None
+
+
+class PiloteThreads(_Boucle):
+    """Même interface sur le pool psycopg2: chaque requête occupe un thread le temps de son exécution.
+
+    `obtenir()` emprunte une connexion (lève si aucune), `rendre(conn)` la rend.
+    Les mesures passent par le curseur du pool (CurseurMesure).
+    """
+
+    def __init__(self, obtenir, rendre):
+        super().__init__()
+        self.obtenir = obtenir
+        self.rendre = rendre
+
+    def _avec_connexion(self, lecture):
+        conn = self.obtenir()
+        try:
+            return lecture(conn)
+        finally:
+            self.rendre(conn)
+
+    async def lire(self, requete, params=None):
+        return await asyncio.to_thread(
+            self._avec_connexion, lambda conn: pd.read_sql_query(requete, conn, params=params)
+        )
+
+    def _valeur(self, conn, requete, params):
+        with conn.cursor() as cur:
+            cur.execute(requete, params)
+            ligne = cur.fetchone()
+        return ligne[0] if ligne else None
+
+    async def valeur(self, requete, params=None):
+        return await asyncio.to_thread(self._avec_connexion, lambda conn: self._valeur(conn, requete, params))
+
+
+def creer_pilote(type_pilote="psycopg", parametres=None, obtenir=None, rendre=None, taille_max=10,
+                 parametres_replique=None, routeur=None, delais=None, resilience=None):
+    """Pilote désigné par la configuration: "psycopg" (paramètres de connexion) ou "threads" (pool psycopg2)"""
+    if type_pilote == "psycopg":
+        # Importé par la boucle à l'ouverture du pool: vérifier ici pour échouer tôt
+        if importlib.util.find_spec("psycopg_pool") is None:
+            raise RuntimeError(
+                "Le pilote async \"psycopg\" demande le paquet psycopg (pip install \"psycopg[binary,pool]\")"
+            )
+        return PiloteAsync(parametres, taille_max=taille_max, parametres_replique=parametres_replique, routeur=routeur,
+                           delais=delais, resilience=resilience)
+    if type_pilote == "threads":
+        return PiloteThreads(obtenir, rendre)
+    raise ValueError(f"Pilote async inconnu: {type_pilote!r}")
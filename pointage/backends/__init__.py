@@ -0,0 +1,23 @@
+"""Bases de données du pointage: PostgreSQL (serveur) et SQLite (poste local, tests sans serveur).
+
+    backend = creer_backend("sqlite", chemin="pointage.sqlite3")
+    backend.creer_schema()
+    backend.enregistrer_arrivee(personnel_id, date.today(), heure)
+
+pointage.db délègue au backend choisi par config.BD le schéma, les
+utilisateurs, l'ajout d'employés et les écritures du pointage; les deux
+implémentations de ces opérations passent la même suite de conformité
+(tests/test_conformance.py).
+"""
+from pointage.backends.postgres import BackendPostgres
+from pointage.backends.sqlite import BackendSqlite
+
+
+def creer_backend(type_backend, chemin=None, parametres=None):
+    """"sqlite" (fichier `chemin`, ":memory:" par défaut) ou "postgres" (connexion par `parametres`)"""
+    if type_backend == "sqlite":
+        return BackendSqlite(chemin or ":memory:")
+    if type_backend == "postgres":
+        return BackendPostgres.depuis_parametres(parametres)
+    raise ValueError(f"Backend inconnu: {type_backend}")
+
@@ -0,0 +1,398 @@
+"""Contrat commun des bases de pointage et SQL partagé.
+
+Les requêtes sont écrites une fois, avec des paramètres `%s`: PostgreSQL et
+SQLite (3.35 et plus) acceptent tous deux ON CONFLICT ... DO UPDATE et
+RETURNING. Seuls la définition des clés, quelques migrations et la gestion
+des connexions diffèrent, dans les sous-classes.
+
+Le contrat se limite aux opérations que pointage.db leur délègue: schéma,
+utilisateurs, ajout d'employé, pointages, absences et congés, et les deux
+listes du poste de pointage local (effectif actif, pointages du jour). Les
+autres lectures des pages (DataFrame, pagination, rapports) restent dans
+pointage.db, en SQL PostgreSQL.
+"""
+from abc import ABC, abstractmethod
+
+from pointage.rules import as_time, calculer_statut_arrivee, calculer_statut_depart
+
+# {cle}: colonne de clé primaire auto-incrémentée du dialecte
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id {cle},
+        username VARCHAR(50) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        role VARCHAR(20) DEFAULT 'user',
+        email VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS personnels (
+        id {cle},
+        nom VARCHAR(100) NOT NULL,
+        prenom VARCHAR(100) NOT NULL,
+        service VARCHAR(100) NOT NULL,
+        poste VARCHAR(50) NOT NULL CHECK (poste IN ('Jour', 'Nuit')),
+        heure_entree_prevue TIME NOT NULL,
+        heure_sortie_prevue TIME NOT NULL,
+        actif BOOLEAN DEFAULT TRUE,
+        date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conges (
+        id {cle},
+        personnel_id INTEGER REFERENCES personnels(id) ON DELETE CASCADE,
+        date_debut DATE NOT NULL,
+        date_fin DATE NOT NULL,
+        type_conge VARCHAR(50) NOT NULL,
+        motif TEXT,
+        statut VARCHAR(20) DEFAULT 'En attente' CHECK (statut IN ('En attente', 'Approuvé', 'Rejeté')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pointages (
+        id {cle},
+        personnel_id INTEGER REFERENCES personnels(id) ON DELETE CASCADE,
+        date_pointage DATE NOT NULL,
+        heure_arrivee TIME,
+        heure_depart TIME,
+        statut_arrivee VARCHAR(50) DEFAULT 'Present',
+        statut_depart VARCHAR(50) DEFAULT 'Present',
+        retard_minutes INTEGER DEFAULT 0,
+        depart_avance_minutes INTEGER DEFAULT 0,
+        motif_retard TEXT,
+        motif_depart_avance TEXT,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(personnel_id, date_pointage)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS retards (
+        id {cle},
+        personnel_id INTEGER REFERENCES personnels(id) ON DELETE CASCADE,
+        date_retard DATE NOT NULL,
+        retard_minutes INTEGER NOT NULL,
+        motif TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS absences (
+        id {cle},
+        personnel_id INTEGER REFERENCES personnels(id) ON DELETE CASCADE,
+        date_absence DATE NOT NULL,
+        motif TEXT,
+        justifie BOOLEAN DEFAULT FALSE,
+        certificat_sha256 CHAR(64),
+        certificat_taille BIGINT,
+        certificat_mime VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(personnel_id, date_absence)
+    )
+    """,
+]
+
+
+class Backend(ABC):
+    """Opérations du pointage au quotidien, identiques d'une base à l'autre.
+
+    Les sous-classes fournissent `cle_primaire`, `migrations()` et
+    `connexion()`.
+    """
+
+    cle_primaire = None
+
+    def migrations(self):
+        """Instructions propres au dialecte, exécutées après les tables"""
+        return []
+
+    @abstractmethod
+    def connexion(self):
+        """Contexte qui ouvre une transaction, la valide à la sortie normale et l'annule sur exception"""
+
+    def _sql(self, requete):
+        return requete
+
+    def _executer(self, conn, requete, params=()):
+        cur = conn.cursor()
+        cur.execute(self._sql(requete), params)
+        return cur
+
+    def _lignes(self, requete, params=()):
+        """Lignes du résultat, en dicts {colonne: valeur}"""
+        with self.connexion() as conn:
+            cur = self._executer(conn, requete, params)
+            colonnes = [colonne[0] for colonne in cur.description]
+            return [dict(zip(colonnes, ligne)) for ligne in cur.fetchall()]
+
+    # --- Schéma ---
+
+    def creer_schema(self):
+        with self.connexion() as conn:
+            for requete in SCHEMA:
+                self._executer(conn, requete.format(cle=self.cle_primaire))
+            for requete in self.migrations():
+                self._executer(conn, requete)
+
+    # --- Utilisateurs ---
+
+    def creer_utilisateur(self, username, password_hash, role="user", email=None):
+        with self.connexion() as conn:
+            return self._executer(
+                conn,
+                "INSERT INTO users (username, password_hash, role, email) VALUES (%s, %s, %s, %s) RETURNING id",
+                (username, password_hash, role, email),
+            ).fetchone()[0]
+
+    def assurer_utilisateur(self, username, password_hash, role="user", email=None):
+        """Crée l'utilisateur s'il n'existe pas encore (administrateur par défaut)"""
+        with self.connexion() as conn:
+            existe = self._executer(
+                conn, "SELECT COUNT(*) FROM users WHERE username = %s", (username,)
+            ).fetchone()[0]
+            if not existe:
+                self._executer(
+                    conn,
+                    "INSERT INTO users (username, password_hash, role, email) VALUES (%s, %s, %s, %s)",
+                    (username, password_hash, role, email),
+                )
+
+    def authentifier(self, username, password_hash):
+        """(id, username, role) de l'utilisateur, ou None"""
+        with self.connexion() as conn:
+            ligne = self._executer(
+                conn,
+                "SELECT id, username, role FROM users WHERE username = %s AND password_hash = %s",
+                (username, password_hash),
+            ).fetchone()
+        return tuple(ligne) if ligne else None
+
+    # --- Personnel ---
+
+    def ajouter_personnel(self, nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue):
+        with self.connexion() as conn:
+            return self._executer(
+                conn,
+                """
+                INSERT INTO personnels (nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue)
+                VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+                """,
+                (nom, prenom, service, poste, as_time(heure_entree_prevue), as_time(heure_sortie_prevue)),
+            ).fetchone()[0]
+
+    def personnel_actif(self):
+        return self._lignes(
+            """
+            SELECT id, nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue
+            FROM personnels WHERE actif ORDER BY nom, prenom
+            """
+        )
+
+    # --- Pointages ---
+
+    def enregistrer_arrivee(self, personnel_id, jour, heure, motif_retard=None, notes=None, est_absent=False):
+        """Applique les règles d'arrivée en une transaction.
+
+        Renvoie None si l'employé n'existe pas, sinon un dict statut,
+        retard_minutes, absent, service, poste. Au-delà de 30 minutes de
+        retard, seule une absence est enregistrée.
+        """
+        with self.connexion() as conn:
+            ligne = self._executer(
+                conn, "SELECT heure_entree_prevue, service, poste FROM personnels WHERE id = %s", (personnel_id,)
+            ).fetchone()
+            if ligne is None:
+                return None
+            heure_prevue, service, poste = as_time(ligne[0]), ligne[1], ligne[2]
+            statut, retard_minutes, absent = calculer_statut_arrivee(heure, heure_prevue)
+            resultat = {"statut": statut, "retard_minutes": retard_minutes, "absent": est_absent or absent,
+                        "service": service, "poste": poste}
+
+            if resultat["absent"]:
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO absences (personnel_id, date_absence, motif, justifie)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (personnel_id, date_absence) DO NOTHING
+                    """,
+                    (personnel_id, jour, motif_retard or f"Absence automatique (retard de {retard_minutes} minutes)",
+                     False),
+                )
+                return resultat
+
+            if 0 < retard_minutes < 30:
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO retards (personnel_id, date_retard, retard_minutes, motif)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    (personnel_id, jour, retard_minutes, motif_retard),
+                )
+
+            # Vérifier si un pointage existe déjà pour cette journée
+            existant = self._executer(
+                conn, "SELECT id FROM pointages WHERE personnel_id = %s AND date_pointage = %s", (personnel_id, jour)
+            ).fetchone()
+            if existant:
+                # Mettre à jour l'arrivée
+                self._executer(
+                    conn,
+                    """
+                    UPDATE pointages
+                    SET heure_arrivee = %s, statut_arrivee = %s, retard_minutes = %s,
+                        motif_retard = %s, notes = COALESCE(%s, notes)
+                    WHERE id = %s
+                    """,
+                    (as_time(heure), statut, retard_minutes, motif_retard, notes, existant[0]),
+                )
+            else:
+                # Nouveau pointage
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO pointages (personnel_id, date_pointage, heure_arrivee, statut_arrivee, retard_minutes, motif_retard, notes)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (personnel_id, jour, as_time(heure), statut, retard_minutes, motif_retard, notes),
+                )
+        return resultat
+
+    def pointages_du_jour(self, jour):
+        return self._lignes(
+            """
+            SELECT p.nom, p.prenom, p.service, pt.heure_arrivee, pt.statut_arrivee, pt.retard_minutes,
+                   pt.heure_depart, pt.statut_depart
+            FROM pointages pt
+            JOIN personnels p ON p.id = pt.personnel_id
+            WHERE pt.date_pointage = %s
+            ORDER BY p.nom, p.prenom
+            """,
+            (jour,),
+        )
+
+    def enregistrer_depart(self, personnel_id, jour, heure, motif_depart_avance=None, notes=None):
+        """Renvoie None si l'employé n'existe pas, sinon un dict statut, depart_avance_minutes"""
+        with self.connexion() as conn:
+            ligne = self._executer(
+                conn, "SELECT heure_sortie_prevue FROM personnels WHERE id = %s", (personnel_id,)
+            ).fetchone()
+            if ligne is None:
+                return None
+            heure = as_time(heure)
+            statut, avance = calculer_statut_depart(heure, ligne[0])
+            # Vérifier si un pointage existe déjà pour cette journée
+            existant = self._executer(
+                conn, "SELECT id FROM pointages WHERE personnel_id = %s AND date_pointage = %s", (personnel_id, jour)
+            ).fetchone()
+            if existant:
+                # Mettre à jour le départ
+                self._executer(
+                    conn,
+                    """
+                    UPDATE pointages
+                    SET heure_depart = %s, statut_depart = %s, depart_avance_minutes = %s,
+                        motif_depart_avance = %s, notes = COALESCE(%s, notes)
+                    WHERE id = %s
+                    """,
+                    (heure, statut, avance, motif_depart_avance, notes, existant[0]),
+                )
+            else:
+                # Nouveau pointage (cas rare où on pointerait le départ sans l'arrivée)
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO pointages (personnel_id, date_pointage, heure_depart, statut_depart, depart_avance_minutes, motif_depart_avance, notes)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (personnel_id, jour, heure, statut, avance, motif_depart_avance, notes),
+                )
+        return {"statut": statut, "depart_avance_minutes": avance}
+
+    # --- Absences ---
+
+    def enregistrer_absence(self, personnel_id, jour, motif, justifie=False, certificat=None):
+        """`certificat`: (sha256, taille, mime) du fichier déjà stocké, ou None"""
+        with self.connexion() as conn:
+            if certificat:
+                # La table ne garde que la référence du fichier stocké
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO absences (personnel_id, date_absence, motif, justifie,
+                                          certificat_sha256, certificat_taille, certificat_mime)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (personnel_id, date_absence)
+                    DO UPDATE SET
+                        motif = EXCLUDED.motif,
+                        justifie = EXCLUDED.justifie,
+                        certificat_sha256 = EXCLUDED.certificat_sha256,
+                        certificat_taille = EXCLUDED.certificat_taille,
+                        certificat_mime = EXCLUDED.certificat_mime
+                    """,
+                    (personnel_id, jour, motif, justifie, *certificat),
+                )
+            else:
+                self._executer(
+                    conn,
+                    """
+                    INSERT INTO absences (personnel_id, date_absence, motif, justifie)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (personnel_id, date_absence)
+                    DO UPDATE SET
+                        motif = EXCLUDED.motif,
+                        justifie = EXCLUDED.justifie
+                    """,
+                    (personnel_id, jour, motif, justifie),
+                )
+
+    # --- Congés ---
+
+    def demander_conge(self, personnel_id, date_debut, date_fin, type_conge, motif=None):
+        with self.connexion() as conn:
+            return self._executer(
+                conn,
+                """
+                INSERT INTO conges (personnel_id, date_debut, date_fin, type_conge, motif)
+                VALUES (%s, %s, %s, %s, %s) RETURNING id
+                """,
+                (personnel_id, date_debut, date_fin, type_conge, motif),
+            ).fetchone()[0]
+
+    def modifier_statut_conge(self, conge_id, statut):
+        with self.connexion() as conn:
+            self._executer(
+                conn, "UPDATE conges SET statut = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s", (statut, conge_id)
+            )
+
+    def est_en_conge(self, personnel_id, jour):
+        with self.connexion() as conn:
+            return self._executer(
+                conn,
+                """
+                SELECT COUNT(*) FROM conges
+                WHERE personnel_id = %s AND statut = 'Approuvé' AND date_debut <= %s AND date_fin >= %s
+                """,
+                (personnel_id, jour, jour),
+            ).fetchone()[0] > 0
+
+    def conge_disponible(self, personnel_id, date_debut, date_fin):
+        """Vrai si aucun congé en attente ou approuvé ne chevauche la période"""
+        with self.connexion() as conn:
+            return self._executer(
+                conn,
+                """
+                SELECT COUNT(*) FROM conges
+                WHERE personnel_id = %s
+                AND statut IN ('En attente', 'Approuvé')
+                AND date_debut <= %s AND date_fin >= %s
+                """,
+                (personnel_id, date_fin, date_debut),
+            ).fetchone()[0] == 0
@@ -0,0 +1,41 @@
+"""Base PostgreSQL: connexions empruntées à un pool psycopg2 (ou ouvertes à la demande)."""
+from contextlib import contextmanager
+
+import psycopg2
+
+from pointage.backends.base import Backend
+
+
+class BackendPostgres(Backend):
+    """`obtenir()` fournit une connexion, `rendre(conn)` la restitue (pool ou fermeture)"""
+
+    cle_primaire = "SERIAL PRIMARY KEY"
+
+    def __init__(self, obtenir, rendre):
+        self.obtenir = obtenir
+        self.rendre = rendre
+
+    @classmethod
+    def depuis_parametres(cls, parametres):
+        """Une connexion par opération, sans pool: pour les outils et la conformité"""
+        return cls(lambda: psycopg2.connect(**parametres), lambda conn: conn.close())
+
+    def migrations(self):
+        return [
+            # Bases existantes: les certificats passent du BYTEA au stockage par empreinte
+            """
+            ALTER TABLE absences
+                ADD COLUMN IF NOT EXISTS certificat_sha256 CHAR(64),
+                ADD COLUMN IF NOT EXISTS certificat_taille BIGINT,
+                ADD COLUMN IF NOT EXISTS certificat_mime VARCHAR(100)
+            """,
+        ]
+
+    @contextmanager
+    def connexion(self):
+        conn = self.obtenir()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.rendre(conn)
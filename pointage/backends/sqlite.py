@@ -0,0 +1,59 @@
+"""Base SQLite embarquée: les opérations de pointage.backends.base sans serveur.
+
+Elle sert le poste de pointage local d'une petite antenne (config.BD =
+"sqlite": connexion, pointage, liste du jour) et fait tourner la suite de
+conformité en quelques dizaines de millisecondes. Une seule connexion par
+base, partagée entre les threads sous verrou: les transactions sont courtes
+et s'enchaînent sans aller-retour réseau. Le fichier est en mode WAL avec synchronous=NORMAL, qui garde la
+base cohérente après une coupure au prix, au pire, des dernières
+transactions validées. ":memory:" donne une base jetable pour les tests.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from pathlib import Path
+
+from pointage.backends.base import Backend
+
+# Dates et heures stockées en texte ISO, relues dans leur type d'origine
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(time, time.isoformat)
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda v: date.fromisoformat(v.decode()))
+sqlite3.register_converter("TIME", lambda v: time.fromisoformat(v.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda v: datetime.fromisoformat(v.decode()))
+
+
+class BackendSqlite(Backend):
+    cle_primaire = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def __init__(self, chemin=":memory:"):
+        self.chemin = str(chemin)
+        if self.chemin != ":memory:":
+            Path(self.chemin).parent.mkdir(parents=True, exist_ok=True)
+        self._verrou = threading.Lock()
+        self._conn = sqlite3.connect(self.chemin, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if self.chemin != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+
+    def _sql(self, requete):
+        return requete.replace("%s", "?")
+
+    @contextmanager
+    def connexion(self):
+        with self._verrou:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def fermer(self):
+        with self._verrou:
+            self._conn.close()
@@ -0,0 +1,112 @@
+"""Stockage local des certificats, adressé par contenu (SHA-256).
+
+Chaque fichier est rangé sous `racine/ab/cd/<sha256>`: deux envois identiques
+ne sont stockés qu'une fois et la table absences ne garde que l'empreinte.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+
+TAILLE_BLOC = 64 * 1024
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class FichierTropVolumineux(ValueError):
+    def __init__(self, taille, taille_max):
+        super().__init__(f"Fichier trop volumineux ({taille} octets, maximum {taille_max})")
+        self.taille = taille
+        self.taille_max = taille_max
+
+
+class BlobStore:
+    def __init__(self, racine):
+        self.racine = Path(racine)
+
+    def chemin(self, sha256):
+        if not _SHA256.match(sha256 or ""):
+            raise ValueError(f"Empreinte SHA-256 invalide: {sha256!r}")
+        return self.racine / sha256[:2] / sha256[2:4] / sha256
+
+    def contient(self, sha256):
+        return self.chemin(sha256).exists()
+
+    def ajouter(self, donnees):
+        """Stocke `donnees` (bytes) et renvoie (sha256, taille); sans effet si déjà présent"""
+        return self.ajouter_flux(io.BytesIO(donnees))
+
+    def ajouter_flux(self, fichier, taille_max=None, taille_bloc=TAILLE_BLOC):
+        """Copie le fichier `fichier` par blocs et renvoie (sha256, taille).
+
+        L'empreinte est calculée pendant la copie: au plus un bloc est en mémoire.
+        Au-delà de `taille_max` octets, la copie est abandonnée (FichierTropVolumineux).
+        """
+        taille_annoncee = getattr(fichier, "size", None)
+        if taille_max is not None and taille_annoncee is not None and taille_annoncee > taille_max:
+            raise FichierTropVolumineux(taille_annoncee, taille_max)
+
+        temporaires = self.racine / ".tmp"
+        temporaires.mkdir(parents=True, exist_ok=True)
+        fd, temporaire = tempfile.mkstemp(dir=temporaires)
+        try:
+            empreinte = hashlib.sha256()
+            taille = 0
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    bloc = fichier.read(taille_bloc)
+                    if not bloc:
+                        break
+                    taille += len(bloc)
+                    if taille_max is not None and taille > taille_max:
+                        raise FichierTropVolumineux(taille, taille_max)
+                    empreinte.update(bloc)
+                    f.write(bloc)
+                f.flush()
+                os.fsync(f.fileno())
+
+            sha256 = empreinte.hexdigest()
+            chemin = self.chemin(sha256)
+            if chemin.exists():
+                os.remove(temporaire)
+                # Date rafraîchie: le nettoyage des originaux remplacés épargne un fichier qui vient d'être renvoyé
+                os.utime(chemin)
+            else:
+                chemin.parent.mkdir(parents=True, exist_ok=True)
+                # Renommage atomique: deux envois simultanés du même contenu restent cohérents
+                os.replace(temporaire, chemin)
+            return sha256, taille
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+
+    def taille(self, sha256):
+        return self.chemin(sha256).stat().st_size
+
+    def lire_par_blocs(self, sha256, taille_bloc=TAILLE_BLOC, debut=0, fin=None):
+        """Itérateur des octets [debut, fin) du fichier, bloc par bloc.
+
+        Le fichier est ouvert dès l'appel (FileNotFoundError s'il manque), mais
+        rien n'est lu avant la première itération.
+        """
+        return self._blocs(open(self.chemin(sha256), "rb"), taille_bloc, debut, fin)
+
+    @staticmethod
+    def _blocs(f, taille_bloc, debut, fin):
+        with f:
+            f.seek(debut)
+            reste = None if fin is None else max(fin - debut, 0)
+            while reste is None or reste > 0:
+                bloc = f.read(taille_bloc if reste is None else min(taille_bloc, reste))
+                if not bloc:
+                    break
+                if reste is not None:
+                    reste -= len(bloc)
+                yield bloc
+
+    def lire_plage(self, sha256, debut, fin):
+        """Octets [debut, fin) du fichier, sans lire le reste"""
+        return b"".join(self.lire_par_blocs(sha256, debut=debut, fin=fin))
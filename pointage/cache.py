@@ -0,0 +1,469 @@
+"""Cache des lectures invalidé par les versions de tables.
+
+Chaque table suivie a un compteur dans `table_versions`, incrémenté par un
+trigger d'instruction dans la même transaction que l'écriture, puis diffusé
+par NOTIFY au commit. Une entrée de cache est indexée par (fonction,
+paramètres, versions des tables lues): une écriture dans n'importe quel
+processus change la clé, sans délai d'expiration à deviner.
+
+Les entrées sont stockées sérialisées (Arrow pour les DataFrames) dans un
+stockage interchangeable: mémoire du processus bornée en octets avec
+éviction LRU, ou serveur clé-valeur local partagé.
+
+Chaque entrée est aussi désignée par une clé de secours, sans les versions:
+quand une lecture échoue sur un délai (pointage.delais) ou faute de base
+(pointage.resilience), le dernier résultat gardé pour les mêmes paramètres
+est servi, même périmé, plutôt que rien.
+"""
+import asyncio
+import contextvars
+import functools
+import hashlib
+import inspect
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from pointage.delais import est_delai
+from pointage.metrics import noter
+from pointage.notifications import CANAL
+
+TABLES_VERSIONNEES = ("users", "personnels", "pointages", "retards", "absences", "conges", "roster_jour")
+
+SQL_VERSIONS = f"""
+CREATE TABLE IF NOT EXISTS table_versions (
+    nom VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION incrementer_version_table() RETURNS TRIGGER AS $$
+DECLARE
+    v BIGINT;
+BEGIN
+    INSERT INTO table_versions (nom, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (nom) DO UPDATE SET version = table_versions.version + 1
+    RETURNING version INTO v;
+    -- Remis au commit seulement: le cache ne voit jamais une version non validée
+    PERFORM pg_notify('{CANAL}', jsonb_build_object('versions', jsonb_build_object(TG_TABLE_NAME, v))::text);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY{list(TABLES_VERSIONNEES)} LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_version_' || t) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+                'FOR EACH STATEMENT EXECUTE FUNCTION incrementer_version_table()',
+                'trg_version_' || t, t
+            );
+        END IF;
+    END LOOP;
+END
+$$;
+"""
+
+
+def lire_versions(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT nom, version FROM table_versions")
+        return dict(cur.fetchall())
+
+
+class VersionsTables:
+    """Versions connues des tables, tenues à jour par NOTIFY ou relues en base"""
+
+    def __init__(self):
+        self._lire = None
+        self._ecoute_active = lambda: False
+        self._verrou = threading.Lock()
+        self._versions = {}
+        self._synchronise = False
+
+    def configurer(self, lire, ecoute_active):
+        """`lire()` renvoie {table: version} depuis la base; `ecoute_active()` dit si NOTIFY est reçu"""
+        self._lire = lire
+        self._ecoute_active = ecoute_active
+
+    def appliquer_evenement(self, evenement):
+        if evenement is None:
+            # (Re)connexion de l'écouteur, LISTEN déjà actif: repartir de l'état de la base
+            self._resynchroniser(synchronise=True)
+            return
+        for table, version in (evenement.get("versions") or {}).items():
+            with self._verrou:
+                self._versions[table] = max(self._versions.get(table, 0), version)
+
+    def invalider(self):
+        """Après une écriture locale: la prochaine lecture relit les versions en base
+        plutôt que d'attendre la notification (lecture de ses propres écritures)"""
+        with self._verrou:
+            self._synchronise = False
+
+    def _resynchroniser(self, synchronise):
+        try:
+            versions = self._lire()
+        except Exception:
+            versions = None
+        with self._verrou:
+            # Une lecture faite sans écoute active peut précéder des événements perdus
+            self._synchronise = synchronise and versions is not None
+            for table, version in (versions or {}).items():
+                self._versions[table] = max(self._versions.get(table, 0), version)
+        return versions
+
+    def obtenir(self, tables):
+        """Tuple des versions de `tables`, ou None si elles sont inconnues (pas de cache)"""
+        active = self._ecoute_active()
+        if active and self._synchronise:
+            with self._verrou:
+                return tuple(self._versions.get(t, 0) for t in tables)
+        # Sans écoute, une lecture de table_versions (quelques lignes) fait foi
+        versions = self._resynchroniser(synchronise=active)
+        if versions is None:
+            return None
+        return tuple(versions.get(t, 0) for t in tables)
+
+
+_local = threading.local()
+_suivi = contextvars.ContextVar("pointage_suivi_lecture", default=None)
+
+
+def signaler_echec(secours=False):
+    """Marque l'appel en cours comme échoué: son résultat ne sera pas mis en cache.
+
+    `secours`: l'échec vient d'un délai dépassé ou d'une base indisponible, la
+    lecture peut servir son secours.
+    """
+    _local.echecs = getattr(_local, "echecs", 0) + 1
+    suivi = _suivi.get()
+    if secours and suivi is not None:
+        suivi.secours.append(True)
+
+
+def plafonner_ttl(secondes):
+    """Borne la durée de vie en cache du résultat de la lecture en cours (données d'une réplique)"""
+    suivi = _suivi.get()
+    if suivi is not None:
+        suivi.plafonds.append(secondes)
+
+
+class _Suivi:
+    """Plafonds de durée de vie et échecs à secourir notés pendant un appel, remontés à l'appel englobant.
+
+    Listes partagées: visibles aussi depuis un thread lancé par la lecture (copie du contexte).
+    """
+
+    def __enter__(self):
+        self.englobant = _suivi.get()
+        self.plafonds = []
+        self.secours = []
+        self._jeton = _suivi.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _suivi.reset(self._jeton)
+        if self.englobant is not None:
+            self.englobant.plafonds.extend(self.plafonds)
+            self.englobant.secours.extend(self.secours)
+
+    def ttl(self, ttl):
+        if not self.plafonds:
+            return ttl
+        return min(self.plafonds + ([ttl] if ttl else []))
+
+
+def serialiser(valeur):
+    """Octets compacts de `valeur`: flux Arrow IPC pour un DataFrame, pickle sinon"""
+    import pandas as pd
+
+    if isinstance(valeur, pd.DataFrame):
+        try:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(valeur)
+            sortie = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sortie, table.schema) as flux:
+                flux.write_table(table)
+            return b"A" + sortie.getvalue().to_pybytes()
+        except Exception:
+            # Colonnes objet hétérogènes: pickle reste exact
+            pass
+    return b"P" + pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialiser(donnees):
+    if donnees[:1] == b"A":
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(memoryview(donnees)[1:]).read_all().to_pandas()
+    return pickle.loads(memoryview(donnees)[1:])
+
+
+class MemoireLocale:
+    """Stockage en mémoire du processus, borné en octets, éviction LRU"""
+
+    def __init__(self, taille_max=64 * 1024 * 1024):
+        self.taille_max = taille_max
+        self.taille = 0
+        self.evictions = 0
+        self._entrees = OrderedDict()  # cle -> (octets, expiration)
+        self._verrou = threading.Lock()
+
+    def lire(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return None
+            donnees, expiration = entree
+            if expiration is not None and expiration <= time.monotonic():
+                self._retirer(cle)
+                return None
+            self._entrees.move_to_end(cle)
+            return donnees
+
+    def ecrire(self, cle, donnees, ttl=None):
+        if len(donnees) > self.taille_max:
+            return
+        expiration = time.monotonic() + ttl if ttl else None
+        with self._verrou:
+            if cle in self._entrees:
+                self._retirer(cle)
+            self._entrees[cle] = (donnees, expiration)
+            self.taille += len(donnees)
+            while self.taille > self.taille_max:
+                self._retirer(next(iter(self._entrees)))
+                self.evictions += 1
+
+    def _retirer(self, cle):
+        donnees, _ = self._entrees.pop(cle)
+        self.taille -= len(donnees)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self.taille = 0
+
+    def utilisation(self):
+        with self._verrou:
+            return {
+                "entrees": len(self._entrees),
+                "octets": self.taille,
+                "octets_max": self.taille_max,
+                "evictions": self.evictions,
+            }
+
+
+class ServeurCleValeur:
+    """Stockage dans un serveur clé-valeur local partagé par les processus.
+
+    `client` expose get, set(cle, valeur, ex=secondes), delete, scan_iter et
+    info, comme redis.Redis: un double en mémoire peut le remplacer en test.
+    L'éviction LRU et le plafond mémoire sont ceux du serveur (maxmemory,
+    maxmemory-policy allkeys-lru).
+    """
+
+    def __init__(self, client, prefixe="pointage:cache:"):
+        self.client = client
+        self.prefixe = prefixe
+
+    def lire(self, cle):
+        return self.client.get(self.prefixe + cle)
+
+    def ecrire(self, cle, donnees, ttl=None):
+        self.client.set(self.prefixe + cle, donnees, ex=int(ttl) if ttl else None)
+
+    def vider(self):
+        cles = list(self.client.scan_iter(self.prefixe + "*"))
+        if cles:
+            self.client.delete(*cles)
+
+    def utilisation(self):
+        try:
+            memoire = self.client.info("memory")
+        except Exception:
+            return {}
+        return {
+            "octets": memoire.get("used_memory"),
+            "octets_max": memoire.get("maxmemory") or None,
+            "evictions": self.client.info("stats").get("evicted_keys"),
+        }
+
+
+def creer_stockage(type_stockage="memoire", taille_max=64 * 1024 * 1024, url=None):
+    """Stockage désigné par la configuration: "memoire" ou "redis" (url redis://...)"""
+    if type_stockage == "memoire":
+        return MemoireLocale(taille_max)
+    if type_stockage == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Le stockage \"redis\" demande le paquet redis (pip install redis)") from e
+        return ServeurCleValeur(redis.Redis.from_url(url or "redis://localhost:6379/0"))
+    raise ValueError(f"Stockage de cache inconnu: {type_stockage!r}")
+
+
+def _taux_succes(trouves, manques):
+    total = trouves + manques
+    return trouves / total if total else None
+
+
+class CacheLectures:
+    """Cache à lecture traversante des fonctions d'accès aux données.
+
+    Une entrée est indexée par (fonction, paramètres, versions des tables lues)
+    et peut en plus expirer après `ttl` secondes.
+    """
+
+    def __init__(self, versions, stockage=None):
+        self.versions = versions
+        self.stockage = stockage or MemoireLocale()
+        self._verrou = threading.Lock()
+        self.statistiques = {}  # fonction -> {"trouves", "manques", "octets", "secours"}
+
+    def _compter(self, nom, champ, valeur=1):
+        with self._verrou:
+            stats = self.statistiques.setdefault(nom, {"trouves": 0, "manques": 0, "octets": 0, "secours": 0})
+            stats[champ] += valeur
+
+    def _cle(self, fonction, nom, args, kwargs, versions, par_jour):
+        cle = repr((nom, args, tuple(sorted(kwargs.items())), versions, date.today() if par_jour else None))
+        return f"{fonction.__qualname__}:{hashlib.sha256(cle.encode()).hexdigest()}"
+
+    def _trouver(self, nom, cle):
+        try:
+            donnees = self.stockage.lire(cle)
+        except Exception:
+            donnees = None
+        self._compter(nom, "trouves" if donnees is not None else "manques")
+        return donnees
+
+    def _cle_secours(self, fonction, nom, args, kwargs, par_jour):
+        return "secours:" + self._cle(fonction, nom, args, kwargs, None, par_jour)
+
+    def _garder(self, nom, cle, secours, resultat, ttl):
+        try:
+            donnees = serialiser(resultat)
+            self.stockage.ecrire(cle, donnees, ttl)
+            # Le secours désigne l'entrée, sans la dupliquer
+            self.stockage.ecrire(secours, cle.encode(), ttl)
+            self._compter(nom, "octets", len(donnees))
+        except Exception:
+            # Le cache est une optimisation: une panne du stockage ne bloque pas la lecture
+            pass
+
+    def _secours(self, nom, secours):
+        """(True, dernier résultat gardé pour ces paramètres) ou (False, None) s'il n'y en a plus"""
+        try:
+            cle = self.stockage.lire(secours)
+            donnees = self.stockage.lire(cle.decode()) if cle is not None else None
+        except Exception:
+            donnees = None
+        if donnees is None:
+            return False, None
+        self._compter(nom, "secours")
+        noter(degradees=1)
+        return True, deserialiser(donnees)
+
+    def lecture(self, *tables, par_jour=False, ttl=None):
+        """Décorateur: met en cache le résultat tant que les versions de `tables` ne changent pas.
+
+        `par_jour` ajoute la date du jour à la clé (requêtes sur CURRENT_DATE);
+        `ttl` borne la durée de vie, seule limite pour une fonction sans table.
+        Une coroutine (lecture de pointage.asynchrone) n'est pas mise en cache
+        quand elle lève. Sur un délai dépassé ou une base indisponible, la
+        lecture sert son secours s'il en reste un.
+        """
+        def decorateur(fonction):
+            nom = f"{fonction.__module__}.{fonction.__qualname__}"
+
+            if inspect.iscoroutinefunction(fonction):
+                @functools.wraps(fonction)
+                async def enveloppe_async(*args, **kwargs):
+                    secours = self._cle_secours(fonction, nom, args, kwargs, par_jour)
+                    cle = None
+                    versions = ()
+                    if tables:
+                        # Peut relire table_versions en base: hors de la boucle
+                        versions = await asyncio.to_thread(self.versions.obtenir, tables)
+                    if versions is not None:
+                        cle = self._cle(fonction, nom, args, kwargs, versions, par_jour)
+                        donnees = self._trouver(nom, cle)
+                        if donnees is not None:
+                            return deserialiser(donnees)
+                    with _Suivi() as suivi:
+                        try:
+                            resultat = await fonction(*args, **kwargs)
+                        except Exception as e:
+                            trouve, resultat = (
+                                self._secours(nom, secours) if est_delai(e) or suivi.secours else (False, None)
+                            )
+                            if not trouve:
+                                raise
+                            return resultat
+                    if cle is not None:
+                        self._garder(nom, cle, secours, resultat, suivi.ttl(ttl))
+                    return resultat
+
+                return enveloppe_async
+
+            @functools.wraps(fonction)
+            def enveloppe(*args, **kwargs):
+                secours = self._cle_secours(fonction, nom, args, kwargs, par_jour)
+                cle = None
+                versions = self.versions.obtenir(tables) if tables else ()
+                if versions is not None:
+                    cle = self._cle(fonction, nom, args, kwargs, versions, par_jour)
+                    donnees = self._trouver(nom, cle)
+                    if donnees is not None:
+                        # Chaque lecture désérialise un objet neuf: l'appelant peut le modifier
+                        return deserialiser(donnees)
+
+                echecs = getattr(_local, "echecs", 0)
+                with _Suivi() as suivi:
+                    resultat = fonction(*args, **kwargs)
+                if getattr(_local, "echecs", 0) != echecs:
+                    if suivi.secours:
+                        trouve, ancien = self._secours(nom, secours)
+                        if trouve:
+                            return ancien
+                    return resultat
+                if cle is not None:
+                    self._garder(nom, cle, secours, resultat, suivi.ttl(ttl))
+                return resultat
+
+            return enveloppe
+
+        return decorateur
+
+    def vider(self):
+        self.stockage.vider()
+        with self._verrou:
+            self.statistiques.clear()
+
+    def rapport(self):
+        """Statistiques par fonction et utilisation du stockage, pour la page d'administration.
+
+        Les taux de succès valent None sans lecture du cache: une fonction qui
+        n'a servi que des secours (versions des tables illisibles) n'en a pas.
+        """
+        with self._verrou:
+            par_fonction = {nom: dict(stats) for nom, stats in self.statistiques.items()}
+        for stats in par_fonction.values():
+            stats["taux_succes"] = _taux_succes(stats["trouves"], stats["manques"])
+        return {
+            "taux_succes": _taux_succes(sum(s["trouves"] for s in par_fonction.values()),
+                                        sum(s["manques"] for s in par_fonction.values())),
+            "par_fonction": par_fonction,
+            "stockage": self.stockage.utilisation(),
+        }
+
+
+# Une instance par processus, comme la présence sur site
+versions_tables = VersionsTables()
+cache_lectures = CacheLectures(versions_tables)
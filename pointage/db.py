@@ -0,0 +1,1730 @@
+"""Accès aux données et logique métier du pointage.
+
+Pool de connexions, création du schéma, lectures (mises en cache par
+pointage.cache) et écritures. Le module est importé une fois par processus:
+les réexécutions de app.py, qui ne contient que les pages, ne redéfinissent
+plus rien. Les erreurs sont affichées avec st.error, comme dans les pages;
+les délais dépassés (pointage.delais) et la base injoignable
+(pointage.resilience) sont résumés une fois par la page. Les lectures
+idempotentes (@reessayer) sont relancées sur une erreur transitoire.
+
+Avec config.BD = "sqlite" (poste de pointage local), seules les fonctions
+qui passent par `backend` sont utilisables: création des tables,
+connexion, ajout d'employé, pointages et listes du poste.
+"""
+import hashlib
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import psycopg2
+import psycopg2.pool
+import streamlit as st
+
+import config
+from pointage.asynchrone import creer_pilote
+from pointage.backends import BackendPostgres, BackendSqlite
+from pointage.blobstore import BlobStore, FichierTropVolumineux
+from pointage.cache import SQL_VERSIONS, cache_lectures, creer_stockage, lire_versions, signaler_echec, versions_tables
+from pointage.delais import ConnexionPointage, DelaiDepasse, delai_requete, delais, ecriture, est_delai
+from pointage.export import exporter
+from pointage.images import TraitementCertificats
+from pointage.metrics import CurseurMesure, instrumente, noter
+from pointage.notifications import SQL_NOTIFICATIONS, Ecouteur
+from pointage.presence import presence
+from pointage.replique import ConnexionReplique, lire_position_primaire, mesurer_retard, routage, vers_replique
+from pointage.resilience import BaseIndisponible, connexion_cassee, reessayer, resilience
+from pointage.slowlog import journal_lent
+
+# =========================
+# Gestion des connexions avec pool
+# =========================
+connection_pool = None
+
+# statement_timeout des fonctions sans @delai_requete
+delais.configurer(config.REQUETE_DELAI_MS)
+resilience.configurer(
+    tentatives=config.RESILIENCE_TENTATIVES,
+    attente_base=config.RESILIENCE_ATTENTE_BASE_S,
+    attente_max=config.RESILIENCE_ATTENTE_MAX_S,
+    seuil=config.DISJONCTEUR_SEUIL,
+    duree_ouverture=config.DISJONCTEUR_OUVERTURE_S,
+)
+
+# Mêmes paramètres que les scripts hors Streamlit (secrets.toml, variables PG*)
+parametres_connexion = config.parametres_connexion
+
+def init_connection_pool():
+    """Crée le pool au premier appel du processus; les réexécutions suivantes le réutilisent"""
+    global connection_pool
+    if connection_pool is not None:
+        return True
+    try:
+        # Pool partagé entre threads: les requêtes d'une page peuvent être lancées en parallèle
+        connection_pool = psycopg2.pool.ThreadedConnectionPool(
+            1, 20, connection_factory=ConnexionPointage, cursor_factory=CurseurMesure,
+            connect_timeout=config.BD_DELAI_CONNEXION_S, **parametres_connexion()
+        )
+        return True
+    except Exception as e:
+        signaler_erreur(f"Erreur d'initialisation du pool de connexions: {e}")
+        return False
+
+def get_connection():
+    if connection_pool is None:
+        if not init_connection_pool():
+            return None
+    try:
+        return _connexion()
+    except (DelaiDepasse, BaseIndisponible) as e:
+        signaler_erreur(str(e), e)
+    except Exception as e:
+        signaler_erreur(f"Erreur d'obtention de connexion: {e}")
+    return None
+
+def _connexion():
+    """Connexion empruntée, délai de la fonction en cours réglé; lève si le budget, le disjoncteur ou le pool refusent"""
+    delai = delais.delai_ms()
+    resilience.autoriser()
+    # Lecture de rapport (@vers_replique): réplique si le routage l'accepte
+    conn = None
+    if replica_pool is not None and routage.utiliser_replique():
+        conn = _connexion_replique()
+    if conn is None:
+        debut = time.perf_counter()
+        conn = connection_pool.getconn()
+        noter(attente_connexion=time.perf_counter() - debut)
+    try:
+        delais.regler(conn, delai)
+    except Exception:
+        return_connection(conn)
+        raise
+    return conn
+
+def return_connection(conn):
+    if not conn:
+        return
+    # Connexion perdue (serveur redémarré, coupure réseau): fermée plutôt que rendue au pool
+    casse = connexion_cassee(conn)
+    if casse:
+        resilience.compter("connexions écartées")
+    if isinstance(conn, ConnexionReplique):
+        if replica_pool:
+            replica_pool.putconn(conn, close=casse)
+        return
+    if connection_pool:
+        connection_pool.putconn(conn, close=casse)
+
+def _emprunter_connexion():
+    # Lève l'erreur d'origine (délai, disjoncteur, connexion perdue), que l'appelant sait reconnaître
+    if connection_pool is None and not init_connection_pool():
+        raise RuntimeError("connexion à la base indisponible")
+    return _connexion()
+
+# Schéma, utilisateurs, employés et écritures du pointage: SQL partagé entre les
+# backends. Poste local (config.BD = "sqlite"): seules ces opérations sont servies
+if config.BD == "sqlite":
+    backend = BackendSqlite(config.BD_SQLITE_CHEMIN)
+else:
+    backend = BackendPostgres(_emprunter_connexion, return_connection)
+
+# =========================
+# Réplique en lecture seule pour les rapports (pointage.replique)
+# =========================
+replica_pool = None
+_parametres_replique = None
+
+# Instant (time.monotonic) de la dernière écriture de la session
+CLE_DERNIERE_ECRITURE = "derniere_ecriture"
+
+def parametres_replique():
+    """Paramètres de la réplique: config.REPLIQUE_DSN, sinon [postgres_replique] de secrets.toml; None sans réplique"""
+    if config.REPLIQUE_DSN:
+        parametres = psycopg2.extensions.parse_dsn(config.REPLIQUE_DSN)
+        parametres["database"] = parametres.pop("dbname", None) or parametres_connexion()["database"]
+        return parametres
+    section = st.secrets.get("postgres_replique")
+    if not section:
+        return None
+    return {
+        "host": section["host"],
+        "database": section["dbname"],
+        "user": section["user"],
+        "password": section["password"],
+        "port": section["port"],
+    }
+
+def brancher_replique(parametres):
+    """Pool de la réplique `parametres` et garde de retard; None remet toutes les lectures sur le primaire"""
+    global replica_pool, _parametres_replique
+    # Le pilote async reprend la configuration à son prochain appel
+    fermer_pilote_async()
+    if replica_pool is not None:
+        replica_pool.closeall()
+        replica_pool = None
+    _parametres_replique = None
+    if parametres is None:
+        routage.configurer(None)
+        return
+    # Une réplique arrêtée ne doit pas bloquer les rapports plus que quelques secondes
+    _parametres_replique = {"connect_timeout": 3, **parametres}
+    # Aucune connexion ouverte d'avance: une réplique absente au démarrage n'empêche rien
+    replica_pool = psycopg2.pool.ThreadedConnectionPool(
+        0, config.REPLIQUE_CONNEXIONS_MAX, connection_factory=ConnexionReplique, cursor_factory=CurseurMesure,
+        **_parametres_replique,
+    )
+    routage.configurer(
+        _mesurer_retard_replique,
+        retard_max=config.REPLIQUE_RETARD_MAX_S,
+        apres_ecriture=config.REPLIQUE_APRES_ECRITURE_S,
+        intervalle=config.REPLIQUE_VERIFICATION_S,
+    )
+
+def _mesurer_retard_replique():
+    # Position du primaire d'abord: la réplique doit l'avoir rejointe au moment où elle est interrogée
+    conn = connection_pool.getconn()
+    try:
+        position = lire_position_primaire(conn)
+    finally:
+        connection_pool.putconn(conn, close=connexion_cassee(conn))
+    conn = replica_pool.getconn()
+    try:
+        return mesurer_retard(conn, position)
+    finally:
+        replica_pool.putconn(conn, close=connexion_cassee(conn))
+
+def _connexion_replique():
+    try:
+        debut = time.perf_counter()
+        conn = replica_pool.getconn()
+        noter(attente_connexion=time.perf_counter() - debut)
+        return conn
+    except Exception as e:
+        # Lecture sur le primaire, sans message: le rapport reste juste
+        routage.signaler_panne(e)
+        return None
+
+@st.cache_resource
+def _configurer_replique():
+    brancher_replique(parametres_replique())
+    return routage
+
+def configurer_routage():
+    """À chaque exécution: réplique branchée (une fois par processus), écritures récentes de la session reprises"""
+    try:
+        _configurer_replique()
+    except Exception as e:
+        st.error(f"Erreur configuration de la réplique, rapports lus sur le primaire: {e}")
+    routage.reprendre_session(st.session_state.get(CLE_DERNIERE_ECRITURE))
+
+def _apres_ecriture():
+    """Après une écriture: versions de tables relues en base, lectures de la session gardées sur le primaire"""
+    versions_tables.invalider()
+    st.session_state[CLE_DERNIERE_ECRITURE] = routage.marquer_ecriture()
+
+def signaler_erreur(message, erreur=None):
+    """Affiche l'erreur et empêche la mise en cache du résultat de la lecture en cours.
+
+    Un délai dépassé ou une base injoignable (`erreur`, par défaut l'exception
+    en cours de traitement) n'est pas affiché: la lecture sert son secours du
+    cache s'il y en a un, et la page les résume en une fois. Une erreur
+    transitoire pendant une tentative @reessayer attend l'issue des suivantes.
+    """
+    erreur = erreur if erreur is not None else sys.exc_info()[1]
+    if est_delai(erreur):
+        signaler_echec(secours=True)
+        return
+    if resilience.intercepter(erreur):
+        return
+    signaler_echec()
+    noter(erreurs=1)
+    st.error(message)
+
+# =========================
+# Paramètres / Sécurité
+# =========================
+DEFAULT_ADMIN_USER = "admin"
+DEFAULT_ADMIN_PASS = "admin123"
+
+# =========================
+# Authentification & Utilisateurs
+# =========================
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def create_users_table():
+    try:
+        # Créer un admin par défaut si absent (table créée par backend.creer_schema)
+        backend.assurer_utilisateur(
+            DEFAULT_ADMIN_USER, sha256(DEFAULT_ADMIN_PASS), "admin", f"{DEFAULT_ADMIN_USER}@example.com"
+        )
+        return True
+    except Exception as e:
+        st.error(f"Erreur création administrateur par défaut: {e}")
+        return False
+
+@instrumente
+@reessayer
+def authenticate_user(username, password):
+    try:
+        return backend.authentifier(username, sha256(password)) or False
+    except Exception as e:
+        signaler_erreur(f"Erreur authentification: {e}")
+        return False
+
+@instrumente
+@cache_lectures.lecture("users")
+@reessayer
+def get_all_users():
+    conn = get_connection()
+    if conn is None:
+        return pd.DataFrame()
+    try:
+        return pd.read_sql_query(
+            "SELECT id, username, role, email, created_at FROM users ORDER BY username",
+            conn,
+        )
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération utilisateurs: {e}")
+        return pd.DataFrame()
+    finally:
+        if conn:
+            return_connection(conn)
+
+@instrumente
+@ecriture
+def create_user(username, password, role, email):
+    try:
+        backend.creer_utilisateur(username, sha256(password), role, email)
+        return True
+    except Exception as e:
+        st.error(f"Erreur création utilisateur: {e}")
+        return False
+    finally:
+        _apres_ecriture()
+
+# =========================
+# Modèle de données
+# =========================
+
+# Schéma et migrations: sans délai
+@delai_requete(0)
+def create_tables():
+    if config.BD == "sqlite":
+        return _creer_base_locale()
+    conn = get_connection()
+    if conn is None:
+        return False
+
+    try:
+        # Tables et migrations partagées avec les autres backends (pointage.backends)
+        backend.creer_schema()
+        with conn:
+            with conn.cursor() as cur:
+                # Index des grilles paginées par (date, id)
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_pointages_date_id ON pointages (date_pointage, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_retards_date_id ON retards (date_retard, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_absences_date_id ON absences (date_absence, id)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_conges_created_id ON conges (created_at, id)")
+
+                # Données d'exemple s'il n'y a personne
+                cur.execute("SELECT COUNT(*) FROM personnels")
+                if cur.fetchone()[0] == 0:
+                    cur.execute(
+                        """
+                        INSERT INTO personnels (nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue) VALUES
+                        ('Dupont', 'Jean', 'Reception', 'Jour', '08:00:00', '16:00:00'),
+                        ('Martin', 'Marie', 'Radiologie', 'Nuit', '20:00:00', '04:00:00'),
+                        ('Bernard', 'Pierre', 'Urgence', 'Jour', '07:30:00', '15:30:00'),
+                        ('Dubois', 'Sophie', 'Maternité', 'Nuit', '21:00:00', '05:00:00'),
+                        ('Moreau', 'Luc', 'Administration', 'Jour', '09:00:00', '17:00:00')
+                        """
+                    )
+        # Crée la table users et l'admin par défaut
+        create_users_table()
+        create_roster()
+        create_notifications()
+        create_versions()
+        migrer_certificats_vers_stockage()
+        return True
+    except Exception as e:
+        st.error(f"Erreur création tables: {e}")
+        return False
+    finally:
+        if conn:
+            return_connection(conn)
+
+def _creer_base_locale():
+    """Poste local: tables du contrat des backends et admin par défaut, sans roster ni notifications"""
+    try:
+        backend.creer_schema()
+    except Exception as e:
+        st.error(f"Erreur création tables: {e}")
+        return False
+    return create_users_table()
+
+# =========================
+# Stockage des certificats
+# =========================
+
+TYPES_MIME_CERTIFICAT = {
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+@st.cache_resource
+def get_blob_store():
+    return BlobStore(config.CERTIFICATS_DIR)
+
+@st.cache_resource
+def get_traitement_certificats():
+    """Pool de recompression des certificats image, partagé par le processus"""
+    return TraitementCertificats(
+        get_blob_store(),
+        dimension_max=config.IMAGE_DIMENSION_MAX,
+        qualite=config.IMAGE_QUALITE,
+        format_sortie=config.IMAGE_FORMAT,
+        taille_vignette=config.VIGNETTE_TAILLE,
+        references=certificats_references,
+        delai_suppression=config.CERTIFICATS_DELAI_SUPPRESSION_S,
+    )
+
+@instrumente
+@ecriture
+def remplacer_certificat(ancien_sha256, nouveau_sha256, taille, mime):
+    """Repointe les absences vers la version recompressée (appelé depuis le pool de travail)"""
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE absences
+                    SET certificat_sha256 = %s, certificat_taille = %s, certificat_mime = %s
+                    WHERE certificat_sha256 = %s
+                    """,
+                    (nouveau_sha256, taille, mime, ancien_sha256),
+                )
+    finally:
+        return_connection(conn)
+
+def certificats_references(empreintes):
+    """Empreintes parmi `empreintes` qu'une absence référence encore (appelé depuis le pool de travail)"""
+    conn = _emprunter_connexion()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT DISTINCT certificat_sha256 FROM absences WHERE certificat_sha256 = ANY(%s)",
+                (list(empreintes),),
+            )
+            return {ligne[0] for ligne in cur.fetchall()}
+    finally:
+        if not connexion_cassee(conn):
+            conn.rollback()
+        return_connection(conn)
+
+@st.cache_resource
+def _migrer_certificats():
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'absences' AND column_name = 'certificat_justificatif'
+                    """
+                )
+                if cur.fetchone() is None:
+                    return True
+
+                cur.execute("SELECT id FROM absences WHERE certificat_justificatif IS NOT NULL")
+                # Un certificat à la fois pour ne jamais charger tous les BYTEA ensemble
+                for (absence_id,) in cur.fetchall():
+                    cur.execute(
+                        "SELECT certificat_justificatif, type_certificat FROM absences WHERE id = %s",
+                        (absence_id,),
+                    )
+                    donnees, type_certificat = cur.fetchone()
+                    sha256, taille = get_blob_store().ajouter(bytes(donnees))
+                    mime = TYPES_MIME_CERTIFICAT.get((type_certificat or "").lower(), "application/octet-stream")
+                    cur.execute(
+                        """
+                        UPDATE absences
+                        SET certificat_sha256 = %s, certificat_taille = %s, certificat_mime = %s
+                        WHERE id = %s
+                        """,
+                        (sha256, taille, mime, absence_id),
+                    )
+                cur.execute("ALTER TABLE absences DROP COLUMN certificat_justificatif, DROP COLUMN type_certificat")
+        return True
+    finally:
+        return_connection(conn)
+
+def migrer_certificats_vers_stockage():
+    """Déplace les anciens certificats BYTEA vers le stockage par empreinte (une fois par processus)"""
+    try:
+        return _migrer_certificats()
+    except Exception as e:
+        st.error(f"Erreur migration des certificats: {e}")
+        return False
+
+# =========================
+# Fonctions utilitaires
+# =========================
+
+@instrumente
+@cache_lectures.lecture("personnels")
+@reessayer
+def get_services_disponibles():
+    conn = get_connection()
+    if conn is None:
+        return []
+    try:
+        df = pd.read_sql_query("SELECT DISTINCT service FROM personnels WHERE actif = TRUE ORDER BY service", conn)
+        return df['service'].tolist()
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération services: {e}")
+        return []
+    finally:
+        if conn:
+            return_connection(conn)
+
+def filtrer_personnel(recherche, filtre_service):
+    personnel_par_service = get_personnel_par_service()
+    result = {}
+    
+    for service, employes in personnel_par_service.items():
+        if filtre_service != "Tous les services" and service != filtre_service:
+            continue
+            
+        employes_filtres = []
+        for emp in employes:
+            nom_complet = f"{emp['prenom']} {emp['nom']}".lower()
+            if not recherche or recherche.lower() in nom_complet or recherche.lower() in emp['service'].lower() or recherche.lower() in emp['poste'].lower():
+                employes_filtres.append(emp)
+        
+        if employes_filtres:
+            result[service] = employes_filtres
+    
+    return result
+
+@instrumente
+@cache_lectures.lecture("pointages")
+@reessayer
+def get_pointage_employe_jour(personnel_id, date_pointage):
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        df = pd.read_sql_query(
+            """
+            SELECT * FROM pointages 
+            WHERE personnel_id = %s AND date_pointage = %s
+            """,
+            conn,
+            params=(personnel_id, date_pointage)
+        )
+        if not df.empty:
+            return df.iloc[0]
+        return None
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération pointage: {e}")
+        return None
+    finally:
+        if conn:
+            return_connection(conn)
+
+# =========================
+# Effectif attendu du jour (roster_jour)
+# =========================
+
+SQL_ROSTER = """
+CREATE TABLE IF NOT EXISTS roster_jour (
+    jour DATE NOT NULL,
+    personnel_id INTEGER NOT NULL REFERENCES personnels(id) ON DELETE CASCADE,
+    heure_entree_prevue TIME NOT NULL,
+    heure_sortie_prevue TIME NOT NULL,
+    etat VARCHAR(20) NOT NULL DEFAULT 'En attente'
+        CHECK (etat IN ('En attente', 'Présent', 'En retard', 'Absent', 'En congé')),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (jour, personnel_id)
+);
+CREATE INDEX IF NOT EXISTS idx_roster_jour_etat ON roster_jour (jour, etat);
+CREATE INDEX IF NOT EXISTS idx_conges_personnel_dates ON conges (personnel_id, date_debut, date_fin);
+
+-- État d'un employé pour un jour: congé > arrivée > absence > en attente
+CREATE OR REPLACE FUNCTION roster_etat(p_id INTEGER, j DATE) RETURNS VARCHAR AS $$
+    SELECT CASE
+        WHEN EXISTS (
+            SELECT 1 FROM conges c
+            WHERE c.personnel_id = p_id AND c.statut = 'Approuvé'
+            AND c.date_debut <= j AND c.date_fin >= j
+        ) THEN 'En congé'
+        WHEN EXISTS (
+            SELECT 1 FROM pointages pt
+            WHERE pt.personnel_id = p_id AND pt.date_pointage = j
+            AND pt.heure_arrivee IS NOT NULL AND pt.statut_arrivee = 'En retard'
+        ) THEN 'En retard'
+        WHEN EXISTS (
+            SELECT 1 FROM pointages pt
+            WHERE pt.personnel_id = p_id AND pt.date_pointage = j AND pt.heure_arrivee IS NOT NULL
+        ) THEN 'Présent'
+        WHEN EXISTS (
+            SELECT 1 FROM absences a WHERE a.personnel_id = p_id AND a.date_absence = j
+        ) THEN 'Absent'
+        ELSE 'En attente'
+    END
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION construire_roster_jour(j DATE) RETURNS INTEGER AS $$
+DECLARE
+    n INTEGER;
+BEGIN
+    INSERT INTO roster_jour (jour, personnel_id, heure_entree_prevue, heure_sortie_prevue, etat)
+    SELECT j, p.id, p.heure_entree_prevue, p.heure_sortie_prevue, roster_etat(p.id, j)
+    FROM personnels p
+    WHERE p.actif = TRUE
+    ON CONFLICT (jour, personnel_id) DO NOTHING;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION roster_recalculer(p_id INTEGER, debut DATE, fin DATE) RETURNS VOID AS $$
+    UPDATE roster_jour
+    SET etat = roster_etat(personnel_id, jour), updated_at = CURRENT_TIMESTAMP
+    WHERE personnel_id = p_id AND jour BETWEEN debut AND fin
+    AND etat IS DISTINCT FROM roster_etat(personnel_id, jour);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION roster_trigger_pointages() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM roster_recalculer(OLD.personnel_id, OLD.date_pointage, OLD.date_pointage);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM roster_recalculer(NEW.personnel_id, NEW.date_pointage, NEW.date_pointage);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION roster_trigger_absences() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM roster_recalculer(OLD.personnel_id, OLD.date_absence, OLD.date_absence);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM roster_recalculer(NEW.personnel_id, NEW.date_absence, NEW.date_absence);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION roster_trigger_conges() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM roster_recalculer(OLD.personnel_id, OLD.date_debut, OLD.date_fin);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM roster_recalculer(NEW.personnel_id, NEW.date_debut, NEW.date_fin);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Embauche, changement d'horaire ou désactivation: ajuste le roster du jour s'il est déjà construit
+CREATE OR REPLACE FUNCTION roster_trigger_personnels() RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM roster_jour WHERE jour = CURRENT_DATE) THEN
+        RETURN NULL;
+    END IF;
+    IF NEW.actif THEN
+        INSERT INTO roster_jour (jour, personnel_id, heure_entree_prevue, heure_sortie_prevue, etat)
+        VALUES (CURRENT_DATE, NEW.id, NEW.heure_entree_prevue, NEW.heure_sortie_prevue,
+                roster_etat(NEW.id, CURRENT_DATE))
+        ON CONFLICT (jour, personnel_id) DO UPDATE SET
+            heure_entree_prevue = EXCLUDED.heure_entree_prevue,
+            heure_sortie_prevue = EXCLUDED.heure_sortie_prevue,
+            updated_at = CURRENT_TIMESTAMP;
+    ELSE
+        DELETE FROM roster_jour WHERE jour = CURRENT_DATE AND personnel_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_roster_pointages') THEN
+        CREATE TRIGGER trg_roster_pointages
+        AFTER INSERT OR DELETE OR UPDATE OF heure_arrivee, statut_arrivee, personnel_id, date_pointage ON pointages
+        FOR EACH ROW EXECUTE FUNCTION roster_trigger_pointages();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_roster_absences') THEN
+        CREATE TRIGGER trg_roster_absences
+        AFTER INSERT OR DELETE OR UPDATE OF personnel_id, date_absence ON absences
+        FOR EACH ROW EXECUTE FUNCTION roster_trigger_absences();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_roster_conges') THEN
+        CREATE TRIGGER trg_roster_conges
+        AFTER INSERT OR DELETE OR UPDATE OF statut, date_debut, date_fin, personnel_id ON conges
+        FOR EACH ROW EXECUTE FUNCTION roster_trigger_conges();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_roster_personnels') THEN
+        CREATE TRIGGER trg_roster_personnels
+        AFTER INSERT OR UPDATE OF actif, heure_entree_prevue, heure_sortie_prevue ON personnels
+        FOR EACH ROW EXECUTE FUNCTION roster_trigger_personnels();
+    END IF;
+END
+$$;
+"""
+
+@st.cache_resource
+def _installer_roster():
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(SQL_ROSTER)
+        return True
+    finally:
+        return_connection(conn)
+
+def create_roster():
+    """Table roster_jour, fonctions et triggers qui la tiennent à jour (une fois par processus)"""
+    try:
+        return _installer_roster()
+    except Exception as e:
+        st.error(f"Erreur création du roster: {e}")
+        return False
+
+@st.cache_data(show_spinner=False)
+def _construire_roster(jour):
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT construire_roster_jour(%s)", (jour,))
+                return cur.fetchone()[0]
+    finally:
+        return_connection(conn)
+
+def assurer_roster_jour(jour=None):
+    """Construit le roster du jour au premier appel de la journée (idempotent entre processus)"""
+    try:
+        _construire_roster(jour or date.today())
+        return True
+    except Exception as e:
+        signaler_erreur(f"Erreur construction du roster: {e}")
+        return False
+
+# =========================
+# Notifications des écritures (LISTEN/NOTIFY)
+# =========================
+
+@st.cache_resource
+def _installer_notifications():
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(SQL_NOTIFICATIONS)
+        return True
+    finally:
+        return_connection(conn)
+
+def create_notifications():
+    """Triggers NOTIFY sur pointages, absences et congés (une fois par processus)"""
+    try:
+        return _installer_notifications()
+    except Exception as e:
+        st.error(f"Erreur création des notifications: {e}")
+        return False
+
+@st.cache_resource
+def get_ecouteur():
+    """Thread d'écoute unique du processus, partagé par toutes les sessions"""
+    ecouteur = Ecouteur(parametres_connexion())
+    ecouteur.abonner(presence.appliquer_evenement)
+    ecouteur.abonner(versions_tables.appliquer_evenement)
+    return ecouteur.demarrer()
+
+# =========================
+# Versions des tables (invalidation du cache de lecture)
+# =========================
+
+@st.cache_resource
+def _installer_versions():
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("connexion indisponible")
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(SQL_VERSIONS)
+        return True
+    finally:
+        return_connection(conn)
+
+def create_versions():
+    """Compteurs table_versions et leurs triggers (une fois par processus)"""
+    try:
+        return _installer_versions()
+    except Exception as e:
+        st.error(f"Erreur création des versions de tables: {e}")
+        return False
+
+def _lire_versions_tables():
+    # Appelé aussi depuis le thread d'écoute: lever plutôt qu'afficher
+    if resilience.disjoncteur.ouvert():
+        raise BaseIndisponible("disjoncteur ouvert")
+    conn = connection_pool.getconn()
+    try:
+        return lire_versions(conn)
+    finally:
+        if not connexion_cassee(conn):
+            conn.rollback()
+        return_connection(conn)
+
+@st.cache_resource
+def _configurer_stockage_cache():
+    cache_lectures.stockage = creer_stockage(config.CACHE_STOCKAGE, config.CACHE_TAILLE_MAX, config.CACHE_URL)
+    return cache_lectures.stockage
+
+def activer_cache_lectures():
+    """Branche le cache de lecture sur le pool courant et l'écouteur NOTIFY"""
+    try:
+        _configurer_stockage_cache()
+    except Exception as e:
+        st.error(f"Erreur configuration du cache ({config.CACHE_STOCKAGE}), mémoire locale utilisée: {e}")
+    ecouteur = get_ecouteur()
+    versions_tables.configurer(_lire_versions_tables, lambda: ecouteur.connecte)
+
+@st.cache_resource
+def configurer_journal_lent():
+    """Réglages initiaux du journal des requêtes lentes; la page Performance les modifie ensuite"""
+    journal_lent.configurer(
+        actif=config.REQUETES_LENTES_ACTIF,
+        seuil_ms=config.REQUETES_LENTES_SEUIL_MS,
+        echantillon=config.REQUETES_LENTES_ECHANTILLON,
+        taille=config.REQUETES_LENTES_TAILLE,
+    )
+    return journal_lent
+
+# =========================
+# Lectures asynchrones (pointage.asynchrone)
+# =========================
+
+_pilote_async = None
+_verrou_pilote_async = threading.Lock()
+
+def get_pilote_async():
+    """Pilote des lectures concurrentes (config.BD_ASYNC), créé au premier appel du processus"""
+    global _pilote_async
+    with _verrou_pilote_async:
+        if _pilote_async is None:
+            _pilote_async = creer_pilote(
+                config.BD_ASYNC, parametres=parametres_connexion(), obtenir=_emprunter_connexion,
+                rendre=return_connection, taille_max=config.BD_ASYNC_CONNEXIONS_MAX,
+                parametres_replique=_parametres_replique, routeur=routage, delais=delais,
+                resilience=resilience,
+            )
+        return _pilote_async
+
+def fermer_pilote_async():
+    global _pilote_async
+    with _verrou_pilote_async:
+        pilote, _pilote_async = _pilote_async, None
+    if pilote is not None:
+        pilote.fermer()
+
+def page_vide():
+    return pd.DataFrame(), None
+
+def personnel_vide():
+    """Effectif vide mais avec ses colonnes: les pages qui filtrent dessus continuent d'afficher"""
+    return pd.DataFrame(columns=["id", "nom", "prenom", "service", "poste", "heure_entree_prevue",
+                                 "heure_sortie_prevue", "actif"])
+
+def _attendre(coroutine, message, vide=pd.DataFrame):
+    """Version synchrone d'une lecture async: son résultat, ou `vide()` après avoir signalé l'erreur"""
+    try:
+        return get_pilote_async().executer(coroutine)
+    except Exception as e:
+        coroutine.close()
+        signaler_erreur(f"{message}: {e}")
+        return vide()
+
+def attendre_lectures(lectures, vides=None):
+    """Attend ensemble les lectures `{nom: coroutine}` d'une page et renvoie `{nom: résultat}`.
+
+    Une lecture en échec est signalée et remplacée par `vides[nom]()`
+    (DataFrame vide par défaut).
+    """
+    vides = vides or {}
+    try:
+        resultats = get_pilote_async().rassembler(lectures)
+    except Exception as e:
+        for coroutine in lectures.values():
+            coroutine.close()
+        resultats = dict.fromkeys(lectures, e)
+    for nom, resultat in resultats.items():
+        if isinstance(resultat, BaseException):
+            signaler_erreur(f"Erreur lecture {nom}: {resultat}", resultat)
+            resultats[nom] = vides.get(nom, pd.DataFrame)()
+    return resultats
+
+# =========================
+# Requêtes métier
+# =========================
+
+@instrumente
+@cache_lectures.lecture("personnels")
+@reessayer
+async def get_personnel_async():
+    return await get_pilote_async().lire(
+        "SELECT id, nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue, actif FROM personnels ORDER BY nom, prenom"
+    )
+
+def get_personnel():
+    return _attendre(get_personnel_async(), "Erreur récupération personnel", personnel_vide)
+
+@instrumente
+def lister_personnel_actif():
+    """Employés actifs (dicts), lus par le backend: sert aussi le poste local SQLite"""
+    try:
+        return backend.personnel_actif()
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération personnel: {e}")
+        return []
+
+@instrumente
+@ecriture
+def ajouter_personnel(nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue):
+    try:
+        backend.ajouter_personnel(nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue)
+        return True
+    except Exception as e:
+        st.error(f"Erreur ajout personnel: {e}")
+        return False
+    finally:
+        _apres_ecriture()
+
+@instrumente
+@ecriture
+def modifier_personnel(personnel_id, nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue, actif):
+    conn = get_connection()
+    if conn is None:
+        return False
+    try:
+        personnel_id = int(personnel_id)
+        
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE personnels 
+                    SET nom = %s, prenom = %s, service = %s, poste = %s, 
+                        heure_entree_prevue = %s, heure_sortie_prevue = %s, actif = %s
+                    WHERE id = %s
+                    """,
+                    (nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue, actif, personnel_id),
+                )
+        return True
+    except Exception as e:
+        st.error(f"Erreur modification personnel: {e}")
+        return False
+    finally:
+        if conn:
+            return_connection(conn)
+        _apres_ecriture()
+
+@instrumente
+@ecriture
+def enregistrer_pointage_arrivee(personnel_id, date_pointage, heure_arrivee, motif_retard=None, notes=None, est_absent=False):
+    # Vérifier si l'employé est en congé
+    if est_en_conge(personnel_id, date_pointage):
+        st.error("❌ Cet employé est en congé aujourd'hui. Pointage impossible.")
+        return False, 0
+    
+    try:
+        personnel_id = int(personnel_id)
+        # Règles d'arrivée, retard et absence automatique: pointage.backends.base
+        resultat = backend.enregistrer_arrivee(personnel_id, date_pointage, heure_arrivee, motif_retard, notes, est_absent)
+    except Exception as e:
+        st.error(f"Erreur enregistrement pointage arrivée: {e}")
+        return False, 0
+    finally:
+        _apres_ecriture()
+    if resultat is None:
+        return False, 0
+    # Une absence (retard de 30 minutes ou plus) n'enregistre pas d'arrivée
+    if not resultat["absent"]:
+        presence.arrivee(date_pointage, personnel_id, resultat["service"], resultat["poste"])
+    return True, resultat["retard_minutes"]
+
+@instrumente
+@cache_lectures.lecture("conges")
+@reessayer
+def est_en_conge(personnel_id, date_check):
+    """Vérifie si l'employé est en congé à une date donnée"""
+    try:
+        return backend.est_en_conge(personnel_id, date_check)
+    except Exception as e:
+        signaler_erreur(f"Erreur vérification congé: {e}")
+        return False
+
+@instrumente
+@ecriture
+def enregistrer_pointage_depart(personnel_id, date_pointage, heure_depart, motif_depart_avance=None, notes=None):
+    # Vérifier si l'employé est en congé
+    if est_en_conge(personnel_id, date_pointage):
+        st.error("❌ Cet employé est en congé aujourd'hui. Pointage impossible.")
+        return False, 0
+    
+    try:
+        personnel_id = int(personnel_id)
+        resultat = backend.enregistrer_depart(personnel_id, date_pointage, heure_depart, motif_depart_avance, notes)
+    except Exception as e:
+        st.error(f"Erreur enregistrement pointage départ: {e}")
+        return False, 0
+    finally:
+        _apres_ecriture()
+    if resultat is None:
+        return False, 0
+    presence.depart(date_pointage, personnel_id)
+    return True, resultat["depart_avance_minutes"]
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_EXPORT_MS, hors_budget=True)
+def exporter_pointages_periode(date_debut, date_fin, format_export, chemin, progression=None):
+    """Exporte la période dans `chemin` en flux (curseur serveur, mémoire bornée)"""
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        if format_export == "csv":
+            with open(chemin, "w", newline="", encoding="utf-8") as sortie:
+                return exporter(conn, format_export, date_debut, date_fin, sortie, progression=progression)
+        return exporter(conn, format_export, date_debut, date_fin, chemin, progression=progression)
+    except Exception as e:
+        st.error(f"Erreur export pointages: {e}")
+        return None
+    finally:
+        if conn:
+            return_connection(conn)
+
+JOURS_SEMAINE = ['Dimanche', 'Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi']
+
+def _calculer_analyse_retards(date_debut, date_fin, nb_tranches):
+    """Agrégats des retards calculés par PostgreSQL; les exceptions remontent à get_analyse_retards"""
+    conn = _emprunter_connexion()
+    try:
+        periode = {"debut": date_debut, "fin": date_fin, "nb_tranches": nb_tranches}
+        resume = pd.read_sql_query(
+            """
+            SELECT COUNT(*) AS total_retards,
+                   COALESCE(ROUND(AVG(retard_minutes), 1), 0)::float AS moyenne_minutes,
+                   COALESCE(MAX(retard_minutes), 0) AS max_minutes
+            FROM retards
+            WHERE date_retard BETWEEN %(debut)s AND %(fin)s
+            """,
+            conn,
+            params=periode,
+        )
+        par_employe = pd.read_sql_query(
+            """
+            SELECT p.nom, p.prenom,
+                   COUNT(*) AS nb_retards,
+                   SUM(r.retard_minutes) AS total_minutes,
+                   ROUND(AVG(r.retard_minutes), 1)::float AS moyenne_minutes
+            FROM retards r
+            JOIN personnels p ON r.personnel_id = p.id
+            WHERE r.date_retard BETWEEN %(debut)s AND %(fin)s
+            GROUP BY p.id, p.nom, p.prenom
+            ORDER BY nb_retards DESC, total_minutes DESC
+            LIMIT 5
+            """,
+            conn,
+            params=periode,
+        )
+        par_service = pd.read_sql_query(
+            """
+            SELECT p.service,
+                   COUNT(*) AS nb_retards,
+                   SUM(r.retard_minutes) AS total_minutes
+            FROM retards r
+            JOIN personnels p ON r.personnel_id = p.id
+            WHERE r.date_retard BETWEEN %(debut)s AND %(fin)s
+            GROUP BY p.service
+            ORDER BY nb_retards DESC
+            """,
+            conn,
+            params=periode,
+        )
+        par_jour = pd.read_sql_query(
+            """
+            SELECT DATE_TRUNC('day', date_retard)::date AS date_retard,
+                   COUNT(*) AS nb_retards,
+                   ROUND(AVG(retard_minutes), 1)::float AS moyenne_minutes
+            FROM retards
+            WHERE date_retard BETWEEN %(debut)s AND %(fin)s
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            conn,
+            params=periode,
+        )
+        histogramme = pd.read_sql_query(
+            """
+            WITH bornes AS (
+                SELECT MIN(retard_minutes) AS bas, MAX(retard_minutes) + 1 AS haut
+                FROM retards
+                WHERE date_retard BETWEEN %(debut)s AND %(fin)s
+            )
+            SELECT WIDTH_BUCKET(r.retard_minutes, b.bas, b.haut, %(nb_tranches)s) AS tranche,
+                   b.bas, b.haut, COUNT(*) AS nb_retards
+            FROM retards r CROSS JOIN bornes b
+            WHERE r.date_retard BETWEEN %(debut)s AND %(fin)s
+            GROUP BY tranche, b.bas, b.haut
+            ORDER BY tranche
+            """,
+            conn,
+            params=periode,
+        )
+        par_jour_semaine = pd.read_sql_query(
+            """
+            SELECT EXTRACT(DOW FROM date_retard)::int AS dow,
+                   COUNT(*) AS nb_retards,
+                   ROUND(AVG(retard_minutes), 1)::float AS moyenne_minutes
+            FROM retards
+            WHERE date_retard BETWEEN %(debut)s AND %(fin)s
+            GROUP BY dow
+            """,
+            conn,
+            params=periode,
+        )
+    finally:
+        return_connection(conn)
+
+    # Libellés des tranches et des jours (quelques lignes, plus aucune donnée brute)
+    if not histogramme.empty:
+        largeur = (histogramme['haut'] - histogramme['bas']) / nb_tranches
+        debut_tranche = histogramme['bas'] + (histogramme['tranche'] - 1) * largeur
+        histogramme['tranche_minutes'] = [
+            f"{d:.0f}-{d + l:.0f}" for d, l in zip(debut_tranche, largeur)
+        ]
+        histogramme = histogramme[['tranche', 'tranche_minutes', 'nb_retards']]
+
+    # Ordonner du lundi au dimanche
+    par_jour_semaine = (
+        par_jour_semaine.set_index('dow')
+        .reindex([1, 2, 3, 4, 5, 6, 0])
+        .reset_index()
+    )
+    par_jour_semaine['jour_semaine'] = [JOURS_SEMAINE[d] for d in par_jour_semaine['dow']]
+    par_jour_semaine['nb_retards'] = par_jour_semaine['nb_retards'].fillna(0).astype(int)
+
+    return {
+        "resume": resume.iloc[0].to_dict(),
+        "par_employe": par_employe,
+        "par_service": par_service,
+        "par_jour": par_jour,
+        "histogramme": histogramme,
+        "par_jour_semaine": par_jour_semaine[['jour_semaine', 'nb_retards', 'moyenne_minutes']],
+    }
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@cache_lectures.lecture("retards", "personnels", ttl=600)
+@reessayer
+def get_analyse_retards(date_debut, date_fin, nb_tranches=20):
+    """Statistiques des retards sur une période (seuls les agrégats quittent la base)"""
+    try:
+        return _calculer_analyse_retards(date_debut, date_fin, nb_tranches)
+    except Exception as e:
+        signaler_erreur(f"Erreur analyse des retards: {e}")
+        return {}
+
+@instrumente
+@cache_lectures.lecture("roster_jour", "absences", "personnels", par_jour=True)
+@reessayer
+async def get_absences_du_jour_async():
+    """Absences du jour (employés attendus sans arrivée ni congé); le roster du jour doit être construit"""
+    return await get_pilote_async().lire(
+        """
+        SELECT p.id, p.nom, p.prenom, p.service, p.poste, r.heure_entree_prevue,
+               a.motif, a.justifie, a.created_at
+        FROM roster_jour r
+        JOIN personnels p ON p.id = r.personnel_id
+        LEFT JOIN absences a ON a.personnel_id = r.personnel_id AND a.date_absence = r.jour
+        WHERE r.jour = %s AND r.etat IN ('En attente', 'Absent')
+        ORDER BY p.nom, p.prenom
+        """,
+        (date.today(),),
+    )
+
+def get_absences_du_jour():
+    """Récupère les absences du jour actuel (employés attendus sans arrivée ni congé)"""
+    assurer_roster_jour()
+    return _attendre(get_absences_du_jour_async(), "Erreur récupération absences du jour")
+
+# Recalculer le mois à chaque pointage n'apporte rien: quelques minutes de retard suffisent
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@cache_lectures.lecture(ttl=300, par_jour=True)
+@reessayer
+def get_stats_mensuelles():
+    conn = get_connection()
+    if conn is None:
+        return pd.DataFrame()
+    try:
+        return pd.read_sql_query(
+            """
+            SELECT 
+                p.nom, p.prenom, p.service,
+                COUNT(pt.id) as jours_presents,
+                SUM(CASE WHEN pt.statut_arrivee = 'En retard' THEN 1 ELSE 0 END) as jours_retard,
+                SUM(CASE WHEN pt.statut_depart = 'Départ anticipé' THEN 1 ELSE 0 END) as jours_depart_anticipé,
+                COALESCE(SUM(pt.retard_minutes),0) as total_retard_minutes,
+                COALESCE(SUM(pt.depart_avance_minutes),0) as total_depart_avance_minutes
+            FROM personnels p
+            LEFT JOIN pointages pt ON p.id = pt.personnel_id 
+                AND pt.date_pointage >= DATE_TRUNC('month', CURRENT_DATE)
+            WHERE p.actif = TRUE
+            GROUP BY p.id, p.nom, p.prenom, p.service
+            ORDER BY p.nom, p.prenom
+            """,
+            conn,
+        )
+    except Exception as e:
+        signaler_erreur(f"Erreur stats mensuelles: {e}")
+        return pd.DataFrame()
+    finally:
+        if conn:
+            return_connection(conn)
+
+@instrumente
+@ecriture
+def marquer_absence_automatique():
+    assurer_roster_jour()
+    conn = get_connection()
+    if conn is None:
+        return False
+    
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Employés encore en attente 30 minutes après l'heure prévue (même
+                # arithmétique horaire circulaire que datetime.combine(...).time())
+                cur.execute(
+                    """
+                    INSERT INTO absences (personnel_id, date_absence, motif, justifie)
+                    SELECT r.personnel_id, r.jour, %s, FALSE
+                    FROM roster_jour r
+                    WHERE r.jour = %s AND r.etat = 'En attente'
+                    AND r.heure_entree_prevue + INTERVAL '30 minutes' < %s
+                    ON CONFLICT (personnel_id, date_absence) DO NOTHING
+                    """,
+                    ("Absence non justifiée (automatique)", date.today(), datetime.now().time())
+                )
+        return True
+    except Exception as e:
+        st.error(f"Erreur marquage automatique des absences: {e}")
+        return False
+    finally:
+        if conn:
+            return_connection(conn)
+        _apres_ecriture()
+
+@instrumente
+@cache_lectures.lecture("personnels")
+@reessayer
+def get_personnel_par_service():
+    conn = get_connection()
+    if conn is None:
+        return {}
+    try:
+        df = pd.read_sql_query(
+            "SELECT id, nom, prenom, service, poste, heure_entree_prevue, heure_sortie_prevue, actif FROM personnels WHERE actif = TRUE ORDER BY service, nom, prenom",
+            conn,
+        )
+        
+        personnel_par_service = {}
+        for _, row in df.iterrows():
+            service = row['service']
+            if service not in personnel_par_service:
+                personnel_par_service[service] = []
+            personnel_par_service[service].append(row.to_dict())
+            
+        return personnel_par_service
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération personnel par service: {e}")
+        return {}
+    finally:
+        if conn:
+            return_connection(conn)
+
+@instrumente
+@cache_lectures.lecture("pointages", "personnels", par_jour=True)
+@reessayer
+async def get_pointages_du_jour_async():
+    return await get_pilote_async().lire(
+        """
+        SELECT p.id, p.nom, p.prenom, p.service, p.poste, p.heure_entree_prevue, p.heure_sortie_prevue,
+               pt.heure_arrivee, pt.heure_depart, pt.statut_arrivee, pt.statut_depart, 
+               pt.retard_minutes, pt.depart_avance_minutes, pt.motif_retard, pt.motif_depart_avance, pt.notes
+        FROM pointages pt
+        JOIN personnels p ON pt.personnel_id = p.id
+        WHERE pt.date_pointage = %s
+        ORDER BY p.service, p.nom, p.prenom
+        """,
+        (date.today(),),
+    )
+
+def get_pointages_du_jour():
+    return _attendre(get_pointages_du_jour_async(), "Erreur récupération pointages du jour")
+
+@instrumente
+def lister_pointages_du_jour(jour):
+    """Pointages de `jour` (dicts), lus par le backend: sert aussi le poste local SQLite"""
+    try:
+        return backend.pointages_du_jour(jour)
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération pointages: {e}")
+        return []
+
+@instrumente
+@reessayer
+def get_presence():
+    """Présence sur site du processus, reconstruite en une requête au premier appel du jour"""
+    aujourd_hui = date.today()
+    if presence.jour == aujourd_hui:
+        return presence
+    conn = get_connection()
+    if conn is None:
+        return presence
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT pt.personnel_id, p.service, p.poste
+                FROM pointages pt
+                JOIN personnels p ON pt.personnel_id = p.id
+                WHERE pt.date_pointage = %s
+                AND pt.heure_arrivee IS NOT NULL AND pt.heure_depart IS NULL
+                """,
+                (aujourd_hui,),
+            )
+            presence.reconstruire(aujourd_hui, cur.fetchall())
+    except Exception as e:
+        signaler_erreur(f"Erreur reconstruction de la présence: {e}")
+    finally:
+        if conn:
+            return_connection(conn)
+    return presence
+
+@instrumente
+@ecriture
+def enregistrer_absence(personnel_id, date_absence, motif, justifie=False, certificat_file=None):
+    if certificat_file:
+        # Copie par blocs vers le stockage avant de prendre une connexion:
+        # l'empreinte est calculée au fil de l'eau et la taille plafonnée
+        try:
+            certificat_file.seek(0)
+            sha256, taille = get_blob_store().ajouter_flux(certificat_file, config.CERTIFICAT_TAILLE_MAX)
+        except FichierTropVolumineux as e:
+            st.error(f"❌ Certificat refusé: {e}")
+            return False
+        except Exception as e:
+            st.error(f"Erreur enregistrement certificat: {e}")
+            return False
+
+    try:
+        # Conversion de numpy.int64 en int Python standard
+        personnel_id = int(personnel_id) if hasattr(personnel_id, 'item') else int(personnel_id)
+        # La table ne garde que la référence du fichier stocké
+        certificat = (sha256, taille, certificat_file.type) if certificat_file else None
+        backend.enregistrer_absence(personnel_id, date_absence, motif, justifie, certificat)
+        if certificat_file:
+            # Recompression et vignette en arrière-plan, une fois la ligne validée
+            get_traitement_certificats().soumettre(sha256, certificat_file.type, remplacer_certificat)
+        return True
+    except Exception as e:
+        st.error(f"Erreur enregistrement absence: {e}")
+        return False
+    finally:
+        _apres_ecriture()
+
+@instrumente
+@reessayer
+def get_certificat_absence(absence_id, debut=0, fin=None):
+    """Renvoie (flux d'octets par blocs, type MIME) du certificat, lu depuis le stockage.
+
+    Le flux est paresseux et peut être limité à la plage d'octets [debut, fin).
+    """
+    conn = get_connection()
+    if conn is None:
+        return None, None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT certificat_sha256, certificat_mime FROM absences WHERE id = %s",
+                (absence_id,)
+            )
+            result = cur.fetchone()
+            if result and result[0]:
+                return get_blob_store().lire_par_blocs(result[0], debut=debut, fin=fin), result[1]
+            return None, None
+    except FileNotFoundError:
+        st.error("Fichier du certificat introuvable dans le stockage")
+        return None, None
+    except Exception as e:
+        signaler_erreur(f"Erreur récupération certificat: {e}")
+        return None, None
+    finally:
+        if conn:
+            return_connection(conn)
+
+@instrumente
+def lire_certificat_absence(absence_id):
+    """(contenu, type MIME) du certificat à afficher ou télécharger; (None, None) en cas d'échec.
+
+    st.image et st.download_button (Streamlit 1.28) ne servent qu'un contenu
+    entier: le fichier passe par le flux borné de get_certificat_absence, dont
+    au plus CERTIFICAT_TAILLE_MAX octets, la taille acceptée à l'envoi, sont
+    lus.
+    """
+    flux, mime = get_certificat_absence(absence_id, fin=config.CERTIFICAT_TAILLE_MAX + 1)
+    if flux is None:
+        return None, None
+    try:
+        contenu = b"".join(flux)
+    except OSError as e:
+        st.error(f"Erreur lecture certificat: {e}")
+        return None, None
+    if len(contenu) > config.CERTIFICAT_TAILLE_MAX:
+        st.error(f"Certificat trop volumineux pour être ouvert (plus de {config.CERTIFICAT_TAILLE_MAX // (1024 * 1024)} Mo)")
+        return None, None
+    return contenu, mime
+
+@instrumente
+def get_vignette_certificat(sha256, mime):
+    """Chemin de la vignette en cache (None si absente: sa génération est alors planifiée)"""
+    traitement = get_traitement_certificats()
+    chemin = traitement.vignette_en_cache(sha256)
+    if chemin is None:
+        traitement.demander_vignette(sha256, mime)
+    return chemin
+
+# =========================
+# FONCTIONS CONGES
+# =========================
+
+@instrumente
+@ecriture
+def demander_conge(personnel_id, date_debut, date_fin, type_conge, motif):
+    """Enregistre une nouvelle demande de congé"""
+    try:
+        backend.demander_conge(personnel_id, date_debut, date_fin, type_conge, motif)
+        return True
+    except Exception as e:
+        st.error(f"Erreur lors de la demande de congé: {e}")
+        return False
+    finally:
+        _apres_ecriture()
+
+@instrumente
+@cache_lectures.lecture("conges")
+@reessayer
+async def get_conges_employe_async(personnel_id):
+    return await get_pilote_async().lire(
+        """
+        SELECT c.id, c.date_debut, c.date_fin, c.type_conge, c.motif, c.statut, c.created_at
+        FROM conges c
+        WHERE c.personnel_id = %s
+        ORDER BY c.date_debut DESC
+        """,
+        (personnel_id,),
+    )
+
+def get_conges_employe(personnel_id):
+    """Récupère tous les congés d'un employé"""
+    return _attendre(get_conges_employe_async(personnel_id), "Erreur récupération congés employé")
+
+@instrumente
+@cache_lectures.lecture("conges", "personnels")
+@reessayer
+async def get_tous_les_conges_async(filtre_statut="Tous"):
+    query = """
+        SELECT c.id, p.nom, p.prenom, p.service, c.date_debut, c.date_fin, 
+               c.type_conge, c.motif, c.statut, c.created_at
+        FROM conges c
+        JOIN personnels p ON c.personnel_id = p.id
+    """
+    
+    params = []
+    if filtre_statut != "Tous":
+        query += " WHERE c.statut = %s"
+        params.append(filtre_statut)
+    
+    query += " ORDER BY c.created_at DESC"
+    
+    return await get_pilote_async().lire(query, params)
+
+def get_tous_les_conges(filtre_statut="Tous"):
+    """Récupère tous les congés avec option de filtre par statut"""
+    return _attendre(get_tous_les_conges_async(filtre_statut), "Erreur récupération tous les congés")
+
+@instrumente
+@ecriture
+def modifier_statut_conge(conge_id, nouveau_statut):
+    """Modifie le statut d'une demande de congé"""
+    try:
+        backend.modifier_statut_conge(conge_id, nouveau_statut)
+        return True
+    except Exception as e:
+        st.error(f"Erreur modification statut congé: {e}")
+        return False
+    finally:
+        _apres_ecriture()
+
+@instrumente
+@cache_lectures.lecture("conges", "personnels", par_jour=True)
+@reessayer
+async def get_conges_en_cours_async():
+    return await get_pilote_async().lire(
+        """
+        SELECT p.nom, p.prenom, p.service, c.date_debut, c.date_fin, c.type_conge
+        FROM conges c
+        JOIN personnels p ON c.personnel_id = p.id
+        WHERE c.statut = 'Approuvé'
+        AND c.date_debut <= CURRENT_DATE
+        AND c.date_fin >= CURRENT_DATE
+        ORDER BY p.service, p.nom
+        """
+    )
+
+def get_conges_en_cours():
+    """Récupère les congés en cours (aujourd'hui dans la période)"""
+    return _attendre(get_conges_en_cours_async(), "Erreur récupération congés en cours")
+
+@instrumente
+@reessayer
+def verifier_disponibilite_conge(personnel_id, date_debut, date_fin):
+    """Vérifie si l'employé n'a pas déjà des congés qui se chevauchent"""
+    try:
+        return backend.conge_disponible(personnel_id, date_debut, date_fin)
+    except Exception as e:
+        signaler_erreur(f"Erreur vérification disponibilité congé: {e}")
+        return False
+
+# =========================
+# Pagination par curseur (date, id)
+# =========================
+
+TAILLES_PAGE = [25, 50, 100, 200]
+
+async def _lire_page(requete, params, colonnes_tri, apres, taille_page):
+    """Exécute `requete` (sans ORDER BY) triée par `colonnes_tri` (date, id) décroissants.
+
+    `apres` est le couple (date, id) de la dernière ligne de la page précédente.
+    Renvoie la page et le curseur de la page suivante (None s'il n'y en a pas).
+    """
+    col_date, col_id = colonnes_tri
+    params = list(params)
+    if apres is not None:
+        requete += f" AND ({col_date}, {col_id}) < (%s, %s)"
+        params.extend(apres)
+    requete += f" ORDER BY {col_date} DESC, {col_id} DESC LIMIT %s"
+    params.append(taille_page + 1)
+    df = await get_pilote_async().lire(requete, params)
+
+    suivant = None
+    if len(df) > taille_page:
+        df = df.iloc[:taille_page]
+        derniere = df.iloc[-1]
+        valeur_date = derniere[col_date.split('.')[-1]]
+        if hasattr(valeur_date, 'to_pydatetime'):
+            valeur_date = valeur_date.to_pydatetime()
+        suivant = (valeur_date, int(derniere[col_id.split('.')[-1]]))
+    return df, suivant
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@reessayer
+async def get_pointages_page_async(date_debut, date_fin, taille_page=50, apres=None):
+    return await _lire_page(
+        """
+        SELECT pt.id, p.nom, p.prenom, p.service, p.poste, p.heure_entree_prevue, p.heure_sortie_prevue,
+               pt.date_pointage, pt.heure_arrivee, pt.heure_depart, pt.statut_arrivee, pt.statut_depart,
+               pt.retard_minutes, pt.depart_avance_minutes, pt.motif_retard, pt.motif_depart_avance, pt.notes
+        FROM pointages pt
+        JOIN personnels p ON pt.personnel_id = p.id
+        WHERE pt.date_pointage BETWEEN %s AND %s
+        """,
+        (date_debut, date_fin), ("pt.date_pointage", "pt.id"), apres, taille_page,
+    )
+
+def get_pointages_page(date_debut, date_fin, taille_page=50, apres=None):
+    return _attendre(get_pointages_page_async(date_debut, date_fin, taille_page, apres),
+                     "Erreur récupération pointages", page_vide)
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@reessayer
+async def get_retards_page_async(date_debut, date_fin, taille_page=50, apres=None):
+    return await _lire_page(
+        """
+        SELECT r.id, p.nom, p.prenom, p.service, p.poste, p.heure_entree_prevue,
+               r.date_retard, r.retard_minutes, r.motif, r.created_at
+        FROM retards r
+        JOIN personnels p ON r.personnel_id = p.id
+        WHERE r.date_retard BETWEEN %s AND %s
+        """,
+        (date_debut, date_fin), ("r.date_retard", "r.id"), apres, taille_page,
+    )
+
+def get_retards_page(date_debut, date_fin, taille_page=50, apres=None):
+    return _attendre(get_retards_page_async(date_debut, date_fin, taille_page, apres),
+                     "Erreur récupération retards", page_vide)
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@reessayer
+async def get_absences_page_async(date_debut, date_fin, taille_page=50, apres=None):
+    return await _lire_page(
+        """
+        SELECT a.id, a.date_absence, p.nom, p.prenom, p.service, p.poste,
+               p.heure_entree_prevue, a.motif, a.justifie, a.certificat_sha256 IS NOT NULL as has_certificat,
+               a.certificat_sha256, a.certificat_taille, a.certificat_mime, a.created_at
+        FROM absences a
+        JOIN personnels p ON a.personnel_id = p.id
+        WHERE a.date_absence BETWEEN %s AND %s
+        """,
+        (date_debut, date_fin), ("a.date_absence", "a.id"), apres, taille_page,
+    )
+
+def get_absences_page(date_debut, date_fin, taille_page=50, apres=None):
+    return _attendre(get_absences_page_async(date_debut, date_fin, taille_page, apres),
+                     "Erreur récupération absences", page_vide)
+
+@instrumente
+@reessayer
+async def get_conges_page_async(filtre_statut="Tous", taille_page=50, apres=None):
+    requete = """
+        SELECT c.id, p.nom, p.prenom, p.service, c.date_debut, c.date_fin,
+               c.type_conge, c.motif, c.statut, c.created_at
+        FROM conges c
+        JOIN personnels p ON c.personnel_id = p.id
+        WHERE TRUE
+    """
+    params = []
+    if filtre_statut != "Tous":
+        requete += " AND c.statut = %s"
+        params.append(filtre_statut)
+    return await _lire_page(requete, params, ("c.created_at", "c.id"), apres, taille_page)
+
+def get_conges_page(filtre_statut="Tous", taille_page=50, apres=None):
+    return _attendre(get_conges_page_async(filtre_statut, taille_page, apres), "Erreur récupération congés", page_vide)
+
+@cache_lectures.lecture(ttl=60)
+@reessayer
+async def _compter(requete, params):
+    return int(await get_pilote_async().valeur(requete, params))
+
+REQUETES_COMPTAGE = {
+    "pointages": "SELECT COUNT(*) FROM pointages WHERE date_pointage BETWEEN %s AND %s",
+    "retards": "SELECT COUNT(*) FROM retards WHERE date_retard BETWEEN %s AND %s",
+    "absences": "SELECT COUNT(*) FROM absences WHERE date_absence BETWEEN %s AND %s",
+}
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+async def compter_periode_async(table, date_debut, date_fin):
+    """Nombre de lignes de la période (compté sur l'index de date, mis en cache 60 s)"""
+    return await _compter(REQUETES_COMPTAGE[table], (date_debut, date_fin))
+
+def compter_periode(table, date_debut, date_fin):
+    return _attendre(compter_periode_async(table, date_debut, date_fin), f"Erreur comptage {table}", lambda: None)
+
+@instrumente
+async def compter_conges_async(filtre_statut="Tous"):
+    """Nombre de congés; sans filtre, l'estimation des statistiques du planificateur suffit"""
+    if filtre_statut == "Tous":
+        estimation = await _compter("SELECT reltuples::bigint FROM pg_class WHERE oid = 'conges'::regclass", ())
+        if estimation >= 0:
+            return estimation
+        return await _compter("SELECT COUNT(*) FROM conges", ())
+    return await _compter("SELECT COUNT(*) FROM conges WHERE statut = %s", (filtre_statut,))
+
+def compter_conges(filtre_statut="Tous"):
+    return _attendre(compter_conges_async(filtre_statut), "Erreur comptage congés", lambda: None)
+
+def _calculer_stats_absences(date_debut, date_fin):
+    """Compteurs calculés par PostgreSQL; les exceptions remontent à get_stats_absences"""
+    conn = _emprunter_connexion()
+    try:
+        resume = pd.read_sql_query(
+            """
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE justifie) AS justifiees,
+                   COUNT(*) FILTER (WHERE NOT justifie) AS non_justifiees
+            FROM absences
+            WHERE date_absence BETWEEN %s AND %s
+            """,
+            conn,
+            params=(date_debut, date_fin),
+        )
+        par_service = pd.read_sql_query(
+            """
+            SELECT p.service, COUNT(*) AS count
+            FROM absences a
+            JOIN personnels p ON a.personnel_id = p.id
+            WHERE a.date_absence BETWEEN %s AND %s
+            GROUP BY p.service
+            ORDER BY p.service
+            """,
+            conn,
+            params=(date_debut, date_fin),
+        )
+        return {"resume": resume.iloc[0].to_dict(), "par_service": par_service}
+    finally:
+        return_connection(conn)
+
+@instrumente
+@vers_replique
+@delai_requete(config.REQUETE_DELAI_RAPPORT_MS)
+@cache_lectures.lecture("absences", "personnels", ttl=600)
+@reessayer
+def get_stats_absences(date_debut, date_fin):
+    """Compteurs et répartition par service des absences de la période"""
+    try:
+        return _calculer_stats_absences(date_debut, date_fin)
+    except Exception as e:
+        signaler_erreur(f"Erreur statistiques absences: {e}")
+        return {}
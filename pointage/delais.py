@@ -0,0 +1,152 @@
+"""Délais des requêtes: statement_timeout par fonction, budget de requêtes par page.
+
+Chaque connexion empruntée reçoit, avant sa première requête, le
+statement_timeout de la fonction en cours (@delai_requete(ms), sinon le délai
+par défaut): une requête d'historique qui s'emballe est annulée par le serveur
+et rend sa connexion au lieu de la garder.
+
+Le rendu d'une page ouvre un budget (`with delais.page(secondes)`): le délai
+de chaque requête est borné par ce qui reste du budget, l'attente d'une
+connexion aussi, et une fois le budget épuisé aucune requête n'est plus
+lancée (DelaiDepasse). La lecture concernée sert alors son dernier résultat
+en cache (pointage.cache) ou un résultat vide, et la page l'indique une fois,
+au lieu de rester bloquée. Les écritures (@ecriture) ne sont ni bornées ni
+refusées par le budget: un pointage n'est jamais perdu pour une page lente.
+Le délai borné est arrondi à la seconde inférieure, pour que les connexions
+du pool gardent le plus souvent leur réglage.
+
+Les délais dépassés sont comptés par fonction et par page (pointage.metrics).
+"""
+import contextvars
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+import psycopg2.errors
+import psycopg2.extensions
+
+from pointage.metrics import noter
+
+_delai = contextvars.ContextVar("pointage_delai_requete", default=None)
+_echeance = contextvars.ContextVar("pointage_echeance_page", default=None)
+
+# Pas d'arrondi du délai borné par le budget (ms)
+PAS_BUDGET_MS = 1000
+
+
+class DelaiDepasse(Exception):
+    """Budget de requêtes de la page épuisé avant une requête"""
+
+
+def est_delai(erreur):
+    """Vrai si `erreur` vient d'un délai: budget épuisé, statement_timeout, attente d'une connexion"""
+    if isinstance(erreur, (DelaiDepasse, psycopg2.errors.QueryCanceled)):
+        return True
+    # psycopg 3 (pointage.asynchrone): même SQLSTATE, et délai d'attente de son pool
+    return getattr(erreur, "sqlstate", None) == "57014" or type(erreur).__name__ == "PoolTimeout"
+
+
+class ConnexionPointage(psycopg2.extensions.connection):
+    """Connexion des pools psycopg2: retient son statement_timeout pour ne le régler qu'au changement"""
+
+    delai_ms = None
+
+
+class Delais:
+    def __init__(self):
+        self.defaut_ms = 5000
+
+    def configurer(self, defaut_ms):
+        """`defaut_ms`: statement_timeout des fonctions sans @delai_requete (0: aucun)"""
+        self.defaut_ms = int(defaut_ms)
+
+    def delai(self, ms, hors_budget=False):
+        """Décorateur: statement_timeout (ms, 0 = aucun) des requêtes de la fonction, synchrone ou coroutine.
+
+        `ms` None garde le délai en cours. `hors_budget` soustrait la fonction
+        au budget de la page (exports en flux, écritures).
+        """
+        def decorateur(fonction):
+            def entrer():
+                return _delai.set(ms) if ms is not None else None, _echeance.set(None) if hors_budget else None
+
+            def sortir(jetons):
+                if jetons[0] is not None:
+                    _delai.reset(jetons[0])
+                if jetons[1] is not None:
+                    _echeance.reset(jetons[1])
+
+            if inspect.iscoroutinefunction(fonction):
+                @functools.wraps(fonction)
+                async def enveloppe_async(*args, **kwargs):
+                    jetons = entrer()
+                    try:
+                        return await fonction(*args, **kwargs)
+                    finally:
+                        sortir(jetons)
+
+                return enveloppe_async
+
+            @functools.wraps(fonction)
+            def enveloppe(*args, **kwargs):
+                jetons = entrer()
+                try:
+                    return fonction(*args, **kwargs)
+                finally:
+                    sortir(jetons)
+
+            return enveloppe
+
+        return decorateur
+
+    @contextmanager
+    def page(self, budget_s):
+        """Budget de requêtes d'un rendu: `budget_s` secondes à partir de maintenant (None ou 0: aucun)"""
+        jeton = _echeance.set(time.monotonic() + budget_s if budget_s else None)
+        try:
+            yield
+        finally:
+            _echeance.reset(jeton)
+
+    def reste(self):
+        """Secondes restantes du budget de la page en cours, None sans budget"""
+        echeance = _echeance.get()
+        return None if echeance is None else echeance - time.monotonic()
+
+    def verifier_budget(self):
+        """Lève DelaiDepasse (compté dans les mesures) si le budget de la page est épuisé"""
+        reste = self.reste()
+        if reste is not None and reste <= 0:
+            noter(delais=1)
+            raise DelaiDepasse("budget de requêtes de la page épuisé")
+        return reste
+
+    def delai_ms(self):
+        """statement_timeout de la prochaine requête (ms, 0 = aucun): celui de la fonction, borné par le budget"""
+        reste = self.verifier_budget()
+        ms = _delai.get()
+        if ms is None:
+            ms = self.defaut_ms
+        if reste is None:
+            return ms
+        # Arrondi au pas inférieur (au moins un pas): la valeur change peu d'un emprunt à l'autre
+        reste_ms = max(PAS_BUDGET_MS, int(reste * 1000) // PAS_BUDGET_MS * PAS_BUDGET_MS)
+        return min(ms, reste_ms) if ms else reste_ms
+
+    def regler(self, conn, ms):
+        """Applique `ms` à la connexion psycopg2 `conn` (ConnexionPointage) si son réglage diffère"""
+        if conn.delai_ms == ms:
+            return
+        # Curseur de base, réglage de session validé: il survit au rollback du pool
+        with psycopg2.extensions.cursor(conn) as cur:
+            cur.execute("SET statement_timeout = %s", (ms,))
+        conn.commit()
+        conn.delai_ms = ms
+
+
+# Une instance par processus, comme le routage vers la réplique
+delais = Delais()
+delai_requete = delais.delai
+# Écritures: délai de la fonction, hors du budget de la page
+ecriture = delais.delai(None, hors_budget=True)
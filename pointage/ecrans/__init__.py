@@ -0,0 +1,5 @@
+"""Pages de l'application, une par module.
+
+app.py n'importe une page qu'au moment de l'afficher: les bibliothèques de
+graphiques ne sont chargées que par les pages qui en dessinent.
+"""
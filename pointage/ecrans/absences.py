@@ -0,0 +1,144 @@
+"""Absences et certificats (administrateurs)."""
+import mimetypes
+from datetime import date, timedelta
+
+import streamlit as st
+import plotly.express as px
+
+from pointage.db import (
+    enregistrer_absence, get_absences_page, get_personnel, get_stats_absences, get_traitement_certificats,
+    get_vignette_certificat, lire_certificat_absence,
+)
+from pointage.ecrans.commun import afficher_grille_paginee
+
+
+def show_absences_page():
+    st.title("❌ Gestion des Absences")
+    
+    tab1, tab2 = st.tabs(["Liste des Absences", "Ajouter une Absence"])
+    
+    with tab1:
+        st.subheader("📋 Liste des absences")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            date_debut = st.date_input("Date de début", value=date.today() - timedelta(days=30), key="abs_debut")
+        with col2:
+            date_fin = st.date_input("Date de fin", value=date.today(), key="abs_fin")
+        
+        if st.button("🔍 Charger les absences", key="btn_absences"):
+            st.session_state.periode_absences = (date_debut, date_fin)
+        
+        if st.session_state.get("periode_absences") == (date_debut, date_fin):
+            stats = get_stats_absences(date_debut, date_fin)
+            
+            if stats and stats['resume']['total'] > 0:
+                # Filtrer les colonnes pour une meilleure lisibilité
+                colonnes_affichees = ['date_absence', 'nom', 'prenom', 'service', 'poste', 'motif', 'justifie', 'has_certificat']
+                page_absences = afficher_grille_paginee(
+                    "absences",
+                    lambda taille, apres: get_absences_page(date_debut, date_fin, taille, apres),
+                    total=int(stats['resume']['total']),
+                    colonnes=colonnes_affichees,
+                    signature=(date_debut, date_fin),
+                )
+                afficher_certificats(page_absences)
+                
+                # Statistiques des absences
+                st.subheader("📊 Statistiques des absences")
+                col_stat1, col_stat2, col_stat3 = st.columns(3)
+                
+                with col_stat1:
+                    st.metric("Total des absences", int(stats['resume']['total']))
+                
+                with col_stat2:
+                    st.metric("Absences justifiées", int(stats['resume']['justifiees']))
+                
+                with col_stat3:
+                    st.metric("Absences non justifiées", int(stats['resume']['non_justifiees']))
+                
+                # Graphique des absences par service
+                if not stats['par_service'].empty:
+                    fig = px.bar(
+                        stats['par_service'],
+                        x='service',
+                        y='count',
+                        title="Nombre d'absences par service"
+                    )
+                    st.plotly_chart(fig)
+            else:
+                st.info("Aucune absence trouvée pour la période sélectionnée")
+    
+    with tab2:
+        st.subheader("➕ Ajouter une absence")
+        
+        personnel_df = get_personnel()
+        if not personnel_df.empty:
+            employe_selection = st.selectbox(
+                "Sélectionner un employé",
+                personnel_df.apply(lambda x: f"{x['prenom']} {x['nom']} - {x['service']}", axis=1)
+            )
+            
+            if employe_selection:
+                selected_index = personnel_df[
+                    personnel_df.apply(lambda x: f"{x['prenom']} {x['nom']} - {x['service']}" == employe_selection, axis=1)
+                ].index[0]
+                
+                emp_data = personnel_df.loc[selected_index]
+                
+                with st.form("ajouter_absence"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        date_absence = st.date_input("Date d'absence", value=date.today())
+                        justifie = st.checkbox("Absence justifiée")
+                    with col2:
+                        motif = st.text_area("Motif de l'absence")
+                        certificat = st.file_uploader("Certificat médical (si justifiée)", type=['pdf', 'jpg', 'jpeg', 'png'])
+                    
+                    if st.form_submit_button("✅ Enregistrer l'absence"):
+                        if enregistrer_absence(emp_data['id'], date_absence, motif, justifie, certificat):
+                            st.success("✅ Absence enregistrée avec succès")
+                        else:
+                            st.error("❌ Erreur lors de l'enregistrement de l'absence")
+        else:
+            st.info("Aucun employé disponible")
+        
+        stats_images = get_traitement_certificats().statistiques
+        if stats_images["traites"]:
+            economie_mo = get_traitement_certificats().economies() / (1024 * 1024)
+            st.caption(f"🖼️ {stats_images['traites']} certificats image optimisés, {economie_mo:.1f} Mo économisés")
+
+
+def afficher_certificats(absences_df):
+    """Vignettes des certificats de la page; le fichier n'est lu qu'à l'ouverture"""
+    if absences_df.empty or 'certificat_sha256' not in absences_df.columns:
+        return
+    avec_certificat = absences_df[absences_df['certificat_sha256'].notna()]
+    if avec_certificat.empty:
+        return
+    
+    st.subheader("📎 Certificats")
+    colonnes = st.columns(6)
+    for i, (_, absence) in enumerate(avec_certificat.iterrows()):
+        with colonnes[i % 6]:
+            legende = f"{absence['prenom']} {absence['nom']} - {absence['date_absence']}"
+            vignette = get_vignette_certificat(absence['certificat_sha256'], absence['certificat_mime'])
+            if vignette:
+                st.image(str(vignette), caption=legende)
+            else:
+                st.caption(f"📄 {legende} ({int(absence['certificat_taille']) // 1024} Ko)")
+    
+    choix = st.selectbox(
+        "Ouvrir un certificat",
+        avec_certificat['id'].tolist(),
+        format_func=lambda absence_id: " - ".join(
+            str(v) for v in avec_certificat.loc[avec_certificat['id'] == absence_id, ['prenom', 'nom', 'date_absence']].iloc[0]
+        ),
+        key="certificat_choisi",
+    )
+    if st.button("📂 Ouvrir", key="btn_ouvrir_certificat"):
+        contenu, mime = lire_certificat_absence(int(choix))
+        if contenu is not None:
+            if mime and mime.startswith("image/"):
+                st.image(contenu)
+            st.download_button("⬇️ Télécharger le certificat", contenu, file_name=f"certificat_{choix}{mimetypes.guess_extension(mime or '') or ''}", mime=mime)
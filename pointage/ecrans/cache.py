@@ -0,0 +1,54 @@
+"""État du cache des lectures (administrateurs)."""
+import pandas as pd
+import streamlit as st
+
+from pointage.cache import cache_lectures
+
+
+def show_cache():
+    st.title("🗄️ Cache des lectures")
+    
+    if st.session_state.user_role != "admin":
+        st.warning("⛔ Accès réservé aux administrateurs")
+        return
+    
+    rapport = cache_lectures.rapport()
+    stockage = rapport["stockage"]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        taux = rapport["taux_succes"]
+        st.metric("Taux de succès", "—" if taux is None else f"{taux:.0%}")
+    with col2:
+        octets = stockage.get("octets")
+        st.metric("Mémoire utilisée", "—" if octets is None else f"{octets / 1024 / 1024:.1f} Mo")
+    with col3:
+        octets_max = stockage.get("octets_max")
+        st.metric("Plafond", "—" if not octets_max else f"{octets_max / 1024 / 1024:.0f} Mo")
+    with col4:
+        st.metric("Évictions", stockage.get("evictions") or 0)
+    
+    st.caption(f"Stockage: {type(cache_lectures.stockage).__name__}"
+               + (f" — {stockage['entrees']} entrées" if "entrees" in stockage else ""))
+    
+    st.subheader("📋 Par fonction")
+    if rapport["par_fonction"]:
+        par_fonction = pd.DataFrame([
+            {
+                "fonction": nom.rsplit(".", 1)[-1],
+                "trouvés": stats["trouves"],
+                "manqués": stats["manques"],
+                "taux de succès": stats["taux_succes"],
+                "octets écrits": stats["octets"],
+                "secours servis": stats["secours"],
+            }
+            for nom, stats in rapport["par_fonction"].items()
+        ]).sort_values("manqués", ascending=False)
+        st.dataframe(par_fonction, use_container_width=True,
+                     column_config={"taux de succès": st.column_config.ProgressColumn(min_value=0, max_value=1)})
+    else:
+        st.info("Aucune lecture mise en cache depuis le démarrage du processus")
+    
+    if st.button("🧹 Vider le cache"):
+        cache_lectures.vider()
+        st.rerun()
@@ -0,0 +1,85 @@
+"""Grilles paginées par curseur, partagées par les pages d'historique, et mode direct des pages de suivi."""
+from datetime import datetime
+
+import streamlit as st
+
+from pointage.db import TAILLES_PAGE
+
+CLE_DIRECT = "attente_direct"
+
+
+def preparer_pagination(cle, signature=None):
+    """Affiche le choix de taille de page et renvoie l'état de pagination de la grille `cle`.
+
+    La pile des curseurs de début de page est gardée en session; elle est réinitialisée
+    quand la taille de page ou `signature` (les filtres de la grille) changent.
+    """
+    etat_cle = f"pagination_{cle}"
+    taille_page = st.selectbox("Lignes par page", TAILLES_PAGE, index=1, key=f"taille_{cle}")
+    etat = st.session_state.get(etat_cle)
+    if etat is None or etat["taille"] != taille_page or etat["signature"] != signature:
+        etat = {"taille": taille_page, "signature": signature, "curseurs": [None]}
+        st.session_state[etat_cle] = etat
+    return etat
+
+
+def afficher_grille_paginee(cle, charger_page, total=None, colonnes=None, signature=None):
+    """Affiche une page de `charger_page(taille_page, apres)` avec navigation précédent/suivant"""
+    etat = preparer_pagination(cle, signature)
+    df, suivant = charger_page(etat["taille"], etat["curseurs"][-1])
+    return afficher_page(cle, etat, df, suivant, total, colonnes)
+
+
+def afficher_page(cle, etat, df, suivant, total=None, colonnes=None):
+    """Affiche une page déjà chargée et les boutons de navigation"""
+    if df.empty:
+        return df
+    taille_page = etat["taille"]
+
+    colonnes_disponibles = [col for col in colonnes if col in df.columns] if colonnes else df.columns
+    st.dataframe(df[colonnes_disponibles], use_container_width=True)
+
+    numero = len(etat["curseurs"])
+    premiere = (numero - 1) * taille_page + 1
+    texte_total = f" sur {total}" if total is not None else ""
+    st.caption(f"Page {numero} — lignes {premiere} à {premiere + len(df) - 1}{texte_total}")
+
+    col_prec, col_suiv = st.columns(2)
+    with col_prec:
+        if st.button("⬅️ Précédent", key=f"prec_{cle}", disabled=numero == 1):
+            etat["curseurs"].pop()
+            st.rerun()
+    with col_suiv:
+        if st.button("Suivant ➡️", key=f"suiv_{cle}", disabled=suivant is None):
+            etat["curseurs"].append(suivant)
+            st.rerun()
+    return df
+
+
+def case_direct(cle, ecouteur, version, valeur=False):
+    """Case « Mise à jour en direct »; cochée, la page est relancée au premier événement après `version`.
+
+    `version` est lue sur l'écouteur avant les données de la page: un
+    événement reçu pendant le rendu relance aussitôt. L'attente elle-même
+    se fait en fin d'exécution (attendre_direct), une fois la page, la barre
+    latérale et les avertissements affichés.
+    """
+    if st.checkbox("🔴 Mise à jour en direct", value=valeur, key=cle):
+        st.session_state[CLE_DIRECT] = (ecouteur, version, datetime.now())
+
+
+def attendre_direct():
+    """Fin d'exécution: si la page est en mode direct, attend un événement (30 s sans écoute) et relance"""
+    attente = st.session_state.pop(CLE_DIRECT, None)
+    if attente is None:
+        return
+    ecouteur, version, charge_a = attente
+    statut = st.empty()
+    while True:
+        # Chaque affichage rend la main à Streamlit, qui interrompt l'attente sur une interaction
+        statut.caption(f"En direct — données de {charge_a:%H:%M:%S}")
+        if ecouteur.attendre(version, 1) != version:
+            break
+        if not ecouteur.connecte and (datetime.now() - charge_a).total_seconds() > 30:
+            break
+    st.rerun()
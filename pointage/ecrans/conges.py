@@ -0,0 +1,102 @@
+"""Demandes et validation des congés."""
+from datetime import date
+
+import streamlit as st
+
+from pointage.db import (
+    attendre_lectures, compter_conges_async, demander_conge, get_conges_employe_async, get_conges_page_async,
+    get_tous_les_conges_async, modifier_statut_conge, page_vide, verifier_disponibilite_conge,
+)
+from pointage.ecrans.commun import afficher_page, preparer_pagination
+
+
+def show_gestion_conges():
+    st.title("📅 Gestion des Congés")
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["Mes Congés", "Demander un Congé", "Tous les Congés", "Approbation"])
+    
+    # Les onglets sont tous rendus à chaque exécution: la demande éventuelle est
+    # enregistrée d'abord, puis les lectures des autres onglets sont attendues ensemble
+    with tab2:
+        st.subheader("➕ Nouvelle demande de congé")
+        with st.form("demande_conge"):
+            col1, col2 = st.columns(2)
+            with col1:
+                date_debut = st.date_input("Date de début", min_value=date.today())
+                type_conge = st.selectbox("Type de congé", ["Congé annuel", "Maladie", "Familial", "Exceptionnel"])
+            with col2:
+                date_fin = st.date_input("Date de fin", min_value=date.today())
+                motif = st.text_area("Motif")
+            
+            if st.form_submit_button("📤 Soumettre la demande"):
+                if date_debut <= date_fin:
+                    if verifier_disponibilite_conge(st.session_state.user_id, date_debut, date_fin):
+                        if demander_conge(st.session_state.user_id, date_debut, date_fin, type_conge, motif):
+                            st.success("✅ Demande de congé soumise avec succès")
+                        else:
+                            st.error("❌ Erreur lors de la soumission")
+                    else:
+                        st.error("❌ Vous avez déjà des congés qui se chevauchent avec cette période")
+                else:
+                    st.error("❌ La date de fin doit être après la date de début")
+    
+    with tab3:
+        st.subheader("👥 Tous les congés")
+        filtre_statut = st.selectbox("Filtrer par statut", ["Tous", "En attente", "Approuvé", "Rejeté"])
+        etat_conges = preparer_pagination("conges", filtre_statut)
+    
+    est_admin = st.session_state.user_role == "admin"
+    lectures = {
+        "mes_conges": get_conges_employe_async(st.session_state.user_id),
+        "page": get_conges_page_async(filtre_statut, etat_conges["taille"], etat_conges["curseurs"][-1]),
+        "total": compter_conges_async(filtre_statut),
+    }
+    if est_admin:
+        lectures["en_attente"] = get_tous_les_conges_async("En attente")
+    donnees = attendre_lectures(lectures, vides={"page": page_vide, "total": lambda: None})
+    
+    with tab1:
+        st.subheader("📋 Mes demandes de congé")
+        mes_conges = donnees["mes_conges"]
+        if not mes_conges.empty:
+            st.dataframe(mes_conges, use_container_width=True)
+        else:
+            st.info("Vous n'avez aucune demande de congé")
+    
+    with tab3:
+        tous_les_conges, suivant = donnees["page"]
+        afficher_page("conges", etat_conges, tous_les_conges, suivant, total=donnees["total"])
+        
+        if tous_les_conges.empty:
+            st.info("Aucun congé trouvé")
+    
+    with tab4:
+        if est_admin:
+            st.subheader("✅ Approbation des congés")
+            congés_en_attente = donnees["en_attente"]
+            
+            if not congés_en_attente.empty:
+                for _, conge in congés_en_attente.iterrows():
+                    with st.expander(f"{conge['prenom']} {conge['nom']} - {conge['date_debut']} au {conge['date_fin']}"):
+                        st.write(f"**Type:** {conge['type_conge']}")
+                        st.write(f"**Motif:** {conge['motif']}")
+                        
+                        col_btn1, col_btn2 = st.columns(2)
+                        with col_btn1:
+                            if st.button(f"✅ Approuver {conge['id']}"):
+                                if modifier_statut_conge(conge['id'], "Approuvé"):
+                                    st.success("✅ Congé approuvé")
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Erreur lors de l'approbation")
+                        with col_btn2:
+                            if st.button(f"❌ Rejeter {conge['id']}"):
+                                if modifier_statut_conge(conge['id'], "Rejeté"):
+                                    st.success("✅ Congé rejeté")
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Erreur lors du rejet")
+            else:
+                st.info("Aucun congé en attente d'approbation")
+        else:
+            st.warning("⛔ Accès réservé aux administrateurs")
@@ -0,0 +1,23 @@
+"""Page de connexion."""
+import streamlit as st
+
+from pointage.db import authenticate_user
+
+
+def show_login():
+    st.title("🔐 Connexion")
+    with st.form("login_form"):
+        username = st.text_input("Nom d'utilisateur")
+        password = st.text_input("Mot de passe", type="password")
+        submit = st.form_submit_button("Se connecter")
+        
+        if submit:
+            user = authenticate_user(username, password)
+            if user:
+                st.session_state.authenticated = True
+                st.session_state.user = user[1]  # username
+                st.session_state.user_role = user[2]  # role
+                st.session_state.user_id = user[0]  # id
+                st.rerun()
+            else:
+                st.error("❌ Identifiants incorrects")
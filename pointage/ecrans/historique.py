@@ -0,0 +1,113 @@
+"""Historique des pointages et exports."""
+from datetime import date, timedelta
+
+import streamlit as st
+
+from pointage.db import (
+    attendre_lectures, compter_periode_async, exporter_pointages_periode, get_absences_page_async,
+    get_pointages_page_async, get_retards_page_async, page_vide,
+)
+from pointage.ecrans.commun import afficher_page, preparer_pagination
+from pointage.export import FORMATS as FORMATS_EXPORT, FichierExport
+
+
+def show_historique_pointages():
+    st.title("📊 Historique des Pointages")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        date_debut = st.date_input("Date de début", value=date.today() - timedelta(days=7))
+    with col2:
+        date_fin = st.date_input("Date de fin", value=date.today())
+    
+    if st.button("🔍 Charger l'historique"):
+        st.session_state.periode_historique = (date_debut, date_fin)
+    
+    if st.session_state.get("periode_historique") == (date_debut, date_fin):
+        periode = (date_debut, date_fin)
+        tab1, tab2, tab3 = st.tabs(["Pointages", "Retards", "Absences"])
+        
+        with tab1:
+            etat_pointages = preparer_pagination("historique_pointages", periode)
+        with tab2:
+            etat_retards = preparer_pagination("historique_retards", periode)
+        with tab3:
+            etat_absences = preparer_pagination("historique_absences", periode)
+        
+        # Les trois pages et leurs totaux sont indépendants: attendus ensemble
+        donnees = attendre_lectures({
+            "pointages": get_pointages_page_async(date_debut, date_fin, etat_pointages["taille"], etat_pointages["curseurs"][-1]),
+            "retards": get_retards_page_async(date_debut, date_fin, etat_retards["taille"], etat_retards["curseurs"][-1]),
+            "absences": get_absences_page_async(date_debut, date_fin, etat_absences["taille"], etat_absences["curseurs"][-1]),
+            "total_pointages": compter_periode_async("pointages", date_debut, date_fin),
+            "total_retards": compter_periode_async("retards", date_debut, date_fin),
+            "total_absences": compter_periode_async("absences", date_debut, date_fin),
+        }, vides={
+            "pointages": page_vide, "retards": page_vide, "absences": page_vide,
+            "total_pointages": lambda: None, "total_retards": lambda: None, "total_absences": lambda: None,
+        })
+        
+        with tab1:
+            pointages_df, suivant = donnees["pointages"]
+            afficher_page(
+                "historique_pointages", etat_pointages, pointages_df, suivant,
+                total=donnees["total_pointages"],
+                colonnes=['nom', 'prenom', 'service', 'poste', 'heure_entree_prevue', 'heure_sortie_prevue',
+                          'date_pointage', 'heure_arrivee', 'heure_depart', 'statut_arrivee', 'statut_depart',
+                          'retard_minutes', 'depart_avance_minutes', 'motif_retard', 'motif_depart_avance', 'notes'],
+            )
+            if pointages_df.empty:
+                st.info("Aucun pointage dans la période sélectionnée")
+        
+        with tab2:
+            # Afficher seulement les colonnes disponibles
+            retards_df, suivant = donnees["retards"]
+            afficher_page(
+                "historique_retards", etat_retards, retards_df, suivant,
+                total=donnees["total_retards"],
+                colonnes=['nom', 'prenom', 'service', 'poste', 'date_retard', 'retard_minutes', 'motif'],
+            )
+            if retards_df.empty:
+                st.info("Aucun retard dans la période sélectionnée")
+        
+        with tab3:
+            # Afficher seulement les colonnes disponibles
+            absences_df, suivant = donnees["absences"]
+            afficher_page(
+                "historique_absences", etat_absences, absences_df, suivant,
+                total=donnees["total_absences"],
+                colonnes=['nom', 'prenom', 'service', 'poste', 'date_absence', 'motif', 'justifie'],
+            )
+            if absences_df.empty:
+                st.info("Aucune absence dans la période sélectionnée")
+
+    # Export en flux: n'affiche rien dans la grille, adapté aux longues périodes
+    with st.expander("📤 Exporter pour la paie (CSV / Parquet)"):
+        format_export = st.radio("Format", FORMATS_EXPORT, horizontal=True, key="format_export")
+        if st.button("📦 Préparer l'export", key="btn_export"):
+            ancien = st.session_state.pop("export_pointages", None)
+            if ancien is not None:
+                ancien.supprimer()
+
+            barre = st.progress(0.0, text="Export en cours...")
+
+            def progression(ecrites, total):
+                barre.progress(min(ecrites / total, 1.0) if total else 1.0, text=f"{ecrites} / {total} lignes")
+
+            export = FichierExport(format_export, f"pointages_{date_debut}_{date_fin}.{format_export}")
+            nb_lignes = exporter_pointages_periode(date_debut, date_fin, format_export, export.chemin, progression)
+            if nb_lignes is None:
+                export.supprimer()
+            else:
+                barre.progress(1.0, text=f"{nb_lignes} lignes exportées")
+                st.session_state.export_pointages = export
+
+        export = st.session_state.get("export_pointages")
+        if export is not None and export.supprimer.alive:
+            st.caption(f"Export prêt: {export.nom} ({export.taille() / 1e6:.1f} Mo)")
+            # Le bouton de téléchargement charge tout le fichier en mémoire: à la demande, pas à chaque exécution
+            if st.button("⬇️ Télécharger l'export", key="btn_telecharger_export"):
+                with open(export.chemin, "rb") as fichier:
+                    st.download_button("💾 Enregistrer le fichier", fichier, file_name=export.nom,
+                                       key="enregistrer_export")
+        st.caption("Pour les extractions pluriannuelles: `python -m pointage.export --debut AAAA-MM-JJ --fin AAAA-MM-JJ --format parquet --sortie paie.parquet`")
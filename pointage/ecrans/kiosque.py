@@ -0,0 +1,70 @@
+"""Poste de pointage local (config.BD = "sqlite"): arrivées, départs et pointages du jour."""
+from datetime import datetime, date, time
+
+import pandas as pd
+import streamlit as st
+
+from pointage.db import (
+    ajouter_personnel, enregistrer_pointage_arrivee, enregistrer_pointage_depart, lister_personnel_actif,
+    lister_pointages_du_jour,
+)
+
+
+def show_kiosque():
+    st.title("⏰ Pointage")
+    
+    personnel = lister_personnel_actif()
+    if personnel:
+        employes = {f"{emp['prenom']} {emp['nom']} - {emp['service']}": emp for emp in personnel}
+        employe = employes[st.selectbox("Employé", list(employes))]
+        st.write(f"**Heure prévue:** {employe['heure_entree_prevue']} - {employe['heure_sortie_prevue']}")
+        
+        heure = st.time_input("Heure", value=datetime.now().time(), key="kiosque_heure")
+        motif = st.text_input("Motif (retard ou départ anticipé)", key="kiosque_motif")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Pointer l'arrivée"):
+                success, retard = enregistrer_pointage_arrivee(employe['id'], date.today(), heure, motif or None)
+                if success:
+                    st.success("✅ Pointage d'arrivée enregistré")
+                    if retard > 0:
+                        st.warning(f"⏰ Retard enregistré: {retard} minutes")
+        with col2:
+            if st.button("🚪 Pointer le départ"):
+                success, avance = enregistrer_pointage_depart(employe['id'], date.today(), heure, motif or None)
+                if success:
+                    st.success("✅ Pointage de départ enregistré")
+                    if avance > 0:
+                        st.warning(f"⏰ Départ anticipé: {avance} minutes")
+    else:
+        st.info("Aucun employé actif")
+    
+    if st.session_state.user_role == "admin":
+        with st.expander("➕ Ajouter un employé"):
+            with st.form("kiosque_ajout_employe", clear_on_submit=True):
+                col1, col2 = st.columns(2)
+                with col1:
+                    nom = st.text_input("Nom")
+                    prenom = st.text_input("Prénom")
+                    service = st.text_input("Service")
+                with col2:
+                    poste = st.selectbox("Poste", ["Jour", "Nuit"])
+                    heure_entree = st.time_input("Heure d'entrée prévue", value=time(8, 0))
+                    heure_sortie = st.time_input("Heure de sortie prévue", value=time(16, 0))
+                
+                if st.form_submit_button("➕ Ajouter"):
+                    if nom and prenom and service:
+                        if ajouter_personnel(nom, prenom, service, poste, heure_entree, heure_sortie):
+                            st.success("✅ Employé ajouté avec succès")
+                        else:
+                            st.error("❌ Erreur lors de l'ajout")
+                    else:
+                        st.warning("⚠️ Veuillez remplir tous les champs obligatoires")
+    
+    st.subheader("📋 Pointages du jour")
+    pointages = lister_pointages_du_jour(date.today())
+    if pointages:
+        st.dataframe(pd.DataFrame(pointages), use_container_width=True)
+    else:
+        st.info("Aucun pointage enregistré aujourd'hui")
@@ -0,0 +1,196 @@
+"""Mesures par page et par fonction, requêtes lentes, profil d'un rendu (administrateurs)."""
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+
+from pointage.metrics import mesures
+from pointage.replique import routage
+from pointage.resilience import FERME, resilience
+from pointage.slowlog import journal_lent
+
+
+def afficher_profil(profil):
+    with st.expander(f"🔬 Profil de « {profil.nom} » — {profil.duree * 1000:.0f} ms", expanded=True):
+        categories = profil.par_categorie()
+        colonnes = st.columns(4)
+        for colonne, nom in zip(colonnes, ["SQL", "pandas", "widgets", "application"]):
+            with colonne:
+                st.metric(nom, f"{categories.get(nom, 0) * 1000:.0f} ms")
+        st.caption("Temps propre par origine (cProfile, thread du script). "
+                   "Les requêtes parallèles apparaissent dans l'attente de leurs résultats.")
+        
+        st.dataframe(pd.DataFrame(profil.points_chauds()), use_container_width=True, hide_index=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("⬇️ Profil cProfile (.prof)", profil.octets_prof(),
+                               file_name="page.prof", mime="application/octet-stream")
+        with col2:
+            st.download_button("⬇️ Piles repliées (flamegraph)", profil.piles_repliees(),
+                               file_name="page.folded", mime="text/plain")
+
+
+def _tableau_mesures(lignes):
+    """Percentiles en millisecondes (durées) et valeurs brutes (lignes, octets)"""
+    df = pd.DataFrame(lignes)
+    colonnes = {"nom": "nom", "appels": "appels", "erreurs": "erreurs", "delais": "délais dépassés",
+                "reessais": "nouvelles tentatives", "indisponible": "base injoignable",
+                "degradees": "servies du cache (dégradé)"}
+    for rang in (50, 95, 99):
+        colonnes[f"duree_p{rang}"] = f"durée p{rang} (ms)"
+    for rang in (50, 95, 99):
+        colonnes[f"duree_bd_p{rang}"] = f"BD p{rang} (ms)"
+    colonnes["attente_connexion_p95"] = "attente connexion p95 (ms)"
+    colonnes["lignes_p95"] = "lignes p95"
+    colonnes["octets_p95"] = "octets p95"
+    df = df[list(colonnes)].rename(columns=colonnes)
+    for colonne in df.columns:
+        if "(ms)" in colonne:
+            df[colonne] = (df[colonne] * 1000).round(1)
+    return df.sort_values("durée p95 (ms)", ascending=False)
+
+
+def afficher_requetes_lentes():
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        actif = st.toggle("Journal actif", value=journal_lent.actif,
+                          help="Réglage du processus, perdu au redémarrage (voir config.py)")
+    with col2:
+        seuil_ms = st.number_input("Seuil (ms)", min_value=1, value=int(journal_lent.seuil * 1000), step=50)
+    with col3:
+        echantillon = st.slider("Part des SELECT avec EXPLAIN", 0.0, 1.0, float(journal_lent.echantillon), 0.05)
+    journal_lent.configurer(actif=actif, seuil_ms=seuil_ms, echantillon=echantillon)
+    
+    entrees = journal_lent.entrees()
+    if not entrees:
+        st.info("Aucune requête au-dessus du seuil" if actif else "Journal désactivé")
+        return
+    
+    st.dataframe(pd.DataFrame([
+        {
+            "heure": e["horodatage"].strftime("%H:%M:%S"),
+            "fonction": e["fonction"] or "—",
+            "durée (ms)": round(e["duree"] * 1000, 1),
+            "lignes": e["lignes"],
+            "plan": e["plan"] is not None,
+            "requête": e["requete"][:120],
+        }
+        for e in entrees
+    ]), use_container_width=True, hide_index=True)
+    
+    # Détail des plans capturés, les plus récents d'abord
+    for e in [e for e in entrees if e["plan"] is not None][:20]:
+        titre = (f"{e['horodatage']:%H:%M:%S} — {e['fonction'] or 'hors fonction'} — "
+                 f"{e['duree'] * 1000:.0f} ms (EXPLAIN {e['duree_plan'] * 1000:.0f} ms)")
+        with st.expander(titre):
+            st.code(e["requete"], language="sql")
+            if e["parametres"]:
+                st.caption(f"Paramètres: {e['parametres']}")
+            st.code(e["plan"], language="text")
+    
+    if st.button("🧹 Vider le journal"):
+        journal_lent.vider()
+        st.rerun()
+
+
+def afficher_replique():
+    etat = routage.etat()
+    if not etat["actif"]:
+        st.info("Aucune réplique configurée (POINTAGE_REPLIQUE_DSN ou [postgres_replique]): "
+                "tous les rapports sont lus sur le primaire")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Réplique", "utilisée" if etat["disponible"] else etat["raison"])
+    with col2:
+        st.metric("Retard de rejeu", "—" if etat["retard"] is None else f"{etat['retard']:.1f} s",
+                  help=f"Au-delà de {etat['retard_max']:.0f} s, les rapports sont lus sur le primaire")
+    with col3:
+        st.metric("Mesuré il y a", "—" if etat["verifie_il_y_a"] is None else f"{etat['verifie_il_y_a']:.0f} s")
+    if etat["detail"]:
+        st.caption(etat["detail"])
+    st.caption(f"Une session qui vient d'écrire lit sur le primaire pendant {etat['apres_ecriture']:.0f} s.")
+    
+    if etat["compteurs"]:
+        st.dataframe(pd.DataFrame(
+            [{"destination": cle, "connexions": nombre} for cle, nombre in sorted(etat["compteurs"].items())]
+        ), use_container_width=True, hide_index=True)
+
+
+def afficher_disponibilite():
+    etat = resilience.etat()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        icone = "🟢" if etat["etat"] == FERME else "🔴"
+        st.metric("Disjoncteur", f"{icone} {etat['etat']}",
+                  help=f"S'ouvre après {etat['seuil']} lectures en échec d'affilée, "
+                       f"pour {etat['duree_ouverture']:.0f} s avant un essai")
+    with col2:
+        st.metric("Échecs d'affilée", etat["echecs"])
+    with col3:
+        st.metric("Accès refusés (ouvert)", etat["refusees"])
+    if etat["etat"] != FERME and etat["depuis"] is not None:
+        st.caption(f"Ouvert ou en essai depuis {etat['depuis']:.0f} s. "
+                   "Les lectures servent leur dernier résultat en cache.")
+    if etat["derniere_erreur"]:
+        st.caption(f"Dernière erreur: {etat['derniere_erreur']}")
+    
+    st.dataframe(pd.DataFrame(
+        [{"compteur": cle, "nombre": nombre} for cle, nombre in etat["compteurs"].items()]
+    ), use_container_width=True, hide_index=True)
+    st.caption(f"Une lecture idempotente est tentée au plus {etat['tentatives']} fois sur une erreur transitoire.")
+    
+    if etat["transitions"]:
+        st.dataframe(pd.DataFrame([
+            {"heure": horodatage.strftime("%H:%M:%S"), "état": nouvel_etat, "motif": motif or "—"}
+            for horodatage, nouvel_etat, motif in etat["transitions"]
+        ]), use_container_width=True, hide_index=True)
+    
+    if etat["etat"] != FERME and st.button("🔌 Réarmer le disjoncteur"):
+        resilience.disjoncteur.rearmer()
+        st.rerun()
+
+
+def show_performance():
+    st.title("⚡ Performance")
+    
+    if st.session_state.user_role != "admin":
+        st.warning("⛔ Accès réservé aux administrateurs")
+        return
+    
+    st.caption("Fenêtre des derniers appels de ce processus. Octets estimés d'après la première ligne de chaque lot.")
+    
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Par page", "Par fonction", "Requêtes lentes", "Réplique", "Disponibilité"])
+    
+    with tab1:
+        pages = mesures.rapport("page")
+        if pages:
+            st.dataframe(_tableau_mesures(pages), use_container_width=True, hide_index=True)
+        else:
+            st.info("Aucune page mesurée depuis le démarrage du processus")
+    
+    with tab2:
+        fonctions = mesures.rapport("fonction")
+        if fonctions:
+            df = _tableau_mesures(fonctions)
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            fig = px.bar(df.head(15), x="nom", y=["BD p95 (ms)", "durée p95 (ms)"], barmode="group",
+                         title="Fonctions les plus lentes (p95)")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Aucun appel mesuré depuis le démarrage du processus")
+    
+    with tab3:
+        afficher_requetes_lentes()
+    
+    with tab4:
+        afficher_replique()
+    
+    with tab5:
+        afficher_disponibilite()
+    
+    if st.button("🔄 Réinitialiser les mesures"):
+        mesures.reinitialiser()
+        st.rerun()
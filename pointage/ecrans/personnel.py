@@ -0,0 +1,76 @@
+"""Gestion du personnel (administrateurs)."""
+from datetime import time as tm
+
+import streamlit as st
+
+from pointage.db import ajouter_personnel, get_personnel, modifier_personnel
+from pointage.rules import as_time
+
+
+def show_gestion_personnel():
+    st.title("👥 Gestion du Personnel")
+    
+    tab1, tab2, tab3 = st.tabs(["Liste du Personnel", "Ajouter un Employé", "Modifier un Employé"])
+    
+    with tab1:
+        personnel_df = get_personnel()
+        if not personnel_df.empty:
+            st.dataframe(personnel_df, use_container_width=True)
+        else:
+            st.info("Aucun personnel enregistré")
+    
+    with tab2:
+        with st.form("ajouter_personnel"):
+            col1, col2 = st.columns(2)
+            with col1:
+                nom = st.text_input("Nom")
+                prenom = st.text_input("Prénom")
+                service = st.text_input("Service")
+            with col2:
+                poste = st.selectbox("Poste", ["Jour", "Nuit"])
+                heure_entree = st.time_input("Heure d'entrée prévue", value=tm(8, 0))
+                heure_sortie = st.time_input("Heure de sortie prévue", value=tm(16, 0))
+            
+            if st.form_submit_button("➕ Ajouter"):
+                if nom and prenom and service:
+                    if ajouter_personnel(nom, prenom, service, poste, heure_entree, heure_sortie):
+                        st.success("✅ Employé ajouté avec succès")
+                    else:
+                        st.error("❌ Erreur lors de l'ajout")
+                else:
+                    st.warning("⚠️ Veuillez remplir tous les champs obligatoires")
+    
+    with tab3:
+        personnel_actif = get_personnel()
+        if not personnel_actif.empty:
+            employe_selection = st.selectbox(
+                "Sélectionner un employé",
+                personnel_actif.apply(lambda x: f"{x['prenom']} {x['nom']} - {x['service']}", axis=1)
+            )
+            
+            if employe_selection:
+                selected_index = personnel_actif[
+                    personnel_actif.apply(lambda x: f"{x['prenom']} {x['nom']} - {x['service']}" == employe_selection, axis=1)
+                ].index[0]
+                
+                emp_data = personnel_actif.loc[selected_index]
+                
+                with st.form("modifier_personnel"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        nom = st.text_input("Nom", value=emp_data['nom'])
+                        prenom = st.text_input("Prénom", value=emp_data['prenom'])
+                        service = st.text_input("Service", value=emp_data['service'])
+                    with col2:
+                        poste = st.selectbox("Poste", ["Jour", 'Nuit'], index=0 if emp_data['poste'] == "Jour" else 1)
+                        heure_entree = st.time_input("Heure d'entrée prévue", value=as_time(emp_data['heure_entree_prevue']))
+                        heure_sortie = st.time_input("Heure de sortie prévue", value=as_time(emp_data['heure_sortie_prevue']))
+                        actif = st.checkbox("Actif", value=emp_data['actif'])
+                    
+                    if st.form_submit_button("💾 Enregistrer les modifications"):
+                        if modifier_personnel(emp_data['id'], nom, prenom, service, poste, heure_entree, heure_sortie, actif):
+                            st.success("✅ Employé modifié avec succès")
+                        else:
+                            st.error("❌ Erreur lors de la modification")
+        else:
+            st.info("Aucun employé à modifier")
@@ -0,0 +1,95 @@
+"""Pointage des arrivées et départs du jour."""
+from datetime import datetime, date
+
+import streamlit as st
+
+from pointage.db import (
+    enregistrer_absence, enregistrer_pointage_arrivee, enregistrer_pointage_depart, filtrer_personnel,
+    get_pointage_employe_jour, get_services_disponibles,
+)
+
+
+def show_pointage_du_jour():
+    st.title("⏰ Pointage du Jour")
+    
+    # Recherche et filtres
+    col1, col2 = st.columns(2)
+    with col1:
+        recherche = st.text_input("🔍 Rechercher un employé")
+    with col2:
+        services = ["Tous les services"] + get_services_disponibles()
+        filtre_service = st.selectbox("Filtrer par service", services)
+    
+    # Liste du personnel filtrée
+    personnel_filtre = filtrer_personnel(recherche, filtre_service)
+    
+    for service, employes in personnel_filtre.items():
+        st.subheader(f"🏥 {service}")
+        
+        for emp in employes:
+            with st.expander(f"{emp['prenom']} {emp['nom']} - {emp['poste']}"):
+                pointage = get_pointage_employe_jour(emp['id'], date.today())
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Heure prévue:** {emp['heure_entree_prevue']} - {emp['heure_sortie_prevue']}")
+                    
+                    if pointage is not None and pointage.get('heure_arrivee'):
+                        st.success(f"✅ Arrivée: {pointage['heure_arrivee']} ({pointage['statut_arrivee']})")
+                        if pointage.get('retard_minutes', 0) > 0:
+                            st.warning(f"⏰ Retard: {pointage['retard_minutes']} minutes")
+                    else:
+                        st.error("❌ Non pointé")
+                
+                with col2:
+                    if pointage is not None and pointage.get('heure_depart'):
+                        st.success(f"✅ Départ: {pointage['heure_depart']} ({pointage['statut_depart']})")
+                        if pointage.get('depart_avance_minutes', 0) > 0:
+                            st.warning(f"⏰ Départ anticipé: {pointage['depart_avance_minutes']} minutes")
+                    else:
+                        st.info("ℹ️ Départ non enregistré")
+                
+                # Formulaire de pointage
+                with st.form(f"pointage_{emp['id']}"):
+                    col_a, col_b = st.columns(2)
+                    
+                    with col_a:
+                        heure_arrivee = st.time_input("Heure d'arrivée", value=datetime.now().time(), key=f"arrivee_{emp['id']}")
+                        motif_retard = st.text_area("Motif retard/absence", key=f"motif_arr_{emp['id']}")
+                    
+                    with col_b:
+                        heure_depart = st.time_input("Heure de départ", value=datetime.now().time(), key=f"depart_{emp['id']}")
+                        motif_depart = st.text_area("Motif départ anticipé", key=f"motif_dep_{emp['id']}")
+                    
+                    notes = st.text_area("Notes", key=f"notes_{emp['id']}")
+                    
+                    col_btn1, col_btn2, col_btn3 = st.columns(3)
+                    
+                    with col_btn1:
+                        if st.form_submit_button("✅ Pointer l'arrivée"):
+                            success, retard = enregistrer_pointage_arrivee(
+                                emp['id'], date.today(), heure_arrivee, motif_retard, notes
+                            )
+                            if success:
+                                st.success("✅ Pointage d'arrivée enregistré")
+                                if retard > 0:
+                                    st.warning(f"⏰ Retard enregistré: {retard} minutes")
+                    
+                    with col_btn2:
+                        if st.form_submit_button("🚪 Pointer le départ"):
+                            success, avance = enregistrer_pointage_depart(
+                                emp['id'], date.today(), heure_depart, motif_depart, notes
+                            )
+                            if success:
+                                st.success("✅ Pointage de départ enregistré")
+                                if avance > 0:
+                                    st.warning(f"⏰ Départ anticipé: {avance} minutes")
+                    
+                    with col_btn3:
+                        if st.form_submit_button("❌ Marquer absent"):
+                            success = enregistrer_absence(
+                                emp['id'], date.today(), motif_retard or "Absence non justifiée", False
+                            )
+                            if success:
+                                st.success("✅ Absence enregistrée")
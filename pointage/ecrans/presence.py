@@ -0,0 +1,37 @@
+"""Présents sur site, mis à jour par les notifications de la base."""
+import pandas as pd
+import streamlit as st
+
+from pointage.db import get_ecouteur, get_presence
+from pointage.ecrans.commun import case_direct
+
+
+def show_presence_sur_site():
+    st.title("🟢 Présents sur site")
+    
+    # Affichage mural: relancé à chaque pointage, sans recharger la page à la main
+    ecouteur = get_ecouteur()
+    version = ecouteur.version
+    etat = get_presence().instantane()
+    st.metric("Personnes présentes", etat["total"])
+    
+    if etat["par_service"]:
+        services = sorted(etat["par_service"])
+        colonnes = st.columns(min(len(services), 4))
+        for i, service in enumerate(services):
+            with colonnes[i % len(colonnes)]:
+                st.metric(f"🏥 {service}", etat["par_service"][service])
+        
+        detail = pd.DataFrame(
+            [(service, poste, n) for (service, poste), n in etat["par_poste"].items()],
+            columns=["service", "poste", "presents"],
+        ).sort_values(["service", "poste"])
+        st.dataframe(detail, use_container_width=True, hide_index=True)
+    else:
+        st.info("Personne n'est pointé sur site pour le moment")
+    
+    st.caption("Arrivées pointées aujourd'hui: une équipe de nuit arrivée la veille n'apparaît plus après minuit.")
+    
+    case_direct("presence_direct", ecouteur, version, valeur=True)
+    if st.button("🔄 Actualiser"):
+        st.rerun()
@@ -0,0 +1,102 @@
+"""Retards et analyse (administrateurs)."""
+from datetime import date, timedelta
+
+import streamlit as st
+import plotly.express as px
+
+from pointage.db import get_analyse_retards, get_retards_page
+from pointage.ecrans.commun import afficher_grille_paginee
+
+
+def show_retards_page():
+    st.title("⏰ Gestion des Retards")
+    
+    tab1, tab2 = st.tabs(["Liste des Retards", "Statistiques des Retards"])
+    
+    with tab1:
+        st.subheader("📋 Liste des retards")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            date_debut = st.date_input("Date de début", value=date.today() - timedelta(days=30), key="retard_debut")
+        with col2:
+            date_fin = st.date_input("Date de fin", value=date.today(), key="retard_fin")
+        
+        if st.button("🔍 Charger les retards", key="btn_retards"):
+            st.session_state.periode_retards = (date_debut, date_fin)
+        
+        if st.session_state.get("periode_retards") == (date_debut, date_fin):
+            analyse = get_analyse_retards(date_debut, date_fin)
+            
+            if analyse and analyse['resume']['total_retards'] > 0:
+                afficher_grille_paginee(
+                    "retards",
+                    lambda taille, apres: get_retards_page(date_debut, date_fin, taille, apres),
+                    total=int(analyse['resume']['total_retards']),
+                    signature=(date_debut, date_fin),
+                )
+                
+                # Statistiques des retards (agrégées côté serveur)
+                st.subheader("📊 Statistiques des retards")
+                col_stat1, col_stat2, col_stat3 = st.columns(3)
+                
+                with col_stat1:
+                    st.metric("Total des retards", int(analyse['resume']['total_retards']))
+                
+                with col_stat2:
+                    st.metric("Retard moyen (min)", f"{analyse['resume']['moyenne_minutes']:.1f}")
+                
+                with col_stat3:
+                    st.metric("Retard maximum (min)", int(analyse['resume']['max_minutes']))
+                
+                # Top 5 des employés avec le plus de retards
+                st.subheader("🏆 Top 5 des employés avec le plus de retards")
+                st.dataframe(analyse['par_employe'], use_container_width=True)
+                
+                # Graphique des retards par service
+                if not analyse['par_service'].empty:
+                    fig = px.bar(
+                        analyse['par_service'],
+                        x='service',
+                        y='nb_retards',
+                        title="Nombre de retards par service"
+                    )
+                    st.plotly_chart(fig)
+            else:
+                st.info("Aucun retard trouvé pour la période sélectionnée")
+    
+    with tab2:
+        st.subheader("📈 Analyse des retards")
+        
+        # Agrégats des 60 derniers jours (mis en cache, aucune ligne brute rechargée)
+        analyse = get_analyse_retards(date.today() - timedelta(days=60), date.today())
+        
+        if analyse and analyse['resume']['total_retards'] > 0:
+            # Évolution des retards dans le temps
+            fig = px.line(
+                analyse['par_jour'],
+                x='date_retard',
+                y='nb_retards',
+                title="Évolution du nombre de retards par jour"
+            )
+            st.plotly_chart(fig)
+            
+            # Répartition des retards par durée
+            fig2 = px.bar(
+                analyse['histogramme'],
+                x='tranche_minutes',
+                y='nb_retards',
+                title="Répartition des retards par durée (minutes)"
+            )
+            st.plotly_chart(fig2)
+            
+            # Retards par jour de la semaine
+            fig3 = px.bar(
+                analyse['par_jour_semaine'],
+                x='jour_semaine',
+                y='nb_retards',
+                title="Nombre de retards par jour de la semaine"
+            )
+            st.plotly_chart(fig3)
+        else:
+            st.info("Aucune donnée de retard disponible pour l'analyse")
@@ -0,0 +1,41 @@
+"""Statistiques mensuelles."""
+import streamlit as st
+import plotly.express as px
+
+from pointage.db import get_stats_mensuelles
+
+
+def show_statistiques():
+    st.title("📈 Statistiques")
+    
+    stats_df = get_stats_mensuelles()
+    
+    if not stats_df.empty:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            total_retard = stats_df['total_retard_minutes'].sum()
+            st.metric("Total retard (min)", total_retard)
+        
+        with col2:
+            total_depart_avance = stats_df['total_depart_avance_minutes'].sum()
+            st.metric("Total départ anticipé (min)", total_depart_avance)
+        
+        with col3:
+            moy_retard = stats_df['jours_retard'].mean()
+            st.metric("Moyenne retards/jour", f"{moy_retard:.1f}")
+        
+        # Graphique des retards par service
+        fig = px.bar(
+            stats_df.groupby('service')['jours_retard'].sum().reset_index(),
+            x='service',
+            y='jours_retard',
+            title="Nombre de retards par service"
+        )
+        st.plotly_chart(fig)
+        
+        # Tableau détaillé
+        st.subheader("📋 Statistiques détaillées par employé")
+        st.dataframe(stats_df, use_container_width=True)
+    else:
+        st.info("Aucune statistique disponible pour le mois en cours")
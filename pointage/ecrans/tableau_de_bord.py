@@ -0,0 +1,63 @@
+"""Tableau de bord: effectif, pointages et absences du jour."""
+import streamlit as st
+
+from pointage.db import (
+    assurer_roster_jour, attendre_lectures, get_absences_du_jour_async, get_conges_en_cours_async, get_ecouteur,
+    get_personnel_async, get_pointages_du_jour_async, marquer_absence_automatique, personnel_vide,
+)
+from pointage.ecrans.commun import case_direct
+
+
+def show_dashboard():
+    st.title("🏠 Tableau de Bord")
+    
+    # Marquage automatique des absences
+    if st.button("🔄 Vérifier les absences automatiques"):
+        if marquer_absence_automatique():
+            st.success("✅ Absences automatiques vérifiées")
+        else:
+            st.error("❌ Erreur lors de la vérification des absences")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # Statistiques rapides: servies par le cache de lecture tant qu'aucune table n'a changé
+    ecouteur = get_ecouteur()
+    version = ecouteur.version
+    assurer_roster_jour()
+    donnees = attendre_lectures({
+        "personnel": get_personnel_async(),
+        "pointages": get_pointages_du_jour_async(),
+        "absences": get_absences_du_jour_async(),
+        "conges": get_conges_en_cours_async(),
+    }, vides={"personnel": personnel_vide})
+    personnel_df = donnees["personnel"]
+    pointages_du_jour = donnees["pointages"]
+    absences_du_jour = donnees["absences"]
+    conges_en_cours = donnees["conges"]
+    
+    with col1:
+        st.metric("Total Personnel", len(personnel_df[personnel_df['actif']]))
+    with col2:
+        st.metric("Pointages Aujourd'hui", len(pointages_du_jour))
+    with col3:
+        st.metric("Absences Aujourd'hui", len(absences_du_jour))
+    with col4:
+        st.metric("Congés en Cours", len(conges_en_cours))
+    
+    # Congés en cours
+    st.subheader("🎯 Congés en cours aujourd'hui")
+    if not conges_en_cours.empty:
+        st.dataframe(conges_en_cours, use_container_width=True)
+    else:
+        st.info("Aucun congé en cours aujourd'hui")
+    
+    # Derniers pointages
+    st.subheader("📋 Derniers pointages aujourd'hui")
+    if not pointages_du_jour.empty:
+        st.dataframe(pointages_du_jour[['nom', 'prenom', 'service', 'heure_arrivee', 'statut_arrivee']], 
+                    use_container_width=True)
+    else:
+        st.info("Aucun pointage enregistré aujourd'hui")
+    
+    # Mode direct: attend un événement du thread d'écoute au lieu de recharger à intervalle fixe
+    case_direct("dashboard_direct", ecouteur, version)
@@ -0,0 +1,42 @@
+"""Comptes utilisateurs (administrateurs)."""
+import streamlit as st
+
+from pointage.db import create_user, get_all_users
+
+
+def show_gestion_utilisateurs():
+    st.title("👥 Gestion des Utilisateurs")
+    
+    if st.session_state.user_role != "admin":
+        st.warning("⛔ Accès réservé aux administrateurs")
+        return
+    
+    tab1, tab2 = st.tabs(["Liste des Utilisateurs", "Ajouter un Utilisateur"])
+    
+    with tab1:
+        st.subheader("📋 Liste des utilisateurs")
+        users_df = get_all_users()
+        if not users_df.empty:
+            st.dataframe(users_df, use_container_width=True)
+        else:
+            st.info("Aucun utilisateur enregistré")
+    
+    with tab2:
+        st.subheader("➕ Ajouter un nouvel utilisateur")
+        with st.form("ajouter_utilisateur"):
+            col1, col2 = st.columns(2)
+            with col1:
+                username = st.text_input("Nom d'utilisateur*")
+                email = st.text_input("Email")
+            with col2:
+                password = st.text_input("Mot de passe*", type="password")
+                role = st.selectbox("Rôle", ["user", "admin"])
+            
+            if st.form_submit_button("➕ Ajouter l'utilisateur"):
+                if username and password:
+                    if create_user(username, password, role, email):
+                        st.success("✅ Utilisateur ajouté avec succès")
+                    else:
+                        st.error("❌ Erreur lors de l'ajout de l'utilisateur")
+                else:
+                    st.warning("⚠️ Veuillez remplir tous les champs obligatoires")
@@ -0,0 +1,185 @@
+"""Export en flux de l'historique des pointages (CSV et Parquet).
+
+Les lignes sont lues par lots via un curseur serveur nommé puis écrites au fur
+et à mesure: la mémoire utilisée dépend de la taille du lot, pas de la période.
+
+Utilisable hors de l'interface pour les extractions de paie:
+
+    python -m pointage.export --debut 2023-01-01 --fin 2024-12-31 \\
+        --format parquet --sortie paie.parquet
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import threading
+import weakref
+from contextlib import suppress
+from datetime import date
+
+import config
+
+COLONNES_EXPORT = [
+    "nom", "prenom", "service", "poste", "heure_entree_prevue", "heure_sortie_prevue",
+    "date_pointage", "heure_arrivee", "heure_depart", "statut_arrivee", "statut_depart",
+    "retard_minutes", "depart_avance_minutes", "motif_retard", "motif_depart_avance", "notes",
+]
+
+REQUETE_EXPORT = """
+    SELECT p.nom, p.prenom, p.service, p.poste, p.heure_entree_prevue, p.heure_sortie_prevue,
+           pt.date_pointage, pt.heure_arrivee, pt.heure_depart, pt.statut_arrivee, pt.statut_depart,
+           pt.retard_minutes, pt.depart_avance_minutes, pt.motif_retard, pt.motif_depart_avance, pt.notes
+    FROM pointages pt
+    JOIN personnels p ON pt.personnel_id = p.id
+    WHERE pt.date_pointage BETWEEN %s AND %s
+    ORDER BY pt.date_pointage, p.nom, p.prenom
+"""
+
+FORMATS = ("csv", "parquet")
+
+# Exports préparés depuis l'interface: un répertoire par processus, supprimé à son arrêt
+_repertoire = None
+_verrou_repertoire = threading.Lock()
+
+
+def repertoire_temporaire():
+    global _repertoire
+    with _verrou_repertoire:
+        if _repertoire is None:
+            _repertoire = tempfile.TemporaryDirectory(prefix="pointage_exports_")
+        return _repertoire.name
+
+
+def _supprimer(chemin):
+    with suppress(FileNotFoundError):
+        os.remove(chemin)
+
+
+class FichierExport:
+    """Fichier d'export d'une session, dans repertoire_temporaire().
+
+    Supprimé par supprimer(), ou dès que l'objet est libéré: export remplacé,
+    session fermée. Le répertoire et ce qu'il reste sont supprimés à l'arrêt
+    du processus.
+    """
+
+    def __init__(self, format_export, nom):
+        fd, self.chemin = tempfile.mkstemp(prefix="pointages_", suffix=f".{format_export}", dir=repertoire_temporaire())
+        os.close(fd)
+        self.nom = nom
+        self.supprimer = weakref.finalize(self, _supprimer, self.chemin)
+
+    def taille(self):
+        return os.path.getsize(self.chemin)
+
+
+def compter_lignes(conn, date_debut, date_fin):
+    """Nombre de pointages de la période (sert au suivi de progression)"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COUNT(*) FROM pointages WHERE date_pointage BETWEEN %s AND %s",
+            (date_debut, date_fin),
+        )
+        return cur.fetchone()[0]
+
+
+def iter_lots(conn, date_debut, date_fin, taille_lot=config.EXPORT_TAILLE_LOT):
+    """Parcourt la période par lots de `taille_lot` lignes via un curseur serveur"""
+    with conn.cursor(name="export_pointages") as cur:
+        cur.itersize = taille_lot
+        cur.execute(REQUETE_EXPORT, (date_debut, date_fin))
+        while True:
+            lignes = cur.fetchmany(taille_lot)
+            if not lignes:
+                break
+            yield lignes
+
+
+def exporter_csv(conn, date_debut, date_fin, sortie, taille_lot=config.EXPORT_TAILLE_LOT, progression=None):
+    """Écrit la période en CSV dans le fichier texte `sortie`; renvoie le nombre de lignes"""
+    total = compter_lignes(conn, date_debut, date_fin) if progression else None
+    writer = csv.writer(sortie)
+    writer.writerow(COLONNES_EXPORT)
+    ecrites = 0
+    for lignes in iter_lots(conn, date_debut, date_fin, taille_lot):
+        writer.writerows(lignes)
+        ecrites += len(lignes)
+        if progression:
+            progression(ecrites, total)
+    return ecrites
+
+
+def _schema_parquet():
+    import pyarrow as pa
+
+    heure = pa.time64("us")
+    return pa.schema([
+        ("nom", pa.string()), ("prenom", pa.string()), ("service", pa.string()),
+        ("poste", pa.string()), ("heure_entree_prevue", heure), ("heure_sortie_prevue", heure),
+        ("date_pointage", pa.date32()), ("heure_arrivee", heure), ("heure_depart", heure),
+        ("statut_arrivee", pa.string()), ("statut_depart", pa.string()),
+        ("retard_minutes", pa.int32()), ("depart_avance_minutes", pa.int32()),
+        ("motif_retard", pa.string()), ("motif_depart_avance", pa.string()), ("notes", pa.string()),
+    ])
+
+
+def exporter_parquet(conn, date_debut, date_fin, sortie, taille_lot=config.EXPORT_TAILLE_LOT, progression=None):
+    """Écrit la période en Parquet (un row group par lot); renvoie le nombre de lignes"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _schema_parquet()
+    total = compter_lignes(conn, date_debut, date_fin) if progression else None
+    ecrites = 0
+    with pq.ParquetWriter(sortie, schema, compression="zstd") as writer:
+        for lignes in iter_lots(conn, date_debut, date_fin, taille_lot):
+            colonnes = list(zip(*lignes))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=champ.type) for col, champ in zip(colonnes, schema)],
+                schema=schema,
+            ))
+            ecrites += len(lignes)
+            if progression:
+                progression(ecrites, total)
+        if ecrites == 0:
+            writer.write_table(schema.empty_table())
+    return ecrites
+
+
+def exporter(conn, format_export, date_debut, date_fin, sortie, taille_lot=config.EXPORT_TAILLE_LOT, progression=None):
+    if format_export == "csv":
+        return exporter_csv(conn, date_debut, date_fin, sortie, taille_lot, progression)
+    if format_export == "parquet":
+        return exporter_parquet(conn, date_debut, date_fin, sortie, taille_lot, progression)
+    raise ValueError(f"Format d'export inconnu: {format_export}")
+
+
+def main(argv=None):
+    import psycopg2
+
+    parser = argparse.ArgumentParser(description="Export de l'historique des pointages")
+    parser.add_argument("--debut", type=date.fromisoformat, required=True)
+    parser.add_argument("--fin", type=date.fromisoformat, required=True)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--sortie", required=True)
+    parser.add_argument("--taille-lot", type=int, default=config.EXPORT_TAILLE_LOT)
+    args = parser.parse_args(argv)
+
+    def afficher(ecrites, total):
+        print(f"\r{ecrites}/{total} lignes", end="", file=sys.stderr, flush=True)
+
+    conn = psycopg2.connect(**config.parametres_connexion())
+    try:
+        if args.format == "csv":
+            with open(args.sortie, "w", newline="", encoding="utf-8") as sortie:
+                n = exporter_csv(conn, args.debut, args.fin, sortie, args.taille_lot, afficher)
+        else:
+            n = exporter_parquet(conn, args.debut, args.fin, args.sortie, args.taille_lot, afficher)
+    finally:
+        conn.close()
+    print(f"\n{n} lignes exportées dans {args.sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Normalisation des certificats image et cache de vignettes (Pillow, importé à la demande).
+
+Les photos de certificats arrivent en pleine résolution avec leurs métadonnées
+EXIF. Après l'envoi, un pool de travail les redimensionne, les recompresse et
+prépare une vignette pour les listes, sans faire attendre l'utilisateur.
+
+L'original remplacé n'est pas supprimé tout de suite: le stockage est adressé
+par contenu, et un envoi simultané du même fichier peut y pointer. Il l'est
+par un passage de nettoyage, `delai_suppression` secondes plus tard, si
+aucune absence ne le référence plus et qu'aucun envoi n'a rafraîchi sa date.
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TYPES_IMAGE = {"image/jpeg", "image/png", "image/webp"}
+
+MIME_FORMAT = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+
+
+def normaliser_image(source, dimension_max, qualite, format_sortie="WEBP"):
+    """Renvoie les octets de l'image réorientée, réduite et recompressée, sans EXIF"""
+    # Pillow n'est importé qu'au premier certificat image traité
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # Appliquer l'orientation EXIF avant de perdre les métadonnées
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((dimension_max, dimension_max))
+        if format_sortie == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        sortie = io.BytesIO()
+        # Aucun paramètre exif transmis: les métadonnées ne sont pas réécrites
+        image.save(sortie, format_sortie, quality=qualite)
+    return sortie.getvalue()
+
+
+class TraitementCertificats:
+    """Pool de normalisation des certificats image et cache disque des vignettes"""
+
+    def __init__(self, store, dimension_max=2000, qualite=80, format_sortie="WEBP",
+                 taille_vignette=256, max_workers=2, references=None, delai_suppression=3600):
+        """`references(empreintes)` renvoie celles qu'une absence référence encore (None: originaux gardés)"""
+        self.store = store
+        self.references = references
+        self.delai_suppression = delai_suppression
+        self._remplaces = {}  # empreinte de l'original -> instant du remplacement (time.time)
+        self.dimension_max = dimension_max
+        self.qualite = qualite
+        self.format_sortie = format_sortie
+        self.taille_vignette = taille_vignette
+        self.dossier_vignettes = store.racine / "vignettes"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="certificats")
+        self._verrou = threading.Lock()
+        self.statistiques = {
+            "traites": 0,
+            "octets_avant": 0,
+            "octets_apres": 0,
+            "erreurs": 0,
+            "derniere_erreur": None,
+            "originaux_supprimes": 0,
+        }
+
+    def soumettre(self, sha256, mime, remplacer):
+        """Planifie la normalisation du certificat `sha256` et renvoie le Future.
+
+        Si la version normalisée est plus petite, `remplacer(ancien, nouveau, taille, mime)`
+        met à jour les références en base; l'original attend le nettoyage.
+        """
+        if mime not in TYPES_IMAGE:
+            return None
+        return self._executor.submit(self._traiter, sha256, remplacer)
+
+    def _traiter(self, sha256, remplacer):
+        try:
+            chemin = self.store.chemin(sha256)
+            taille_avant = chemin.stat().st_size
+            donnees = normaliser_image(chemin, self.dimension_max, self.qualite, self.format_sortie)
+
+            if len(donnees) < taille_avant:
+                nouveau, taille_apres = self.store.ajouter(donnees)
+                remplacer(sha256, nouveau, taille_apres, MIME_FORMAT[self.format_sortie])
+                if nouveau != sha256:
+                    with self._verrou:
+                        self._remplaces[sha256] = time.time()
+            else:
+                nouveau, taille_apres = sha256, taille_avant
+
+            self.vignette(nouveau)
+            with self._verrou:
+                self.statistiques["traites"] += 1
+                self.statistiques["octets_avant"] += taille_avant
+                self.statistiques["octets_apres"] += taille_apres
+            self.nettoyer()
+            return nouveau
+        except Exception as e:
+            with self._verrou:
+                self.statistiques["erreurs"] += 1
+                self.statistiques["derniere_erreur"] = str(e)
+            raise
+
+    def nettoyer(self):
+        """Supprime les originaux remplacés depuis `delai_suppression` s et plus référencés; renvoie leur nombre"""
+        if self.references is None:
+            return 0
+        limite = time.time() - self.delai_suppression
+        with self._verrou:
+            candidats = [sha256 for sha256, instant in self._remplaces.items() if instant <= limite]
+        if not candidats:
+            return 0
+        encore = self.references(candidats)
+        supprimes = 0
+        for sha256 in candidats:
+            if sha256 not in encore:
+                chemin = self.store.chemin(sha256)
+                try:
+                    if chemin.stat().st_mtime > limite:
+                        # Renvoyé depuis: son propre traitement le remplacera, on attend le passage suivant
+                        continue
+                    os.remove(chemin)
+                    supprimes += 1
+                except FileNotFoundError:
+                    pass
+            # Encore référencé: un nouvel envoi, dont le traitement le reprogrammera
+            with self._verrou:
+                self._remplaces.pop(sha256, None)
+        with self._verrou:
+            self.statistiques["originaux_supprimes"] += supprimes
+        return supprimes
+
+    def chemin_vignette(self, sha256):
+        self.store.chemin(sha256)  # valide l'empreinte
+        return self.dossier_vignettes / f"{sha256}.webp"
+
+    def vignette_en_cache(self, sha256):
+        """Chemin de la vignette si elle est déjà générée, sans toucher au certificat"""
+        chemin = self.chemin_vignette(sha256)
+        return chemin if chemin.exists() else None
+
+    def demander_vignette(self, sha256, mime):
+        """Planifie la génération de la vignette d'un certificat image qui n'en a pas"""
+        if mime not in TYPES_IMAGE or self.vignette_en_cache(sha256):
+            return None
+        return self._executor.submit(self.vignette, sha256)
+
+    def vignette(self, sha256):
+        """Chemin de la vignette du certificat, générée au premier appel"""
+        chemin = self.chemin_vignette(sha256)
+        if chemin.exists():
+            return chemin
+        self.dossier_vignettes.mkdir(parents=True, exist_ok=True)
+        from PIL import Image, ImageOps
+
+        with Image.open(self.store.chemin(sha256)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.taille_vignette, self.taille_vignette))
+            fd, temporaire = tempfile.mkstemp(dir=self.dossier_vignettes, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, "WEBP", quality=70)
+        os.replace(temporaire, chemin)
+        return chemin
+
+    def economies(self):
+        """Octets économisés par la recompression depuis le démarrage du processus"""
+        with self._verrou:
+            return self.statistiques["octets_avant"] - self.statistiques["octets_apres"]
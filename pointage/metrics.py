@@ -0,0 +1,249 @@
+"""Mesures des fonctions d'accès aux données et des pages.
+
+Chaque appel instrumenté enregistre sa durée totale, le temps passé dans
+les requêtes, les lignes lues, une estimation des octets reçus et l'attente
+d'une connexion du pool. Les valeurs alimentent des histogrammes en mémoire
+(fenêtre des derniers appels) d'où la page Performance tire p50/p95/p99.
+
+Le temps base de données est relevé par CurseurMesure, la classe de curseur
+des connexions du pool: aucune requête n'a besoin d'être modifiée. Le même
+curseur alimente le journal des requêtes lentes (pointage.slowlog) et compte
+les requêtes annulées par statement_timeout (pointage.delais).
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2.errors
+import psycopg2.extensions
+
+from pointage.slowlog import journal_lent
+
+CHAMPS = ("duree", "duree_bd", "lignes", "octets", "attente_connexion")
+# Compteurs par fonction et par page: erreurs, délais dépassés, nouvelles tentatives, accès en échec
+# faute de base (pointage.resilience), résultats servis dégradés (cache périmé)
+COMPTEURS = ("erreurs", "delais", "reessais", "indisponible", "degradees")
+
+_appel_courant = contextvars.ContextVar("pointage_appel_courant", default=None)
+_verrou_appels = threading.Lock()
+
+
+class Histogramme:
+    """Derniers `taille` échantillons d'une mesure, plus le compte et la somme depuis le démarrage"""
+
+    def __init__(self, taille=2048):
+        self._valeurs = deque(maxlen=taille)
+        self._verrou = threading.Lock()
+        self.nombre = 0
+        self.somme = 0.0
+
+    def ajouter(self, valeur):
+        with self._verrou:
+            self._valeurs.append(valeur)
+            self.nombre += 1
+            self.somme += valeur
+
+    def percentiles(self, *rangs):
+        """Percentiles (rang le plus proche) de la fenêtre; None si elle est vide"""
+        with self._verrou:
+            valeurs = sorted(self._valeurs)
+        if not valeurs:
+            return [None for _ in rangs]
+        return [valeurs[min(len(valeurs) - 1, max(0, round(r / 100 * len(valeurs)) - 1))] for r in rangs]
+
+    def moyenne(self):
+        return self.somme / self.nombre if self.nombre else None
+
+
+class _Appel:
+    """Compteurs d'un appel en cours; chaque ajout remonte aux appels englobants"""
+
+    __slots__ = ("parent", "nom", "duree_bd", "lignes", "octets", "attente_connexion") + COMPTEURS
+
+    def __init__(self, parent, nom=None):
+        self.parent = parent
+        self.nom = nom
+        self.duree_bd = 0.0
+        self.lignes = 0
+        self.octets = 0
+        self.attente_connexion = 0.0
+        self.erreurs = 0
+        self.delais = 0
+        self.reessais = 0
+        self.indisponible = 0
+        self.degradees = 0
+
+    def ajouter(self, **valeurs):
+        # Un appel peut être partagé par les lectures concurrentes d'une page (pointage.asynchrone)
+        with _verrou_appels:
+            appel = self
+            while appel is not None:
+                for champ, valeur in valeurs.items():
+                    setattr(appel, champ, getattr(appel, champ) + valeur)
+                appel = appel.parent
+
+
+def noter(**valeurs):
+    """Ajoute `valeurs` (duree_bd, lignes, octets, attente_connexion ou un des COMPTEURS) à l'appel en cours"""
+    appel = _appel_courant.get()
+    if appel is not None:
+        appel.ajouter(**valeurs)
+
+
+class Mesures:
+    def __init__(self, taille_fenetre=2048):
+        self.taille_fenetre = taille_fenetre
+        self._verrou = threading.Lock()
+        self._series = {}  # (categorie, nom) -> {champ: Histogramme}
+        self._compteurs = {}  # (categorie, nom) -> {compteur: nombre}
+
+    def _serie(self, categorie, nom):
+        cle = (categorie, nom)
+        with self._verrou:
+            serie = self._series.get(cle)
+            if serie is None:
+                serie = self._series[cle] = {champ: Histogramme(self.taille_fenetre) for champ in CHAMPS}
+            return serie
+
+    @contextmanager
+    def mesurer(self, categorie, nom):
+        appel = _appel_courant.get()
+        appel = _Appel(appel, nom)
+        jeton = _appel_courant.set(appel)
+        debut = time.perf_counter()
+        try:
+            yield appel
+        except Exception:
+            appel.erreurs += 1
+            self._enregistrer(categorie, nom, appel, time.perf_counter() - debut)
+            raise
+        else:
+            # Un st.rerun() (BaseException) interrompt le rendu: rien n'est enregistré
+            self._enregistrer(categorie, nom, appel, time.perf_counter() - debut)
+        finally:
+            _appel_courant.reset(jeton)
+
+    def _enregistrer(self, categorie, nom, appel, duree):
+        serie = self._serie(categorie, nom)
+        serie["duree"].ajouter(duree)
+        serie["duree_bd"].ajouter(appel.duree_bd)
+        serie["lignes"].ajouter(appel.lignes)
+        serie["octets"].ajouter(appel.octets)
+        serie["attente_connexion"].ajouter(appel.attente_connexion)
+        if any(getattr(appel, compteur) for compteur in COMPTEURS):
+            with self._verrou:
+                compteurs = self._compteurs.setdefault((categorie, nom), dict.fromkeys(COMPTEURS, 0))
+                for compteur in COMPTEURS:
+                    compteurs[compteur] += getattr(appel, compteur)
+
+    def instrumente(self, fonction):
+        """Décorateur des fonctions d'accès aux données, synchrones ou coroutines"""
+        if inspect.iscoroutinefunction(fonction):
+            @functools.wraps(fonction)
+            async def enveloppe_async(*args, **kwargs):
+                with self.mesurer("fonction", fonction.__name__):
+                    return await fonction(*args, **kwargs)
+
+            return enveloppe_async
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with self.mesurer("fonction", fonction.__name__):
+                return fonction(*args, **kwargs)
+
+        return enveloppe
+
+    def page(self, nom):
+        """Contexte de rendu d'une page: `with mesures.page("Retards"): show_retards_page()`"""
+        return self.mesurer("page", nom)
+
+    def rapport(self, categorie, rangs=(50, 95, 99)):
+        """Une ligne par fonction (ou page): appels, compteurs (erreurs, délais...) et percentiles de chaque champ"""
+        with self._verrou:
+            series = [(nom, serie) for (cat, nom), serie in self._series.items() if cat == categorie]
+            compteurs = {cle: dict(valeurs) for cle, valeurs in self._compteurs.items()}
+        lignes = []
+        for nom, serie in sorted(series):
+            ligne = {"nom": nom, "appels": serie["duree"].nombre}
+            ligne.update(compteurs.get((categorie, nom), dict.fromkeys(COMPTEURS, 0)))
+            for champ in CHAMPS:
+                for rang, valeur in zip(rangs, serie[champ].percentiles(*rangs)):
+                    ligne[f"{champ}_p{rang}"] = valeur
+            lignes.append(ligne)
+        return lignes
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._series.clear()
+            self._compteurs.clear()
+
+
+def _taille_ligne(ligne):
+    taille = 0
+    for valeur in ligne:
+        if isinstance(valeur, (str, bytes, bytearray, memoryview)):
+            taille += len(valeur)
+        elif valeur is not None:
+            taille += 8
+    return taille
+
+
+class CurseurMesure(psycopg2.extensions.cursor):
+    """Curseur qui impute son temps d'exécution et ses lignes à l'appel instrumenté en cours.
+
+    Les octets sont estimés d'après la première ligne de chaque lot, pour ne
+    pas parcourir toutes les valeurs.
+    """
+
+    def execute(self, requete, variables=None):
+        debut = time.perf_counter()
+        try:
+            resultat = super().execute(requete, variables)
+        except psycopg2.errors.QueryCanceled:
+            noter(delais=1)
+            raise
+        finally:
+            duree = time.perf_counter() - debut
+            noter(duree_bd=duree)
+        if journal_lent.actif:
+            appel = _appel_courant.get()
+            journal_lent.observer(self, requete, variables, duree, appel.nom if appel is not None else None)
+        return resultat
+
+    def executemany(self, requete, variables):
+        debut = time.perf_counter()
+        try:
+            return super().executemany(requete, variables)
+        finally:
+            noter(duree_bd=time.perf_counter() - debut)
+
+    def _lignes_lues(self, lignes, debut):
+        noter(
+            duree_bd=time.perf_counter() - debut,
+            lignes=len(lignes),
+            octets=_taille_ligne(lignes[0]) * len(lignes) if lignes else 0,
+        )
+        return lignes
+
+    def fetchone(self):
+        debut = time.perf_counter()
+        ligne = super().fetchone()
+        self._lignes_lues([ligne] if ligne is not None else [], debut)
+        return ligne
+
+    def fetchmany(self, size=None):
+        debut = time.perf_counter()
+        return self._lignes_lues(super().fetchmany(self.arraysize if size is None else size), debut)
+
+    def fetchall(self):
+        debut = time.perf_counter()
+        return self._lignes_lues(super().fetchall(), debut)
+
+
+# Une instance par processus
+mesures = Mesures()
+instrumente = mesures.instrumente
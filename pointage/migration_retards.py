@@ -0,0 +1,107 @@
+"""Migration explicite: un retard par employé et par jour.
+
+La table retards n'a pas de clé unique: l'INSERT ... ON CONFLICT DO NOTHING
+du pointage d'arrivée ne se déclenche jamais, et un second pointage
+d'arrivée le même jour ajoute un second retard. Cette migration crée l'index
+unique uq_retards_personnel_jour. Elle ne tourne pas au démarrage de
+l'application: on la lance à la main, après avoir lu son rapport.
+
+    python -m pointage.migration_retards                # rapport seul, rien n'est modifié
+    python -m pointage.migration_retards --appliquer    # archive les doublons, crée l'index
+    python -m pointage.migration_retards --backend sqlite --chemin kiosque.sqlite3 --appliquer
+
+Aucun retard n'est perdu: les doublons sont copiés dans retards_doublons
+avant d'être retirés de retards, dans la même transaction que la création de
+l'index. Pour chaque employé et chaque jour, retards garde la ligne la plus
+récente, celle du dernier pointage d'arrivée, que pointages a retenu. Une
+fois l'index en place, un nouveau pointage d'arrivée le même jour laisse le
+premier retard inchangé (ON CONFLICT DO NOTHING).
+"""
+import argparse
+import sys
+
+import config
+from pointage.backends import creer_backend
+
+# Lignes de retards qu'un retard plus récent du même employé, le même jour, remplace
+CONDITION_DOUBLON = """
+    EXISTS (SELECT 1 FROM retards r
+            WHERE r.personnel_id = retards.personnel_id AND r.date_retard = retards.date_retard
+            AND r.id > retards.id)
+"""
+
+SQL_ARCHIVE = """
+    CREATE TABLE IF NOT EXISTS retards_doublons (
+        id INTEGER PRIMARY KEY,
+        personnel_id INTEGER,
+        date_retard DATE NOT NULL,
+        retard_minutes INTEGER NOT NULL,
+        motif TEXT,
+        created_at TIMESTAMP,
+        archive_le TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def doublons(backend):
+    """[(personnel_id, date_retard, lignes)] des journées qui ont plus d'un retard"""
+    with backend.connexion() as conn:
+        return [tuple(ligne) for ligne in backend._executer(
+            conn,
+            """
+            SELECT personnel_id, date_retard, COUNT(*) FROM retards
+            GROUP BY personnel_id, date_retard HAVING COUNT(*) > 1
+            ORDER BY date_retard, personnel_id
+            """,
+        ).fetchall()]
+
+
+def migrer(backend):
+    """Archive les doublons puis crée l'index unique; renvoie le nombre de lignes archivées"""
+    with backend.connexion() as conn:
+        backend._executer(conn, SQL_ARCHIVE)
+        archivees = backend._executer(
+            conn,
+            f"""
+            INSERT INTO retards_doublons (id, personnel_id, date_retard, retard_minutes, motif, created_at)
+            SELECT id, personnel_id, date_retard, retard_minutes, motif, created_at FROM retards
+            WHERE {CONDITION_DOUBLON}
+            """,
+        ).rowcount
+        backend._executer(conn, f"DELETE FROM retards WHERE {CONDITION_DOUBLON}")
+        backend._executer(
+            conn, "CREATE UNIQUE INDEX IF NOT EXISTS uq_retards_personnel_jour ON retards (personnel_id, date_retard)"
+        )
+    return archivees
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index unique des retards (un par employé et par jour)")
+    parser.add_argument("--backend", choices=["postgres", "sqlite"], default=config.BD)
+    parser.add_argument("--chemin", default=str(config.BD_SQLITE_CHEMIN), help="fichier SQLite")
+    parser.add_argument("--appliquer", action="store_true", help="archiver les doublons et créer l'index")
+    args = parser.parse_args(argv)
+
+    if args.backend == "sqlite":
+        backend = creer_backend("sqlite", chemin=args.chemin)
+    else:
+        backend = creer_backend("postgres", parametres=config.parametres_connexion())
+
+    journees = doublons(backend)
+    en_trop = sum(n - 1 for _, _, n in journees)
+    for personnel_id, jour, n in journees[:20]:
+        print(f"personnel {personnel_id} le {jour}: {n} retards")
+    if len(journees) > 20:
+        print(f"... et {len(journees) - 20} autres journées")
+    print(f"{len(journees)} journées en doublon, {en_trop} lignes à archiver dans retards_doublons")
+
+    if not args.appliquer:
+        print("Rien n'a été modifié: relancer avec --appliquer pour migrer")
+        return 0
+    archivees = migrer(backend)
+    print(f"{archivees} lignes archivées dans retards_doublons, index uq_retards_personnel_jour créé")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
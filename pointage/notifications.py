@@ -0,0 +1,126 @@
+"""Diffusion des écritures via LISTEN/NOTIFY.
+
+Les triggers de pointages, absences et conges publient un événement JSON sur
+le canal CANAL. Un seul thread par processus écoute ce canal et le relaie aux
+sessions ouvertes: un tableau de bord ne se recharge que si les données ont
+changé, au lieu que chaque session interroge la base à intervalle régulier.
+"""
+import json
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+CANAL = "pointage_evenements"
+
+SQL_NOTIFICATIONS = f"""
+CREATE OR REPLACE FUNCTION notifier_evenement() RETURNS TRIGGER AS $$
+DECLARE
+    ligne RECORD;
+    evenement JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        ligne := OLD;
+    ELSE
+        ligne := NEW;
+    END IF;
+    evenement := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'personnel_id', ligne.personnel_id);
+    IF TG_TABLE_NAME = 'pointages' THEN
+        evenement := evenement || jsonb_build_object(
+            'jour', ligne.date_pointage,
+            'arrivee', ligne.heure_arrivee IS NOT NULL AND TG_OP <> 'DELETE',
+            'depart', ligne.heure_depart IS NOT NULL OR TG_OP = 'DELETE'
+        ) || COALESCE(
+            (SELECT jsonb_build_object('service', p.service, 'poste', p.poste)
+             FROM personnels p WHERE p.id = ligne.personnel_id),
+            '{{}}'::jsonb
+        );
+    END IF;
+    PERFORM pg_notify('{CANAL}', evenement::text);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['pointages', 'absences', 'conges'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_notifier_' || t) THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+                'FOR EACH ROW EXECUTE FUNCTION notifier_evenement()',
+                'trg_notifier_' || t, t
+            );
+        END IF;
+    END LOOP;
+END
+$$;
+"""
+
+
+class Ecouteur:
+    """Thread unique LISTEN; `version` augmente à chaque événement reçu"""
+
+    def __init__(self, parametres_connexion, delai_reconnexion=5):
+        self.parametres_connexion = parametres_connexion
+        self.delai_reconnexion = delai_reconnexion
+        self.version = 0
+        self.connecte = False
+        self._condition = threading.Condition()
+        self._abonnes = []
+        self._thread = None
+
+    def demarrer(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._boucle, name="ecouteur-notify", daemon=True)
+            self._thread.start()
+        return self
+
+    def abonner(self, rappel):
+        """`rappel(evenement)` est appelé depuis le thread d'écoute; None = événements perdus"""
+        self._abonnes.append(rappel)
+
+    def attendre(self, version, delai):
+        """Bloque jusqu'à ce que la version dépasse `version` ou `delai` secondes; renvoie la version"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, delai)
+            return self.version
+
+    def _signaler(self, evenement):
+        for rappel in list(self._abonnes):
+            try:
+                rappel(evenement)
+            except Exception:
+                pass
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def _boucle(self):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.parametres_connexion)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CANAL}")
+                self.connecte = True
+                # Des événements ont pu être manqués pendant la déconnexion
+                self._signaler(None)
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        self._signaler(json.loads(notification.payload))
+            except Exception:
+                pass
+            finally:
+                self.connecte = False
+                if conn is not None:
+                    conn.close()
+            time.sleep(self.delai_reconnexion)
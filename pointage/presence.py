@@ -0,0 +1,103 @@
+"""Présence sur site en temps réel.
+
+L'ensemble des employés présents est tenu en mémoire et mis à jour à chaque
+arrivée et départ, avec des compteurs par service et par poste: l'affichage
+mural lit ses chiffres en O(1), sans requête. Au démarrage (ou au changement
+de jour) il est reconstruit depuis les pointages du jour; les pointages des
+autres processus arrivent par appliquer_evenement().
+
+Limite: l'état est celui d'un jour. À minuit il repart des pointages du
+nouveau jour, et une équipe de nuit arrivée la veille n'y figure plus (son
+départ, daté de la veille, est ignoré de même) jusqu'à son pointage suivant.
+"""
+import threading
+from collections import Counter
+from datetime import date
+
+
+class Presence:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.jour = None
+        self._presents = {}
+        self._par_service = Counter()
+        self._par_poste = Counter()
+
+    def reconstruire(self, jour, lignes):
+        """Remplace l'état par `lignes` = [(personnel_id, service, poste), ...] présents ce `jour`"""
+        with self._verrou:
+            self.jour = jour
+            self._presents = {}
+            self._par_service = Counter()
+            self._par_poste = Counter()
+            for personnel_id, service, poste in lignes:
+                self._ajouter(personnel_id, service, poste)
+
+    def _ajouter(self, personnel_id, service, poste):
+        if personnel_id in self._presents:
+            return
+        self._presents[personnel_id] = (service, poste)
+        self._par_service[service] += 1
+        self._par_poste[(service, poste)] += 1
+
+    def arrivee(self, jour, personnel_id, service, poste):
+        with self._verrou:
+            if jour == self.jour:
+                self._ajouter(personnel_id, service, poste)
+
+    def depart(self, jour, personnel_id):
+        with self._verrou:
+            if jour != self.jour or personnel_id not in self._presents:
+                return
+            service, poste = self._presents.pop(personnel_id)
+            self._par_service[service] -= 1
+            self._par_poste[(service, poste)] -= 1
+            if not self._par_service[service]:
+                del self._par_service[service]
+            if not self._par_poste[(service, poste)]:
+                del self._par_poste[(service, poste)]
+
+    def invalider(self):
+        """Force la reconstruction depuis la base au prochain accès"""
+        with self._verrou:
+            self.jour = None
+
+    def appliquer_evenement(self, evenement):
+        """Applique un événement de pointage diffusé par un autre processus (LISTEN/NOTIFY)"""
+        if evenement is None:
+            # Événements perdus pendant une déconnexion: l'état n'est plus sûr
+            self.invalider()
+            return
+        if evenement.get("table") != "pointages":
+            return
+        jour = date.fromisoformat(evenement["jour"])
+        if evenement["depart"]:
+            self.depart(jour, evenement["personnel_id"])
+        elif evenement["arrivee"]:
+            self.arrivee(jour, evenement["personnel_id"], evenement.get("service"), evenement.get("poste"))
+
+    def est_present(self, personnel_id):
+        return personnel_id in self._presents
+
+    def total(self):
+        return len(self._presents)
+
+    def par_service(self, service):
+        return self._par_service.get(service, 0)
+
+    def par_poste(self, service, poste):
+        return self._par_poste.get((service, poste), 0)
+
+    def instantane(self):
+        """Copie cohérente des compteurs pour l'affichage"""
+        with self._verrou:
+            return {
+                "jour": self.jour,
+                "total": len(self._presents),
+                "par_service": dict(self._par_service),
+                "par_poste": dict(self._par_poste),
+            }
+
+
+# Une instance par processus: le module n'est importé qu'une fois
+presence = Presence()
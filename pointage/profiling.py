@@ -0,0 +1,112 @@
+"""Profilage d'un rendu de page, à la demande.
+
+La fonction de page s'exécute sous cProfile (temps cumulés exacts par
+fonction) pendant qu'un thread échantillonne la pile du thread du script:
+les échantillons donnent un fichier de piles repliées ("a;b;c 12") que
+lisent flamegraph.pl et speedscope. Seul le thread du script est observé;
+les lectures attendues sur la boucle de pointage.asynchrone y apparaissent
+comme une attente de leurs résultats.
+"""
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Répartition du temps propre par origine: (catégorie, fragments de chemin ou de nom)
+CATEGORIES = (
+    ("SQL", ("psycopg2", "pointage/metrics.py")),
+    ("pandas", ("pandas", "numpy", "pyarrow")),
+    ("widgets", ("streamlit", "plotly", "tornado")),
+)
+
+
+def categorie(fichier, fonction):
+    texte = f"{fichier} {fonction}".replace(os.sep, "/")
+    for nom, fragments in CATEGORIES:
+        if any(fragment in texte for fragment in fragments):
+            return nom
+    return "application"
+
+
+class _Echantillonneur(threading.Thread):
+    def __init__(self, thread_cible, intervalle, code_racine):
+        super().__init__(name="profilage-echantillons", daemon=True)
+        self.thread_cible = thread_cible
+        self.code_racine = code_racine
+        self.intervalle = intervalle
+        self.piles = Counter()
+        self._arret = threading.Event()
+
+    def run(self):
+        while not self._arret.wait(self.intervalle):
+            frame = sys._current_frames().get(self.thread_cible)
+            pile = []
+            # Les cadres de Streamlit au-dessus de profiler() sont communs à tous les échantillons
+            while frame is not None and frame.f_code is not self.code_racine:
+                code = frame.f_code
+                pile.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if pile:
+                self.piles[";".join(reversed(pile))] += 1
+
+    def arreter(self):
+        self._arret.set()
+        self.join()
+
+
+class Profil:
+    def __init__(self, nom, profileur, piles, duree, intervalle):
+        self.nom = nom
+        self.duree = duree
+        self.intervalle = intervalle
+        self.piles = piles
+        profileur.create_stats()
+        self._stats = profileur.stats
+
+    def points_chauds(self, limite=25):
+        """Fonctions triées par temps cumulé: [{fonction, appels, propre, cumule, categorie}]"""
+        lignes = []
+        for (fichier, ligne, fonction), (_, appels, propre, cumule, _) in self._stats.items():
+            lignes.append({
+                "fonction": f"{fonction} ({os.path.basename(fichier)}:{ligne})" if ligne else fonction,
+                "appels": appels,
+                "propre_s": propre,
+                "cumule_s": cumule,
+                "categorie": categorie(fichier, fonction),
+            })
+        lignes.sort(key=lambda l: l["cumule_s"], reverse=True)
+        return lignes[:limite]
+
+    def par_categorie(self):
+        """Temps propre total par catégorie (SQL, pandas, widgets, application)"""
+        totaux = Counter()
+        for (fichier, _, fonction), (_, _, propre, _, _) in self._stats.items():
+            totaux[categorie(fichier, fonction)] += propre
+        return dict(totaux)
+
+    def octets_prof(self):
+        """Contenu d'un fichier .prof (pstats.dump_stats), pour snakeviz ou flameprof"""
+        return marshal.dumps(self._stats)
+
+    def piles_repliees(self):
+        """Piles échantillonnées au format replié de flamegraph.pl (une pile par ligne)"""
+        return "".join(f"{pile} {nombre}\n" for pile, nombre in self.piles.most_common())
+
+
+def profiler(nom, fonction, *args, intervalle=0.005, **kwargs):
+    """Exécute `fonction` sous profilage et renvoie (résultat, Profil)"""
+    echantillonneur = _Echantillonneur(threading.get_ident(), intervalle, profiler.__code__)
+    profileur = cProfile.Profile()
+    echantillonneur.start()
+    debut = time.perf_counter()
+    profileur.enable()
+    try:
+        resultat = fonction(*args, **kwargs)
+    finally:
+        profileur.disable()
+        echantillonneur.arreter()
+    duree = time.perf_counter() - debut
+    return resultat, Profil(nom, profileur, echantillonneur.piles, duree, intervalle)
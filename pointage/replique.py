@@ -0,0 +1,212 @@
+"""Routage des lectures de rapports vers une réplique en lecture seule.
+
+Les fonctions de rapport (statistiques, historique, retards, absences) sont
+marquées @vers_replique: le temps de leur appel, les connexions empruntées
+(get_connection, pilote async) viennent de la réplique plutôt que du primaire,
+qui garde les pointages de la relève. La lecture reste sur le primaire quand:
+
+- aucune réplique n'est configurée;
+- la session a écrit il y a moins de `apres_ecriture` secondes: elle relit
+  ses propres écritures;
+- le retard de rejeu de la réplique dépasse `retard_max`, est inconnu, ou la
+  réplique ne répond pas. Le retard est mesuré au plus une fois toutes les
+  `intervalle` secondes par processus, par rapport à la position du WAL lue
+  sur le primaire: une réplique dont la réception est coupée ou bloquée n'a
+  pas rejoué cette position et reste écartée, même si elle a rejoué tout ce
+  qu'elle a reçu.
+
+Un résultat lu sur la réplique est gardé en cache au plus `retard_max`
+secondes: les versions de tables de la clé viennent du primaire, les données
+peuvent les précéder de ce retard.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+import psycopg2.extensions
+
+from pointage.cache import plafonner_ttl
+from pointage.delais import ConnexionPointage
+
+_demande = contextvars.ContextVar("pointage_vers_replique", default=False)
+_derniere_ecriture = contextvars.ContextVar("pointage_derniere_ecriture", default=None)
+
+# Position du WAL du primaire, lue juste avant la mesure sur la réplique
+SQL_POSITION_PRIMAIRE = "SELECT pg_current_wal_lsn()::text"
+
+# Rejeu à jour quand la position du primaire est rejouée; sinon, âge de la dernière transaction rejouée
+SQL_RETARD = """
+SELECT pg_is_in_recovery(),
+       pg_last_wal_replay_lsn() >= %s::pg_lsn,
+       EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+"""
+
+
+class ConnexionReplique(ConnexionPointage):
+    """Connexion du pool de la réplique: return_connection la rend à ce pool"""
+
+
+def lire_position_primaire(conn):
+    """Position courante du WAL du primaire `conn` (texte pg_lsn)"""
+    # Curseur de base: la mesure n'est imputée à aucune fonction instrumentée
+    with psycopg2.extensions.cursor(conn) as cur:
+        cur.execute(SQL_POSITION_PRIMAIRE)
+        position = cur.fetchone()[0]
+    conn.rollback()
+    return position
+
+
+def mesurer_retard(conn, position_primaire):
+    """Retard de rejeu de la réplique `conn` sur `position_primaire`, en secondes; None s'il est inconnu"""
+    with psycopg2.extensions.cursor(conn) as cur:
+        cur.execute(SQL_RETARD, (position_primaire,))
+        en_reprise, a_jour, retard = cur.fetchone()
+    conn.rollback()
+    if not en_reprise or a_jour:
+        # Un serveur primaire (bascule, essai local), ou tout ce que le primaire avait écrit est rejoué
+        return 0.0
+    # Réception coupée ou rejeu en cours: âge de la dernière transaction rejouée, qui croît tant qu'elle dure
+    return None if retard is None else float(retard)
+
+
+class Routage:
+    def __init__(self):
+        self._mesurer = None
+        self.retard_max = 10.0
+        self.apres_ecriture = 30.0
+        self.intervalle = 5.0
+        self._verrou = threading.Lock()
+        self._verifie_a = None
+        self._retard = None
+        self._raison = "non configurée"
+        self._detail = None
+        self.compteurs = {}  # destination ou motif du repli -> connexions empruntées
+
+    @property
+    def actif(self):
+        return self._mesurer is not None
+
+    def configurer(self, mesurer, retard_max=None, apres_ecriture=None, intervalle=None):
+        """`mesurer()` renvoie le retard de la réplique (s ou None) et lève si elle est injoignable;
+        None désactive le routage"""
+        if retard_max is not None:
+            self.retard_max = retard_max
+        if apres_ecriture is not None:
+            self.apres_ecriture = apres_ecriture
+        if intervalle is not None:
+            self.intervalle = intervalle
+        with self._verrou:
+            self._mesurer = mesurer
+            self._verifie_a = None
+            self._retard = None
+            self._raison = None if mesurer is not None else "non configurée"
+            self._detail = None
+
+    def marquer_ecriture(self):
+        """Après une écriture de la session: ses lectures restent sur le primaire un moment.
+        Renvoie l'instant à garder en session pour les exécutions suivantes."""
+        instant = time.monotonic()
+        _derniere_ecriture.set(instant)
+        return instant
+
+    def reprendre_session(self, instant):
+        """Début d'exécution: instant de la dernière écriture de la session (None si aucune)"""
+        _derniere_ecriture.set(instant)
+
+    def _compter(self, cle):
+        with self._verrou:
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + 1
+
+    def _verifier(self):
+        maintenant = time.monotonic()
+        with self._verrou:
+            if self._verifie_a is not None and maintenant - self._verifie_a < self.intervalle:
+                return self._raison
+            # Un seul appelant mesure; les autres gardent l'état précédent en attendant
+            self._verifie_a = maintenant
+            mesurer = self._mesurer
+        try:
+            retard = mesurer()
+        except Exception as e:
+            retard, raison, detail = None, "injoignable", str(e).strip()
+        else:
+            if retard is None:
+                raison, detail = "retard inconnu", None
+            elif retard > self.retard_max:
+                raison, detail = "en retard", f"{retard:.1f} s"
+            else:
+                raison, detail = None, None
+        with self._verrou:
+            self._retard, self._raison, self._detail = retard, raison, detail
+        return raison
+
+    def signaler_panne(self, erreur):
+        """Connexion à la réplique impossible: primaire jusqu'à la prochaine mesure"""
+        with self._verrou:
+            self._verifie_a = time.monotonic()
+            self._retard, self._raison, self._detail = None, "injoignable", str(erreur).strip()
+
+    def demandee(self):
+        """Vrai dans une lecture de rapport, la réplique étant configurée"""
+        return self._mesurer is not None and _demande.get()
+
+    def utiliser_replique(self):
+        """Vrai si la connexion à emprunter pour l'appel en cours doit venir de la réplique"""
+        if not self.demandee():
+            return False
+        derniere = _derniere_ecriture.get()
+        if derniere is not None and time.monotonic() - derniere < self.apres_ecriture:
+            self._compter("primaire: écriture récente")
+            return False
+        raison = self._verifier()
+        if raison is not None:
+            self._compter(f"primaire: réplique {raison}")
+            return False
+        self._compter("réplique")
+        plafonner_ttl(self.retard_max)
+        return True
+
+    def vers_replique(self, fonction):
+        """Décorateur des lectures de rapport, synchrones ou coroutines"""
+        if inspect.iscoroutinefunction(fonction):
+            @functools.wraps(fonction)
+            async def enveloppe_async(*args, **kwargs):
+                jeton = _demande.set(True)
+                try:
+                    return await fonction(*args, **kwargs)
+                finally:
+                    _demande.reset(jeton)
+
+            return enveloppe_async
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            jeton = _demande.set(True)
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                _demande.reset(jeton)
+
+        return enveloppe
+
+    def etat(self):
+        """État du routage, pour la page d'administration"""
+        with self._verrou:
+            return {
+                "actif": self._mesurer is not None,
+                "disponible": self._mesurer is not None and self._raison is None,
+                "raison": self._raison,
+                "detail": self._detail,
+                "retard": self._retard,
+                "verifie_il_y_a": None if self._verifie_a is None else time.monotonic() - self._verifie_a,
+                "retard_max": self.retard_max,
+                "apres_ecriture": self.apres_ecriture,
+                "compteurs": dict(self.compteurs),
+            }
+
+
+# Une instance par processus, comme le journal des requêtes lentes
+routage = Routage()
+vers_replique = routage.vers_replique
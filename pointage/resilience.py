@@ -0,0 +1,282 @@
+"""Résilience des lectures: nouvelles tentatives, connexions cassées écartées, disjoncteur.
+
+Une lecture idempotente (@reessayer) qui échoue sur une erreur transitoire
+(connexion perdue, serveur qui redémarre, conflit de sérialisation) est
+relancée après une attente exponentielle à gigue pleine, au plus
+`tentatives` fois et jamais au-delà du budget de la page (pointage.delais).
+Une connexion perdue est fermée au retour plutôt que rendue au pool
+(connexion_cassee).
+
+Après `seuil` lectures en échec d'affilée, le disjoncteur s'ouvre: pendant
+`duree_ouverture` secondes aucune connexion n'est plus demandée, les lectures
+servent leur dernier résultat en cache (pointage.cache) et la page l'indique.
+La première lecture après ce délai sert d'essai: réussie, elle referme le
+disjoncteur; en échec, elle le rouvre. Seules les lectures @reessayer
+consultent et renseignent le disjoncteur: une écriture est toujours tentée,
+et ne prend jamais la place de l'essai.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from pointage.cache import signaler_echec
+from pointage.delais import delais, est_delai
+from pointage.metrics import noter
+
+_tentative = contextvars.ContextVar("pointage_tentative", default=None)
+
+FERME, OUVERT, SEMI_OUVERT = "fermé", "ouvert", "semi-ouvert"
+
+
+class BaseIndisponible(Exception):
+    """Disjoncteur ouvert: la base n'est pas sollicitée"""
+
+
+def est_transitoire(erreur):
+    """Vrai si une nouvelle tentative de la même lecture peut réussir"""
+    if erreur is None or est_delai(erreur) or isinstance(erreur, BaseIndisponible):
+        return False
+    if isinstance(erreur, (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.pool.PoolError)):
+        return True
+    # Conflits de sérialisation, connexion (08...), arrêt ou redémarrage du serveur (57P...)
+    code = getattr(erreur, "pgcode", None) or getattr(erreur, "sqlstate", None) or ""
+    if code in ("40001", "40P01") or code.startswith(("08", "57P")):
+        return True
+    # psycopg 3 (pointage.asynchrone): mêmes familles d'erreurs
+    return any(classe.__name__ in ("OperationalError", "InterfaceError") for classe in type(erreur).__mro__)
+
+
+def connexion_cassee(conn):
+    """Vrai si la connexion psycopg2 `conn` est fermée ou a perdu le serveur: à fermer plutôt qu'à rendre au pool"""
+    return bool(conn.closed) or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+
+
+class _Tentative:
+    """Issue d'une tentative: `echec` si une erreur a été signalée, `erreur` si elle est transitoire (non affichée)"""
+
+    __slots__ = ("echec", "erreur")
+
+    def __init__(self):
+        self.echec = False
+        self.erreur = None
+
+
+class Disjoncteur:
+    def __init__(self, seuil=5, duree_ouverture=30.0):
+        self.seuil = seuil
+        self.duree_ouverture = duree_ouverture
+        self._verrou = threading.Lock()
+        self.etat = FERME
+        self.echecs = 0  # lectures en échec d'affilée
+        self._depuis = None  # ouverture, ou début de l'essai en cours
+        self.derniere_erreur = None
+        self.refusees = 0
+        self.transitions = deque(maxlen=20)  # (horodatage, état, motif)
+
+    def _passer(self, etat, motif=None):
+        self.etat = etat
+        self.transitions.appendleft((datetime.now(), etat, motif))
+
+    def ouvert(self):
+        """Vrai si aucune requête ne doit partir maintenant (sans prendre la place de l'essai)"""
+        with self._verrou:
+            return self.etat != FERME and time.monotonic() - self._depuis < self.duree_ouverture
+
+    def autoriser(self):
+        """Avant d'emprunter une connexion: lève BaseIndisponible (comptée) tant que le disjoncteur est ouvert"""
+        with self._verrou:
+            if self.etat == FERME:
+                return
+            maintenant = time.monotonic()
+            ecoule = maintenant - self._depuis
+            if ecoule >= self.duree_ouverture:
+                # Essai: cet appelant passe, les autres attendent son issue (ou la fin d'un nouveau délai)
+                if self.etat == OUVERT:
+                    self._passer(SEMI_OUVERT)
+                self._depuis = maintenant
+                return
+            self.refusees += 1
+            reste = self.duree_ouverture - ecoule
+        noter(indisponible=1)
+        raise BaseIndisponible(f"base de données indisponible, nouvel essai dans {reste:.0f} s")
+
+    def succes(self):
+        with self._verrou:
+            self.echecs = 0
+            if self.etat != FERME:
+                self._passer(FERME, "lecture réussie")
+
+    def echec(self, erreur):
+        with self._verrou:
+            self.echecs += 1
+            self.derniere_erreur = str(erreur).strip()
+            if self.etat == SEMI_OUVERT or (self.etat == FERME and self.echecs >= self.seuil):
+                self._depuis = time.monotonic()
+                self._passer(OUVERT, self.derniere_erreur)
+
+    def rearmer(self):
+        """Fermeture manuelle (page d'administration)"""
+        with self._verrou:
+            self.echecs = 0
+            if self.etat != FERME:
+                self._passer(FERME, "réarmé")
+
+
+class Resilience:
+    def __init__(self):
+        self.tentatives = 3
+        self.attente_base = 0.1
+        self.attente_max = 1.0
+        self.disjoncteur = Disjoncteur()
+        self._verrou = threading.Lock()
+        self.compteurs = {"nouvelles tentatives": 0, "lectures en échec": 0, "connexions écartées": 0}
+        self._alea = random.Random()
+
+    def configurer(self, tentatives=None, attente_base=None, attente_max=None, seuil=None, duree_ouverture=None):
+        if tentatives is not None:
+            self.tentatives = max(1, int(tentatives))
+        if attente_base is not None:
+            self.attente_base = attente_base
+        if attente_max is not None:
+            self.attente_max = attente_max
+        if seuil is not None:
+            self.disjoncteur.seuil = max(1, int(seuil))
+        if duree_ouverture is not None:
+            self.disjoncteur.duree_ouverture = duree_ouverture
+
+    def autoriser(self):
+        """Avant d'emprunter une connexion: dans une lecture @reessayer, lève BaseIndisponible si le disjoncteur refuse"""
+        if _tentative.get() is not None:
+            self.disjoncteur.autoriser()
+
+    def compter(self, cle):
+        with self._verrou:
+            self.compteurs[cle] += 1
+
+    def _attente(self, tentative, erreur):
+        """Attente avant la tentative suivante, None s'il n'y en a pas"""
+        if tentative + 1 >= self.tentatives or not est_transitoire(erreur):
+            return None
+        # Gigue pleine: les sessions qui échouent ensemble ne reviennent pas ensemble
+        attente = self._alea.uniform(0, min(self.attente_max, self.attente_base * 2 ** tentative))
+        reste = delais.reste()
+        if reste is not None and reste <= attente:
+            return None
+        self.compter("nouvelles tentatives")
+        noter(reessais=1)
+        return attente
+
+    def _echec_final(self, erreur):
+        """Lecture en échec après toutes ses tentatives: comptée, et son résultat peut venir du cache"""
+        if not isinstance(erreur, BaseIndisponible):
+            self.compter("lectures en échec")
+            noter(indisponible=1)
+            self.disjoncteur.echec(erreur)
+        signaler_echec(secours=True)
+
+    def intercepter(self, erreur):
+        """Appelé par le signalement d'une erreur de lecture: vrai si elle ne doit pas être affichée.
+
+        Disjoncteur ouvert: la lecture sert son secours du cache. Erreur
+        transitoire pendant une tentative @reessayer: retenue, la tentative
+        suivante ou l'échec final décide.
+        """
+        tentative = _tentative.get()
+        if tentative is not None:
+            tentative.echec = True
+        if isinstance(erreur, BaseIndisponible):
+            if tentative is not None:
+                tentative.erreur = erreur
+            signaler_echec(secours=True)
+            return True
+        if tentative is not None and est_transitoire(erreur):
+            tentative.erreur = erreur
+            return True
+        return False
+
+    def reessayer(self, fonction):
+        """Décorateur des lectures idempotentes, synchrones (qui signalent leurs erreurs) ou coroutines (qui lèvent)"""
+        if inspect.iscoroutinefunction(fonction):
+            @functools.wraps(fonction)
+            async def enveloppe_async(*args, **kwargs):
+                tentative = 0
+                while True:
+                    jeton = _tentative.set(_Tentative())
+                    try:
+                        resultat = await fonction(*args, **kwargs)
+                    except Exception as e:
+                        attente = self._attente(tentative, e)
+                        if attente is None:
+                            if est_transitoire(e) or isinstance(e, BaseIndisponible):
+                                self._echec_final(e)
+                            raise
+                        await asyncio.sleep(attente)
+                        tentative += 1
+                        continue
+                    finally:
+                        _tentative.reset(jeton)
+                    self.disjoncteur.succes()
+                    return resultat
+
+            return enveloppe_async
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            tentative = 0
+            while True:
+                suivi = _Tentative()
+                jeton = _tentative.set(suivi)
+                try:
+                    resultat = fonction(*args, **kwargs)
+                finally:
+                    _tentative.reset(jeton)
+                if not suivi.echec:
+                    self.disjoncteur.succes()
+                    return resultat
+                if suivi.erreur is None:
+                    # Erreur non transitoire, déjà affichée: ni nouvelle tentative, ni effet sur le disjoncteur
+                    return resultat
+                attente = self._attente(tentative, suivi.erreur)
+                if attente is None:
+                    self._echec_final(suivi.erreur)
+                    return resultat
+                time.sleep(attente)
+                tentative += 1
+
+        return enveloppe
+
+    def etat(self):
+        """État du disjoncteur et compteurs, pour la page d'administration"""
+        disjoncteur = self.disjoncteur
+        with disjoncteur._verrou:
+            ouvert_depuis = None if disjoncteur._depuis is None or disjoncteur.etat == FERME \
+                else time.monotonic() - disjoncteur._depuis
+            etat = {
+                "etat": disjoncteur.etat,
+                "echecs": disjoncteur.echecs,
+                "seuil": disjoncteur.seuil,
+                "duree_ouverture": disjoncteur.duree_ouverture,
+                "depuis": ouvert_depuis,
+                "derniere_erreur": disjoncteur.derniere_erreur,
+                "refusees": disjoncteur.refusees,
+                "transitions": list(disjoncteur.transitions),
+            }
+        with self._verrou:
+            etat["compteurs"] = dict(self.compteurs)
+        etat["tentatives"] = self.tentatives
+        return etat
+
+
+# Une instance par processus, comme le routage vers la réplique
+resilience = Resilience()
+reessayer = resilience.reessayer
@@ -0,0 +1,65 @@
+"""Règles de pointage: statut d'arrivée, retard, absence, départ anticipé.
+
+Fonctions pures, sans base ni Streamlit: pointage.db les applique au moment
+d'enregistrer, les outils de bench.* pour prévoir le résultat attendu.
+"""
+from datetime import date, datetime, time as tm, timedelta
+
+
+def as_time(value) -> tm:
+    if isinstance(value, tm):
+        return value
+    s = str(value)
+    for fmt in ("%H:%M:%S", "%H:%M:%S.%f", "%H:%M"):
+        try:
+            return datetime.strptime(s, fmt).time()
+        except ValueError:
+            continue
+    return tm(8, 0)
+
+
+def calculer_statut_arrivee(heure_pointage, heure_prevue):
+    """
+    Calcule le statut de pointage selon les règles spécifiques:
+    - Plage normale: 15min avant à 5min avant l'heure prévue (07:45 à 07:55 pour 08:00)
+    - En retard: après 5min avant l'heure prévue jusqu'à 29 minutes de retard
+    - Absent: 30 minutes ou plus de retard (après 08:30 pour 08:00)
+    """
+    if not heure_pointage or not heure_prevue:
+        return "Non pointé", 0, False
+    
+    heure_prevue = as_time(heure_prevue)
+    heure_pointage = as_time(heure_pointage)
+    
+    # Convertir en datetime pour les calculs
+    dt_prevue = datetime.combine(date.today(), heure_prevue)
+    dt_pointage = datetime.combine(date.today(), heure_pointage)
+    
+    # Définition des plages horaires spécifiques
+    debut_plage = dt_prevue - timedelta(minutes=15)  # 07:45 pour 08:00
+    fin_plage = dt_prevue - timedelta(minutes=5)     # 07:55 pour 08:00
+    limite_retard = dt_prevue + timedelta(minutes=30) # 08:30 pour 08:00
+    
+    if debut_plage <= dt_pointage <= fin_plage:
+        return "Présent à l'heure", 0, False
+    elif fin_plage < dt_pointage < limite_retard:
+        retard = (dt_pointage - fin_plage).total_seconds() / 60
+        return "En retard", int(retard), False
+    elif dt_pointage >= limite_retard:
+        return "Absent", 30, True  # Retourne 30 minutes de retard et marque comme absent
+    elif dt_pointage < debut_plage:
+        avance = (debut_plage - dt_pointage).total_seconds() / 60
+        return "En avance", int(-avance), False
+    
+    return "Non pointé", 0, False
+
+
+def calculer_statut_depart(heure_depart, heure_sortie_prevue):
+    """Statut de départ et minutes d'avance: départ anticipé seulement au-delà de 5 minutes"""
+    heure_depart = as_time(heure_depart)
+    heure_sortie_prevue = as_time(heure_sortie_prevue)
+    delta_minutes = (datetime.combine(date.today(), heure_sortie_prevue)
+                     - datetime.combine(date.today(), heure_depart)).total_seconds() / 60
+    if delta_minutes > 5:
+        return "Départ anticipé", int(delta_minutes)
+    return "Present", 0
@@ -0,0 +1,125 @@
+"""Journal des requêtes lentes, avec plan d'exécution sur un échantillon.
+
+Désactivé par défaut. Une fois activé (config ou page Performance), toute
+requête dont l'exécution dépasse le seuil est gardée avec ses paramètres et la
+fonction instrumentée qui l'a lancée, dans un tampon circulaire en mémoire.
+Une fraction des SELECT retenus est rejouée avec EXPLAIN (ANALYZE, BUFFERS)
+sur la même connexion, dans la même transaction, pour voir le plan tel que la
+requête l'a réellement suivi. Le rejeu a lieu en lecture seule, dans un point
+de sauvegarde toujours annulé: une fonction volatile appelée par un SELECT
+(roster, séquence, notification) échoue ou voit son effet annulé au lieu
+d'être exécutée une seconde fois.
+
+Le plan rejoue la requête: son coût s'ajoute à l'appel échantillonné, d'où un
+échantillonnage et un seuil plutôt qu'une capture systématique.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extensions
+
+# Premier tri sur le texte; la lecture seule du rejeu couvre les fonctions qui écrivent sans le dire
+_EFFETS_DE_BORD = re.compile(
+    r"\b(insert|update|delete|merge|nextval|setval|pg_notify|pg_advisory\w*|pg_sleep|lo_\w+)\b", re.IGNORECASE
+)
+_LONGUEUR_PARAMETRES = 500
+
+
+def _texte(requete):
+    if isinstance(requete, bytes):
+        return requete.decode("utf-8", "replace")
+    return str(requete)
+
+
+def rejouable(requete):
+    """Vrai si `requete` se présente comme une lecture sans effet de bord, candidate au rejeu"""
+    texte = requete.lstrip().lower()
+    return texte.startswith(("select", "with")) and not _EFFETS_DE_BORD.search(texte)
+
+
+class JournalLent:
+    def __init__(self, actif=False, seuil_ms=200, echantillon=0.1, taille=100):
+        self.actif = actif
+        self.seuil = seuil_ms / 1000
+        self.echantillon = echantillon
+        self._entrees = deque(maxlen=taille)
+        self._verrou = threading.Lock()
+        self._alea = random.Random()
+
+    def configurer(self, actif=None, seuil_ms=None, echantillon=None, taille=None):
+        if seuil_ms is not None:
+            self.seuil = seuil_ms / 1000
+        if echantillon is not None:
+            self.echantillon = echantillon
+        if taille is not None and taille != self._entrees.maxlen:
+            with self._verrou:
+                self._entrees = deque(self._entrees, maxlen=taille)
+        if actif is not None:
+            self.actif = actif
+
+    def observer(self, curseur, requete, variables, duree, fonction):
+        """Appelé après chaque exécution réussie: garde la requête si elle dépasse le seuil"""
+        if not self.actif or duree < self.seuil:
+            return
+        texte = _texte(curseur.query) if curseur.query is not None else _texte(requete)
+        entree = {
+            "horodatage": datetime.now(),
+            "fonction": fonction,
+            "duree": duree,
+            "lignes": curseur.rowcount,
+            "requete": " ".join(_texte(requete).split()),
+            "parametres": None if variables is None else repr(variables)[:_LONGUEUR_PARAMETRES],
+            "plan": None,
+            "duree_plan": None,
+        }
+        # Un curseur nommé (côté serveur) n'a fait que DECLARE: son plan se lirait sans les lectures
+        if curseur.name is None and rejouable(texte) and self._alea.random() < self.echantillon:
+            entree["plan"], entree["duree_plan"] = self._expliquer(curseur.connection, texte)
+        with self._verrou:
+            self._entrees.append(entree)
+
+    @staticmethod
+    def _expliquer(conn, texte):
+        # Curseur de base: le rejeu n'est ni mesuré ni journalisé lui-même. Dans une
+        # transaction, un point de sauvegarde passé en lecture seule puis annulé
+        # (le réglage avec lui); hors transaction, une transaction en lecture seule annulée.
+        debut = time.perf_counter()
+        transaction = not conn.autocommit
+        try:
+            with psycopg2.extensions.cursor(conn) as cur:
+                if transaction:
+                    cur.execute("SAVEPOINT journal_lent")
+                    cur.execute("SET TRANSACTION READ ONLY")
+                else:
+                    cur.execute("BEGIN READ ONLY")
+                try:
+                    cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + texte)
+                    plan = "\n".join(ligne[0] for ligne in cur.fetchall())
+                except psycopg2.Error as e:
+                    plan = f"EXPLAIN impossible: {e}"
+                if transaction:
+                    cur.execute("ROLLBACK TO SAVEPOINT journal_lent")
+                    cur.execute("RELEASE SAVEPOINT journal_lent")
+                else:
+                    cur.execute("ROLLBACK")
+        except psycopg2.Error as e:
+            plan = f"EXPLAIN impossible: {e}"
+        return plan, time.perf_counter() - debut
+
+    def entrees(self):
+        """Requêtes retenues, la plus récente d'abord"""
+        with self._verrou:
+            return list(reversed(self._entrees))
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+
+# Une instance par processus, configurée depuis config.py au démarrage
+journal_lent = JournalLent()
@@ -0,0 +1,18 @@
+"""Lectures par plage du stockage des certificats."""
+import pytest
+
+from pointage.blobstore import BlobStore
+
+
+def test_lecture_par_plage(tmp_path):
+    store = BlobStore(tmp_path)
+    sha256, taille = store.ajouter(bytes(range(256)) * 1024)
+    assert taille == 256 * 1024
+    assert store.lire_plage(sha256, 250, 260) == bytes([250, 251, 252, 253, 254, 255, 0, 1, 2, 3])
+    assert b"".join(store.lire_par_blocs(sha256, taille_bloc=1000, fin=2500)) == (bytes(range(256)) * 10)[:2500]
+
+
+def test_fichier_manquant_des_l_appel(tmp_path):
+    # L'erreur survient là où l'appelant la traite, pas à la première itération
+    with pytest.raises(FileNotFoundError):
+        BlobStore(tmp_path).lire_par_blocs("0" * 64)
@@ -0,0 +1,38 @@
+"""Rapport du cache des lectures."""
+import pandas as pd
+
+from pointage.cache import CacheLectures, MemoireLocale, signaler_echec
+
+
+class Versions:
+    def __init__(self, versions):
+        self.versions = versions
+
+    def obtenir(self, tables):
+        return self.versions
+
+
+def _lecture(cache, resultat):
+    @cache.lecture("personnels")
+    def personnels():
+        if resultat is None:
+            # Délai dépassé ou base injoignable: la lecture sert son secours
+            signaler_echec(secours=True)
+        return resultat
+
+    return personnels
+
+
+def test_taux_sans_lecture_du_cache():
+    stockage = MemoireLocale()
+    _lecture(CacheLectures(Versions((1,)), stockage), pd.DataFrame({"id": [1]}))()
+
+    # Processus redémarré sur le même stockage, table_versions illisible: secours seul
+    cache = CacheLectures(Versions(None), stockage)
+    assert _lecture(cache, None)()["id"].tolist() == [1]
+
+    rapport = cache.rapport()
+    (stats,) = rapport["par_fonction"].values()
+    assert (stats["trouves"], stats["manques"], stats["secours"]) == (0, 0, 1)
+    assert stats["taux_succes"] is None
+    assert rapport["taux_succes"] is None
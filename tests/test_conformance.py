@@ -0,0 +1,235 @@
+"""Suite de conformité commune aux backends de pointage.backends.
+
+    python -m pytest tests/test_conformance.py                     # SQLite en mémoire
+    POINTAGE_CONFORMITE_DSN="host=localhost dbname=conformite" python -m pytest tests/test_conformance.py
+
+Les tests passent par les opérations que pointage.db délègue au backend,
+puis vérifient les lignes écrites. Chaque test part d'une base vide. Avec
+PostgreSQL, le schéma public de la base POINTAGE_CONFORMITE_DSN est supprimé
+puis recréé avant chaque test: base À SACRIFIER.
+"""
+import os
+from datetime import date, time
+
+import pytest
+
+from pointage.backends import BackendPostgres, BackendSqlite
+from pointage.migration_retards import doublons, migrer
+from pointage.rules import as_time
+
+JOUR = date(2024, 3, 12)
+
+DSN = os.environ.get("POINTAGE_CONFORMITE_DSN")
+
+
+def _sqlite():
+    return BackendSqlite(":memory:")
+
+
+def _postgres():
+    import psycopg2
+
+    conn = psycopg2.connect(DSN)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("DROP SCHEMA IF EXISTS public CASCADE")
+            cur.execute("CREATE SCHEMA public")
+    finally:
+        conn.close()
+    return BackendPostgres(lambda: psycopg2.connect(DSN), lambda conn: conn.close())
+
+
+@pytest.fixture(params=[
+    pytest.param(_sqlite, id="sqlite"),
+    pytest.param(_postgres, id="postgres",
+                 marks=pytest.mark.skipif(not DSN, reason="POINTAGE_CONFORMITE_DSN non défini")),
+])
+def backend(request):
+    backend = request.param()
+    backend.creer_schema()
+    yield backend
+    fermer = getattr(backend, "fermer", None)
+    if fermer:
+        fermer()
+
+
+@pytest.fixture
+def employe(backend):
+    return backend.ajouter_personnel("Dupont", "Jean", "Urgence", "Jour", time(8, 0), time(16, 0))
+
+
+def compter(backend, table, condition="TRUE", params=()):
+    return backend._lignes(f"SELECT COUNT(*) AS n FROM {table} WHERE {condition}", params)[0]["n"]
+
+
+def pointage(backend, employe, jour=JOUR):
+    lignes = backend._lignes("SELECT * FROM pointages WHERE personnel_id = %s AND date_pointage = %s",
+                             (employe, jour))
+    return lignes[0] if lignes else None
+
+
+def retard_minutes(backend, employe, jour=JOUR):
+    return backend._lignes("SELECT retard_minutes FROM retards WHERE personnel_id = %s AND date_retard = %s",
+                           (employe, jour))[0]["retard_minutes"]
+
+
+def absences(backend, jour=JOUR):
+    return backend._lignes("SELECT * FROM absences WHERE date_absence = %s ORDER BY personnel_id", (jour,))
+
+
+# --- Personnel et utilisateurs ---
+
+def test_personnel_types(backend, employe):
+    autre = backend.ajouter_personnel("Martin", "Marie", "Radiologie", "Nuit", "20:00", "04:00")
+    ligne = backend._lignes("SELECT * FROM personnels WHERE id = %s", (autre,))[0]
+    assert (ligne["nom"], ligne["poste"]) == ("Martin", "Nuit")
+    assert ligne["actif"]
+    assert ligne["heure_entree_prevue"] == time(20, 0)
+    assert compter(backend, "personnels") == 2
+
+
+def test_personnel_actif(backend, employe):
+    autre = backend.ajouter_personnel("Martin", "Marie", "Radiologie", "Nuit", "20:00", "04:00")
+    with backend.connexion() as conn:
+        backend._executer(conn, "UPDATE personnels SET actif = FALSE WHERE id = %s", (autre,))
+    assert [(p["id"], p["nom"], p["heure_entree_prevue"]) for p in backend.personnel_actif()] == [
+        (employe, "Dupont", time(8, 0)),
+    ]
+
+
+def test_authentification(backend):
+    backend.creer_utilisateur("kiosque", "empreinte", "user")
+    assert backend.authentifier("kiosque", "empreinte")[1:] == ("kiosque", "user")
+    assert backend.authentifier("kiosque", "autre") is None
+
+
+def test_utilisateur_par_defaut(backend):
+    backend.assurer_utilisateur("admin", "empreinte", "admin")
+    backend.assurer_utilisateur("admin", "autre", "admin")
+    assert compter(backend, "users") == 1
+    assert backend.authentifier("admin", "empreinte")[2] == "admin"
+
+
+# --- Arrivées ---
+
+def test_arrivee_a_l_heure(backend, employe):
+    resultat = backend.enregistrer_arrivee(employe, JOUR, time(7, 50))
+    assert resultat["statut"] == "Présent à l'heure"
+    assert resultat["retard_minutes"] == 0
+    assert (resultat["service"], resultat["poste"]) == ("Urgence", "Jour")
+    ligne = pointage(backend, employe)
+    assert ligne["heure_arrivee"] == time(7, 50)
+    assert ligne["date_pointage"] == JOUR
+    assert compter(backend, "retards") == 0
+
+
+def test_arrivee_en_retard(backend, employe):
+    resultat = backend.enregistrer_arrivee(employe, JOUR, time(8, 10), motif_retard="Transport")
+    assert (resultat["statut"], resultat["retard_minutes"]) == ("En retard", 15)
+    assert retard_minutes(backend, employe) == 15
+
+
+def test_double_arrivee(backend, employe):
+    backend.enregistrer_arrivee(employe, JOUR, time(8, 10), notes="badge")
+    backend.enregistrer_arrivee(employe, JOUR, time(8, 12))
+    assert compter(backend, "pointages") == 1
+    ligne = pointage(backend, employe)
+    assert ligne["heure_arrivee"] == time(8, 12)
+    assert ligne["retard_minutes"] == 17
+    assert ligne["notes"] == "badge"
+
+
+def test_migration_retards(backend, employe):
+    backend.enregistrer_arrivee(employe, JOUR, time(8, 10))
+    backend.enregistrer_arrivee(employe, JOUR, time(8, 12))
+    assert doublons(backend) == [(employe, JOUR, 2)]
+    assert migrer(backend) == 1
+    assert doublons(backend) == []
+    # La ligne gardée est celle du dernier pointage, l'autre est archivée
+    assert retard_minutes(backend, employe) == 17
+    assert backend._lignes("SELECT retard_minutes FROM retards_doublons") == [{"retard_minutes": 15}]
+    # Index en place: un nouveau pointage n'ajoute plus de retard
+    backend.enregistrer_arrivee(employe, JOUR, time(8, 14))
+    assert compter(backend, "retards") == 1
+    assert migrer(backend) == 0
+
+
+def test_retard_de_30_minutes_absence(backend, employe):
+    resultat = backend.enregistrer_arrivee(employe, JOUR, time(8, 30))
+    assert resultat["absent"]
+    assert pointage(backend, employe) is None
+    lignes = absences(backend)
+    assert len(lignes) == 1
+    assert not lignes[0]["justifie"]
+
+
+def test_employe_inconnu(backend, employe):
+    assert backend.enregistrer_arrivee(employe + 1000, JOUR, time(8, 0)) is None
+    assert backend.enregistrer_depart(employe + 1000, JOUR, time(16, 0)) is None
+
+
+# --- Départs ---
+
+def test_depart_anticipe(backend, employe):
+    backend.enregistrer_arrivee(employe, JOUR, time(7, 50), notes="matin")
+    resultat = backend.enregistrer_depart(employe, JOUR, time(15, 0))
+    assert resultat == {"statut": "Départ anticipé", "depart_avance_minutes": 60}
+    ligne = pointage(backend, employe)
+    assert (ligne["heure_arrivee"], ligne["heure_depart"]) == (time(7, 50), time(15, 0))
+    assert ligne["notes"] == "matin"
+
+
+def test_depart_sans_arrivee(backend, employe):
+    resultat = backend.enregistrer_depart(employe, JOUR, "16:03")
+    assert resultat["statut"] == "Present"
+    ligne = pointage(backend, employe)
+    assert ligne["heure_arrivee"] is None
+    assert as_time(ligne["heure_depart"]) == time(16, 3)
+
+
+def test_pointages_du_jour(backend, employe):
+    autre = backend.ajouter_personnel("Martin", "Marie", "Radiologie", "Jour", "08:00", "16:00")
+    backend.enregistrer_arrivee(autre, JOUR, time(8, 10))
+    backend.enregistrer_arrivee(employe, JOUR, time(7, 55))
+    backend.enregistrer_depart(employe, JOUR, time(16, 0))
+    backend.enregistrer_arrivee(employe, date(2024, 3, 13), time(7, 55))
+    lignes = backend.pointages_du_jour(JOUR)
+    assert [(p["nom"], p["heure_arrivee"], p["heure_depart"]) for p in lignes] == [
+        ("Dupont", time(7, 55), time(16, 0)),
+        ("Martin", time(8, 10), None),
+    ]
+    assert lignes[1]["retard_minutes"] == 15
+
+
+# --- Absences ---
+
+def test_absence_remplacee(backend, employe):
+    backend.enregistrer_absence(employe, JOUR, "Maladie")
+    backend.enregistrer_absence(employe, JOUR, "Maladie", justifie=True, certificat=("a" * 64, 1234, "application/pdf"))
+    lignes = absences(backend)
+    assert len(lignes) == 1
+    assert lignes[0]["justifie"]
+    assert (lignes[0]["certificat_taille"], lignes[0]["certificat_mime"]) == (1234, "application/pdf")
+
+
+# --- Congés ---
+
+def test_conges(backend, employe):
+    conge = backend.demander_conge(employe, date(2024, 3, 10), date(2024, 3, 15), "Congé annuel")
+    assert not backend.est_en_conge(employe, JOUR)
+    assert not backend.conge_disponible(employe, date(2024, 3, 14), date(2024, 3, 20))
+    assert backend.conge_disponible(employe, date(2024, 3, 16), date(2024, 3, 20))
+    backend.modifier_statut_conge(conge, "Approuvé")
+    assert backend.est_en_conge(employe, JOUR)
+    assert not backend.est_en_conge(employe, date(2024, 3, 16))
+    backend.modifier_statut_conge(conge, "Rejeté")
+    assert backend.conge_disponible(employe, date(2024, 3, 1), date(2024, 3, 31))
+
+
+def test_statut_conge_invalide(backend, employe):
+    conge = backend.demander_conge(employe, JOUR, JOUR, "Congé annuel")
+    with pytest.raises(Exception):
+        backend.modifier_statut_conge(conge, "Inconnu")
+    # La transaction annulée ne laisse rien derrière elle
+    assert compter(backend, "conges", "statut = %s", ("En attente",)) == 1
@@ -0,0 +1,47 @@
+"""Poste de pointage local: l'application sur une base SQLite, sans serveur PostgreSQL."""
+from datetime import date
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import config
+from pointage import db
+from pointage.backends import BackendSqlite
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+@pytest.fixture
+def base_locale(monkeypatch):
+    backend = BackendSqlite(":memory:")
+    monkeypatch.setattr(config, "BD", "sqlite")
+    monkeypatch.setattr(db, "backend", backend)
+    yield backend
+    backend.fermer()
+
+
+def _bouton(page, libelle):
+    return next(bouton for bouton in page.button if bouton.label == libelle)
+
+
+def test_connexion_et_pointage(base_locale):
+    page = AppTest.from_file(APP, default_timeout=30).run()
+    assert not page.exception
+    page.text_input[0].input("admin")
+    page.text_input[1].input("admin123")
+    page.button[0].click().run()
+    assert page.title[0].value == "⏰ Pointage"
+    assert page.sidebar.selectbox[0].options == ["⏰ Pointage"]
+
+    employe = base_locale.ajouter_personnel("Dupont", "Jean", "Urgence", "Jour", "08:00", "16:00")
+    page.run()
+    _bouton(page, "✅ Pointer l'arrivée").click().run()
+    assert not page.exception
+    assert [succes.value for succes in page.success] == ["✅ Pointage d'arrivée enregistré"]
+
+    (pointage,) = base_locale.pointages_du_jour(date.today())
+    assert pointage["nom"] == "Dupont"
+    assert pointage["heure_arrivee"] is not None
+    assert page.dataframe[0].value["nom"].tolist() == ["Dupont"]
+    assert base_locale.personnel_actif()[0]["id"] == employe
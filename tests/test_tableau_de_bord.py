@@ -0,0 +1,37 @@
+"""Tableau de bord rendu quand ses lectures échouent (disjoncteur ouvert, budget épuisé, pool saturé)."""
+from types import SimpleNamespace
+
+from streamlit.testing.v1 import AppTest
+
+from pointage import db
+from pointage.ecrans import tableau_de_bord
+from pointage.resilience import BaseIndisponible
+
+
+class PiloteEnPanne:
+    """Chaque lecture de la page échoue, comme derrière un disjoncteur ouvert"""
+
+    def rassembler(self, coroutines):
+        for coroutine in coroutines.values():
+            coroutine.close()
+        return dict.fromkeys(coroutines, BaseIndisponible("base de données indisponible"))
+
+
+def _page():
+    from pointage.ecrans.tableau_de_bord import show_dashboard
+
+    show_dashboard()
+
+
+def test_lectures_en_echec(monkeypatch):
+    monkeypatch.setattr(db, "get_pilote_async", PiloteEnPanne)
+    monkeypatch.setattr(tableau_de_bord, "get_ecouteur", lambda: SimpleNamespace(version=0))
+    monkeypatch.setattr(tableau_de_bord, "assurer_roster_jour", lambda: False)
+
+    page = AppTest.from_function(_page, default_timeout=30).run()
+
+    assert not page.exception
+    assert [metrique.value for metrique in page.metric] == ["0", "0", "0", "0"]
+    assert [info.value for info in page.info] == [
+        "Aucun congé en cours aujourd'hui", "Aucun pointage enregistré aujourd'hui",
+    ]